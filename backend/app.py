@@ -1,14 +1,44 @@
 #!/usr/bin/env python3
+import json
+import os
 import aws_cdk as cdk
 from aws_cdk import (
     Stack,
+    Duration,
     aws_lambda as _lambda,
     aws_apigateway as apigateway,
     aws_dynamodb as dynamodb,
+    aws_ec2 as ec2,
+    aws_elasticache as elasticache,
+    aws_events as events,
+    aws_events_targets as targets,
+    aws_lambda_event_sources as event_sources,
+    aws_sqs as sqs,
+    aws_wafv2 as wafv2,
     RemovalPolicy
 )
 from constructs import Construct
 
+# Per-function memory, architecture, runtime, concurrency and timeout.
+# Tune with `python3 -m benchmarks.power_tuning` and paste its output here.
+DEFAULT_PROFILES_PATH = os.path.join(os.path.dirname(__file__), "lambda_profiles.json")
+
+INGEST_MAX_RECEIVE_COUNT = 5
+
+# Account-wide API Gateway throttles; the handlers also shed load per container
+API_THROTTLE_RATE = 500
+API_THROTTLE_BURST = 1000
+PARTNER_THROTTLE_RATE = 50
+PARTNER_THROTTLE_BURST = 100
+PARTNER_QUOTA_PER_DAY = 100000
+# Requests per source IP per 5-minute window, enforced by WAF across all containers
+PER_IP_LIMIT_PER_5_MINUTES = 3000
+
+ARCHITECTURES = {
+    "arm64": _lambda.Architecture.ARM_64,
+    "x86_64": _lambda.Architecture.X86_64
+}
+
 class BackendStack(Stack):
     def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
         super().__init__(scope, construct_id, **kwargs)
@@ -18,42 +48,62 @@ class BackendStack(Stack):
             self, "PokemonTable",
             table_name="PokemonTable"
         )
+        stats_table = dynamodb.Table.from_table_name(
+            self, "PokemonStatsTable",
+            table_name="PokemonStatsTable"
+        )
+        types_table = dynamodb.Table.from_table_name(
+            self, "PokemonTypesTable",
+            table_name="PokemonTypesTable"
+        )
+        abilities_table = dynamodb.Table.from_table_name(
+            self, "PokemonAbilitiesTable",
+            table_name="PokemonAbilitiesTable"
+        )
+        jobs_table = dynamodb.Table.from_table_name(
+            self, "PokemonIngestJobsTable",
+            table_name="PokemonIngestJobsTable"
+        )
+
+        profiles_path = self.node.try_get_context("lambda_profiles") or DEFAULT_PROFILES_PATH
+        with open(profiles_path) as f:
+            self.profiles = json.load(f)
+
+        # Optional shared read cache (cdk deploy -c shared_cache=true)
+        self.vpc = None
+        self.cache_environment = {}
+        self.layers = []
+
+        # lambda/schema.py links to database/schema.py, which the request
+        # validators are compiled from; copy its contents into the asset
+        self.code = _lambda.Code.from_asset("lambda", follow_symlinks=cdk.SymlinkFollowMode.ALWAYS)
+        if self.node.try_get_context("shared_cache") in (True, "true"):
+            self._create_shared_cache()
+
+        # Sampled handler profiling (cdk deploy -c profile_sample_rate=0.01)
+        self.profiling_environment = {}
+        if self.node.try_get_context("profile_sample_rate"):
+            self.profiling_environment["PROFILE_SAMPLE_RATE"] = str(self.node.try_get_context("profile_sample_rate"))
+
+        # Optional single-table layout (cdk deploy -c single_table=true, after
+        # deploying the database stack with the same flag): writes are mirrored
+        # into PokemonTrainerTable and rosters are read from it
+        trainer_table = None
+        self.trainer_environment = {}
+        if self.node.try_get_context("single_table") in (True, "true"):
+            trainer_table = dynamodb.Table.from_table_attributes(
+                self, "PokemonTrainerTable",
+                table_name="PokemonTrainerTable",
+                global_indexes=["ByPokemon"]
+            )
+            self.trainer_environment["TRAINER_TABLE_NAME"] = trainer_table.table_name
 
         # Lambda functions for each CRUD operation
-        get_pokemons_lambda = _lambda.Function(
-            self, "GetPokemonsHandler",
-            runtime=_lambda.Runtime.PYTHON_3_9,
-            handler="get_pokemons.lambda_handler",
-            code=_lambda.Code.from_asset("lambda")
-        )
-        
-        get_pokemon_lambda = _lambda.Function(
-            self, "GetPokemonHandler",
-            runtime=_lambda.Runtime.PYTHON_3_9,
-            handler="get_pokemon.lambda_handler",
-            code=_lambda.Code.from_asset("lambda")
-        )
-        
-        create_pokemon_lambda = _lambda.Function(
-            self, "CreatePokemonHandler",
-            runtime=_lambda.Runtime.PYTHON_3_9,
-            handler="create_pokemon.lambda_handler",
-            code=_lambda.Code.from_asset("lambda")
-        )
-        
-        update_pokemon_lambda = _lambda.Function(
-            self, "UpdatePokemonHandler",
-            runtime=_lambda.Runtime.PYTHON_3_9,
-            handler="update_pokemon.lambda_handler",
-            code=_lambda.Code.from_asset("lambda")
-        )
-        
-        delete_pokemon_lambda = _lambda.Function(
-            self, "DeletePokemonHandler",
-            runtime=_lambda.Runtime.PYTHON_3_9,
-            handler="delete_pokemon.lambda_handler",
-            code=_lambda.Code.from_asset("lambda")
-        )
+        get_pokemons_lambda = self._create_function("GetPokemonsHandler", "get_pokemons")
+        get_pokemon_lambda = self._create_function("GetPokemonHandler", "get_pokemon")
+        create_pokemon_lambda = self._create_function("CreatePokemonHandler", "create_pokemon")
+        update_pokemon_lambda = self._create_function("UpdatePokemonHandler", "update_pokemon")
+        delete_pokemon_lambda = self._create_function("DeletePokemonHandler", "delete_pokemon")
 
         # Grant Lambda permissions to DynamoDB
         pokemon_table.grant_read_data(get_pokemons_lambda)
@@ -61,12 +111,95 @@ class BackendStack(Stack):
         pokemon_table.grant_write_data(create_pokemon_lambda)
         pokemon_table.grant_read_write_data(update_pokemon_lambda)
         pokemon_table.grant_write_data(delete_pokemon_lambda)
+        stats_table.grant_write_data(create_pokemon_lambda)
+        # Reference data for ?expand=type,abilities
+        for reader in (get_pokemons_lambda, get_pokemon_lambda):
+            types_table.grant_read_data(reader)
+            abilities_table.grant_read_data(reader)
+        stats_table.grant_read_write_data(delete_pokemon_lambda)
+
+        get_trainer_roster_lambda = self._create_function("GetTrainerRosterHandler", "get_trainer_roster")
+        pokemon_table.grant_read_data(get_trainer_roster_lambda)
+        stats_table.grant_read_data(get_trainer_roster_lambda)
+
+        # Nightly sweep for stat rows left behind by failed deletes
+        stats_sweeper_lambda = self._create_function("StatsSweeperHandler", "stats_sweeper")
+        pokemon_table.grant_read_data(stats_sweeper_lambda)
+        stats_table.grant_read_write_data(stats_sweeper_lambda)
+        events.Rule(
+            self, "StatsSweeperSchedule",
+            schedule=events.Schedule.rate(Duration.days(1)),
+            targets=[targets.LambdaFunction(stats_sweeper_lambda)]
+        )
+
+        # Buffered ingestion: POST /pokemons:enqueue queues bursts that a
+        # consumer drains with rate-controlled batch writes
+        ingest_dead_letter_queue = sqs.Queue(
+            self, "PokemonIngestDeadLetterQueue",
+            retention_period=Duration.days(14)
+        )
+        ingest_queue = sqs.Queue(
+            self, "PokemonIngestQueue",
+            # AWS recommends six times the consumer timeout
+            visibility_timeout=Duration.seconds(6 * self._profile("ingest_pokemon")["timeout"]),
+            dead_letter_queue=sqs.DeadLetterQueue(
+                max_receive_count=INGEST_MAX_RECEIVE_COUNT,
+                queue=ingest_dead_letter_queue
+            )
+        )
+        if self.vpc:
+            self.vpc.add_interface_endpoint(
+                "SqsEndpoint",
+                service=ec2.InterfaceVpcEndpointAwsService.SQS
+            )
+
+        enqueue_pokemon_lambda = self._create_function(
+            "EnqueuePokemonHandler", "enqueue_pokemon",
+            environment={
+                "INGEST_QUEUE_URL": ingest_queue.queue_url,
+                "JOBS_TABLE_NAME": jobs_table.table_name
+            }
+        )
+        ingest_pokemon_lambda = self._create_function(
+            "IngestPokemonHandler", "ingest_pokemon",
+            environment={
+                "JOBS_TABLE_NAME": jobs_table.table_name,
+                "MAX_RECEIVE_COUNT": str(INGEST_MAX_RECEIVE_COUNT)
+            }
+        )
+        get_ingest_job_lambda = self._create_function(
+            "GetIngestJobHandler", "get_ingest_job",
+            environment={"JOBS_TABLE_NAME": jobs_table.table_name}
+        )
+        ingest_pokemon_lambda.add_event_source(event_sources.SqsEventSource(
+            ingest_queue,
+            batch_size=10,
+            max_batching_window=Duration.seconds(1),
+            report_batch_item_failures=True,
+            max_concurrency=int(self.node.try_get_context("ingest_max_concurrency") or 5)
+        ))
+
+        ingest_queue.grant_send_messages(enqueue_pokemon_lambda)
+        jobs_table.grant_write_data(enqueue_pokemon_lambda)
+        pokemon_table.grant_write_data(ingest_pokemon_lambda)
+        stats_table.grant_write_data(ingest_pokemon_lambda)
+        jobs_table.grant_read_write_data(ingest_pokemon_lambda)
+        jobs_table.grant_read_data(get_ingest_job_lambda)
+
+        if trainer_table:
+            trainer_table.grant_read_data(get_trainer_roster_lambda)
+            for writer in (create_pokemon_lambda, update_pokemon_lambda, delete_pokemon_lambda, ingest_pokemon_lambda):
+                trainer_table.grant_read_write_data(writer)
 
         # API Gateway
         api = apigateway.RestApi(
             self, "PokemonApi",
             rest_api_name="Pokemon Service",
             description="This service serves Pokemon data.",
+            deploy_options=apigateway.StageOptions(
+                throttling_rate_limit=int(self.node.try_get_context("api_throttle_rate") or API_THROTTLE_RATE),
+                throttling_burst_limit=int(self.node.try_get_context("api_throttle_burst") or API_THROTTLE_BURST)
+            ),
             default_cors_preflight_options=apigateway.CorsOptions(
                 allow_origins=apigateway.Cors.ALL_ORIGINS,
                 allow_methods=apigateway.Cors.ALL_METHODS,
@@ -91,10 +224,187 @@ class BackendStack(Stack):
         pokemon_item.add_method("PUT", update_pokemon_integration)
         pokemon_item.add_method("DELETE", delete_pokemon_integration)
 
+        enqueue = api.root.add_resource("pokemons:enqueue")
+        enqueue_method = enqueue.add_method(
+            "POST",
+            apigateway.LambdaIntegration(enqueue_pokemon_lambda),
+            api_key_required=True
+        )
+
+        roster = api.root.add_resource("trainers").add_resource("{id}").add_resource("roster")
+        roster.add_method("GET", apigateway.LambdaIntegration(get_trainer_roster_lambda))
+
+        job_item = api.root.add_resource("jobs").add_resource("{id}")
+        job_item.add_method("GET", apigateway.LambdaIntegration(get_ingest_job_lambda))
+
+        # Bulk imports are keyed per partner, with their own throttle and quota
+        partner_plan = api.add_usage_plan(
+            "PartnerUsagePlan",
+            name="Pokemon partners",
+            throttle=apigateway.ThrottleSettings(
+                rate_limit=int(self.node.try_get_context("partner_throttle_rate") or PARTNER_THROTTLE_RATE),
+                burst_limit=int(self.node.try_get_context("partner_throttle_burst") or PARTNER_THROTTLE_BURST)
+            ),
+            quota=apigateway.QuotaSettings(
+                limit=int(self.node.try_get_context("partner_quota_per_day") or PARTNER_QUOTA_PER_DAY),
+                period=apigateway.Period.DAY
+            )
+        )
+        partner_plan.add_api_stage(
+            stage=api.deployment_stage,
+            throttle=[
+                apigateway.ThrottlingPerMethod(
+                    method=enqueue_method,
+                    throttle=apigateway.ThrottleSettings(rate_limit=5, burst_limit=10)
+                )
+            ]
+        )
+        partner_plan.add_api_key(api.add_api_key("PartnerApiKey"))
+
+        # Per-IP limit for callers without an API key. The in-handler buckets
+        # are per container, so this is the limit that holds across the fleet
+        per_ip_limit = wafv2.CfnWebACL(
+            self, "PokemonApiWebAcl",
+            scope="REGIONAL",
+            default_action=wafv2.CfnWebACL.DefaultActionProperty(allow={}),
+            visibility_config=wafv2.CfnWebACL.VisibilityConfigProperty(
+                cloud_watch_metrics_enabled=True,
+                metric_name="PokemonApiWebAcl",
+                sampled_requests_enabled=True
+            ),
+            rules=[
+                wafv2.CfnWebACL.RuleProperty(
+                    name="PerIpRateLimit",
+                    priority=0,
+                    action=wafv2.CfnWebACL.RuleActionProperty(
+                        block=wafv2.CfnWebACL.BlockActionProperty(
+                            custom_response=wafv2.CfnWebACL.CustomResponseProperty(response_code=429)
+                        )
+                    ),
+                    statement=wafv2.CfnWebACL.StatementProperty(
+                        rate_based_statement=wafv2.CfnWebACL.RateBasedStatementProperty(
+                            aggregate_key_type="IP",
+                            limit=int(self.node.try_get_context("per_ip_limit") or PER_IP_LIMIT_PER_5_MINUTES)
+                        )
+                    ),
+                    visibility_config=wafv2.CfnWebACL.VisibilityConfigProperty(
+                        cloud_watch_metrics_enabled=True,
+                        metric_name="PerIpRateLimit",
+                        sampled_requests_enabled=True
+                    )
+                )
+            ]
+        )
+        wafv2.CfnWebACLAssociation(
+            self, "PokemonApiWebAclAssociation",
+            resource_arn=api.deployment_stage.stage_arn,
+            web_acl_arn=per_ip_limit.attr_arn
+        )
+
         # Output API URL
         cdk.CfnOutput(self, "ApiUrl", value=api.url)
         cdk.CfnOutput(self, "ApiEndpoint", value=f"{api.url}pokemons")
 
+    def _profile(self, module_name: str) -> dict:
+        return {**self.profiles["defaults"], **self.profiles["functions"].get(module_name, {})}
+
+    def _create_function(self, construct_id: str, module_name: str, environment: dict = None) -> _lambda.IFunction:
+        """Create the Lambda for one route using its profile from lambda_profiles.json.
+
+        Returns a "live" alias when provisioned concurrency is configured so
+        that API Gateway invokes the pre-initialised environments.
+        """
+        profile = self._profile(module_name)
+
+        function = _lambda.Function(
+            self, construct_id,
+            runtime=_lambda.Runtime(profile["runtime"], _lambda.RuntimeFamily.PYTHON),
+            architecture=ARCHITECTURES[profile["architecture"]],
+            memory_size=profile["memory_size"],
+            timeout=Duration.seconds(profile["timeout"]),
+            reserved_concurrent_executions=profile.get("reserved_concurrency"),
+            handler=f"{module_name}.lambda_handler",
+            code=self.code,
+            layers=self.layers,
+            environment={
+                **self.cache_environment,
+                **self.profiling_environment,
+                **self.trainer_environment,
+                **(environment or {})
+            },
+            vpc=self.vpc,
+            vpc_subnets=ec2.SubnetSelection(subnet_type=ec2.SubnetType.PRIVATE_ISOLATED) if self.vpc else None,
+            security_groups=[self.cache_clients] if self.vpc else None
+        )
+
+        if profile.get("provisioned_concurrency"):
+            return function.add_alias(
+                "live",
+                provisioned_concurrent_executions=profile["provisioned_concurrency"]
+            )
+        return function
+
+    def _create_shared_cache(self) -> None:
+        """Create a Redis cache shared by all functions, which move into its VPC.
+
+        The VPC has no NAT; DynamoDB is reached through a gateway endpoint.
+        """
+        self.vpc = ec2.Vpc(
+            self, "CacheVpc",
+            max_azs=2,
+            nat_gateways=0,
+            subnet_configuration=[
+                ec2.SubnetConfiguration(
+                    name="isolated",
+                    subnet_type=ec2.SubnetType.PRIVATE_ISOLATED
+                )
+            ]
+        )
+        self.vpc.add_gateway_endpoint(
+            "DynamoDbEndpoint",
+            service=ec2.GatewayVpcEndpointAwsService.DYNAMODB
+        )
+
+        self.cache_clients = ec2.SecurityGroup(self, "CacheClientSecurityGroup", vpc=self.vpc)
+        cache_security_group = ec2.SecurityGroup(self, "CacheSecurityGroup", vpc=self.vpc)
+        cache_security_group.add_ingress_rule(self.cache_clients, ec2.Port.tcp(6379))
+
+        subnet_group = elasticache.CfnSubnetGroup(
+            self, "CacheSubnetGroup",
+            description="Pokemon read cache",
+            subnet_ids=[subnet.subnet_id for subnet in self.vpc.isolated_subnets]
+        )
+        cache_cluster = elasticache.CfnCacheCluster(
+            self, "PokemonCache",
+            engine="redis",
+            cache_node_type=self.node.try_get_context("cache_node_type") or "cache.t4g.micro",
+            num_cache_nodes=1,
+            cache_subnet_group_name=subnet_group.ref,
+            vpc_security_group_ids=[cache_security_group.security_group_id]
+        )
+
+        self.cache_environment = {
+            "CACHE_ENDPOINT": f"redis://{cache_cluster.attr_redis_endpoint_address}:{cache_cluster.attr_redis_endpoint_port}"
+        }
+
+        # The redis client is only needed when the cache is enabled
+        bundling_runtime = _lambda.Runtime(self.profiles["defaults"]["runtime"], _lambda.RuntimeFamily.PYTHON)
+        self.layers = [
+            _lambda.LayerVersion(
+                self, "CacheClientLayer",
+                code=_lambda.Code.from_asset(
+                    "lambda",
+                    exclude=["*", "!requirements.txt"],
+                    bundling=cdk.BundlingOptions(
+                        image=bundling_runtime.bundling_image,
+                        command=["bash", "-c", "pip install -r requirements.txt -t /asset-output/python"]
+                    )
+                )
+            )
+        ]
+
+        cdk.CfnOutput(self, "CacheEndpoint", value=cache_cluster.attr_redis_endpoint_address)
+
 app = cdk.App()
 BackendStack(app, "PokemonBackendStack")
 app.synth()
\ No newline at end of file
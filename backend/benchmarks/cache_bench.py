@@ -0,0 +1,116 @@
+"""
+Benchmark the shared read cache with the in-process stand-in.
+
+Simulates several Lambda containers serving a mix of list reads, item
+reads and updates against a table with simulated network latency. Each run is done with the cache disabled and then with
+CACHE_ENDPOINT=memory://. It reports latency, DynamoDB round trips and the
+cache hit rate, plus how many scans a cold-key stampede from concurrent containers
+(threads) triggers.
+
+Usage (from the backend directory):
+    python3 -m benchmarks.cache_bench --containers 16 --requests 200
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+
+from benchmarks.harness import (
+    InMemoryDynamoDB, import_lambda_module, install_fake_boto3, load_handler, percentile, seed
+)
+
+
+def load_handlers(cache_endpoint):
+    if cache_endpoint:
+        os.environ['CACHE_ENDPOINT'] = cache_endpoint
+    else:
+        os.environ.pop('CACHE_ENDPOINT', None)
+    # Handlers import the shared `cache` module; reset its singleton per run
+    shared_cache = import_lambda_module('cache')
+    shared_cache._cache = None
+    handlers = {name: load_handler(name) for name in ('get_pokemons', 'get_pokemon', 'update_pokemon')}
+    return handlers, shared_cache.get_cache()
+
+
+def run_mix(handlers, item_ids, containers, requests, write_ratio, seed_value):
+    """Interleave requests from each container round-robin.
+
+    Containers share the cache but not a CPU in Lambda, so the mix runs on
+    one thread to keep GIL contention out of the latencies.
+    """
+    rngs = [random.Random(seed_value + index) for index in range(containers)]
+    latencies = []
+    for _ in range(requests):
+        for rng in rngs:
+            roll = rng.random()
+            pokemon_id = rng.choice(item_ids[:20])  # popular items
+            if roll < write_ratio:
+                event = {'pathParameters': {'id': pokemon_id},
+                         'body': json.dumps({'name': 'Updated', 'type': 'Fire'})}
+                handler = handlers['update_pokemon']
+            elif roll < 0.5:
+                event = {'pathParameters': None}
+                handler = handlers['get_pokemons']
+            else:
+                event = {'pathParameters': {'id': pokemon_id}}
+                handler = handlers['get_pokemon']
+            start = time.perf_counter()
+            handler.lambda_handler(event, None)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def run_stampede(handlers, containers):
+    """Hit a cold list key from every container at once."""
+    barrier = threading.Barrier(containers)
+
+    def container():
+        barrier.wait()
+        handlers['get_pokemons'].lambda_handler({'pathParameters': None}, None)
+
+    threads = [threading.Thread(target=container) for _ in range(containers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--containers', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=200, help='requests per container')
+    parser.add_argument('--items', type=int, default=500)
+    parser.add_argument('--write-ratio', type=float, default=0.05)
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='simulated DynamoDB round trip')
+    args = parser.parse_args(argv)
+
+    resource = InMemoryDynamoDB(latency_ms=args.latency_ms)
+    install_fake_boto3(resource)
+    table = resource.Table('PokemonTable')
+
+    print(f"{'mode':<10}{'p50 ms':>10}{'p99 ms':>10}{'DynamoDB calls':>16}{'hit rate':>10}{'stampede scans':>16}")
+    for mode, endpoint in (('no cache', None), ('cache', 'memory://')):
+        table.items.clear()
+        seed(table, args.items)
+        item_ids = [key[0] for key in table.items]
+        handlers, cache = load_handlers(endpoint)
+
+        resource.reset_calls()
+        latencies = run_mix(handlers, item_ids, args.containers, args.requests, args.write_ratio, 42)
+        calls = resource.calls
+
+        import_lambda_module('cache').bump_list_generation(cache)
+        resource.reset_calls()
+        run_stampede(handlers, args.containers)
+        stampede_scans = resource.calls
+
+        hit_rate = f'{cache.hit_rate:.1%}' if cache is not None else '-'
+        print(f'{mode:<10}{percentile(latencies, 50):>10.2f}{percentile(latencies, 99):>10.2f}'
+              f'{calls:>16}{hit_rate:>10}{stampede_scans:>16}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark `?expand=type,abilities` against client-side reference lookups.
+
+Seeds Pokemon that reference types and abilities. It then renders a list
+page and a run of detail views three ways:
+
+* lookups: the plain GET, then one GetItem per referenced type and ability
+  (what clients do today);
+* expand (cold): `?expand=type,abilities` with an empty reference cache;
+* expand (warm): the same again, served from the per-container cache.
+
+Each DynamoDB call costs --io-ms of simulated latency.
+
+Usage (from the backend directory):
+    python3 -m benchmarks.expand_bench --items 200 --details 50
+"""
+
+import argparse
+import json
+import random
+import time
+
+from benchmarks.harness import (
+    POKEMON_TYPES, InMemoryDynamoDB, _to_dynamo, import_lambda_module, install_fake_boto3,
+    load_handler, percentile, seed
+)
+
+
+def seed_references(resource, items, abilities, seed_value):
+    rng = random.Random(seed_value)
+    types_table = resource.Table('PokemonTypesTable')
+    abilities_table = resource.Table('PokemonAbilitiesTable')
+    for type_name in POKEMON_TYPES:
+        types_table.items[(type_name,)] = {'type_name': type_name, 'color': '#888888', 'strengths': [],
+                                           'weaknesses': [], 'immunities': [], 'description': type_name}
+    ability_ids = [f'ability-{index:03d}' for index in range(abilities)]
+    for ability_id in ability_ids:
+        abilities_table.items[(ability_id,)] = _to_dynamo({
+            'ability_id': ability_id, 'name': ability_id.title(), 'description': '', 'effect': '',
+            'is_hidden': False, 'generation': 3
+        })
+
+    pokemon_table = resource.Table('PokemonTable')
+    seed(pokemon_table, items)
+    for item in pokemon_table.items.values():
+        item['abilities'] = rng.sample(ability_ids, 2)
+        if rng.random() < 0.5:
+            item['secondary_type'] = rng.choice(POKEMON_TYPES)
+
+
+def client_lookups(resource, pokemons):
+    """Resolve references the way a client would: one GetItem per reference."""
+    types_table = resource.Table('PokemonTypesTable')
+    abilities_table = resource.Table('PokemonAbilitiesTable')
+    for pokemon in pokemons:
+        for type_name in filter(None, (pokemon.get('type'), pokemon.get('secondary_type'))):
+            types_table.get_item(Key={'type_name': type_name})
+        for ability_id in pokemon.get('abilities', []):
+            abilities_table.get_item(Key={'ability_id': ability_id})
+
+
+def timed(resource, action):
+    resource.reset_calls()
+    start = time.perf_counter()
+    action()
+    return (time.perf_counter() - start) * 1000, resource.calls
+
+
+def run(mode, resource, handlers, item_ids, details):
+    """Return (list ms, list calls, detail p50 ms, detail calls per view)."""
+    expansions = {'expand': 'type,abilities'}
+
+    def list_page():
+        if mode == 'lookups':
+            response = handlers['get_pokemons'].lambda_handler({'pathParameters': None}, None)
+            client_lookups(resource, json.loads(response['body']))
+        else:
+            handlers['get_pokemons'].lambda_handler(
+                {'pathParameters': None, 'queryStringParameters': expansions}, None)
+
+    def detail(pokemon_id):
+        if mode == 'lookups':
+            response = handlers['get_pokemon'].lambda_handler({'pathParameters': {'id': pokemon_id}}, None)
+            client_lookups(resource, [json.loads(response['body'])])
+        else:
+            handlers['get_pokemon'].lambda_handler(
+                {'pathParameters': {'id': pokemon_id}, 'queryStringParameters': expansions}, None)
+
+    list_ms, list_calls = timed(resource, list_page)
+    detail_samples = [timed(resource, lambda: detail(pokemon_id)) for pokemon_id in item_ids[:details]]
+    return (list_ms, list_calls, percentile([ms for ms, _ in detail_samples], 50),
+            sum(calls for _, calls in detail_samples) / len(detail_samples))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--items', type=int, default=200)
+    parser.add_argument('--abilities', type=int, default=60)
+    parser.add_argument('--details', type=int, default=50, help='detail views rendered after the list')
+    parser.add_argument('--io-ms', type=float, default=2.0, help='simulated latency per DynamoDB call')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args(argv)
+
+    resource = InMemoryDynamoDB()
+    install_fake_boto3(resource)
+    seed_references(resource, args.items, args.abilities, args.seed)
+    resource.latency_ms = args.io_ms
+    for table in resource.tables.values():
+        table.latency_ms = args.io_ms
+
+    handlers = {name: load_handler(name) for name in ('get_pokemons', 'get_pokemon')}
+    reference_cache = import_lambda_module('expand').reference_cache
+    item_ids = [key[0] for key in resource.Table('PokemonTable').items]
+
+    print(f'{args.items} Pokemon, {args.abilities} abilities, {args.details} detail views, {args.io_ms} ms per call')
+    print(f"{'mode':<16}{'list ms':>10}{'list calls':>12}{'detail p50 ms':>15}{'detail calls':>14}")
+    for mode in ('lookups', 'expand (cold)', 'expand (warm)'):
+        if mode == 'expand (cold)':
+            reference_cache.clear()
+        list_ms, list_calls, detail_ms, detail_calls = run(mode, resource, handlers, item_ids, args.details)
+        print(f'{mode:<16}{list_ms:>10.1f}{list_calls:>12}{detail_ms:>15.2f}{detail_calls:>14.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,428 @@
+"""
+Shared helpers for the backend benchmarks.
+
+Loads the Lambda handlers from ../lambda against an in-memory DynamoDB
+stand-in (the same approach local_server.py uses) so they can be replayed
+without AWS access, and counts the DynamoDB calls each invocation makes.
+"""
+
+import importlib.util
+import math
+import os
+import re
+import sys
+import threading
+import time
+import types
+import uuid
+from decimal import Decimal
+
+# Replays send every request from one client and, in cache_bench, from
+# several threads; keep admission control out of the measurements
+os.environ.setdefault('ADMISSION_RATE', '1e9')
+os.environ.setdefault('ADMISSION_BURST', '1e9')
+os.environ.setdefault('ADMISSION_MAX_CONCURRENCY', '1e9')
+
+LAMBDA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lambda')
+
+POKEMON_TYPES = ['Grass', 'Fire', 'Water', 'Bug', 'Normal', 'Poison', 'Electric']
+
+# Key attributes of each table in database/app.py (default: id)
+TABLE_KEYS = {
+    'PokemonStatsTable': ('pokemon_id', 'stat_name'),
+    'PokemonTypesTable': ('type_name',),
+    'PokemonAbilitiesTable': ('ability_id',),
+    'PokemonIngestJobsTable': ('job_id',),
+    'PokemonTrainerTable': ('pk', 'sk')
+}
+
+
+class InMemoryTable:
+    """Minimal DynamoDB Table resource backed by a dict, counting calls.
+
+    latency_ms adds a simulated network round trip to every call.
+    """
+
+    def __init__(self, table_name, key_names=('id',), latency_ms=0.0):
+        self.table_name = table_name
+        self.key_names = key_names
+        self.latency_ms = latency_ms
+        self.items = {}
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _round_trip(self):
+        with self._lock:
+            self.calls += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+    @property
+    def name(self):
+        return self.table_name
+
+    def _key(self, key):
+        return tuple(key[name] for name in self.key_names)
+
+    def get_item(self, Key, **kwargs):
+        self._round_trip()
+        item = self.items.get(self._key(Key))
+        return {'Item': dict(item)} if item is not None else {}
+
+    def scan(self, Segment=0, TotalSegments=1, FilterExpression=None, ExpressionAttributeValues=None, **kwargs):
+        """FilterExpression supports a single 'attribute = :value'."""
+        self._round_trip()
+        items = [
+            dict(item) for key, item in self.items.items()
+            if hash(key) % TotalSegments == Segment
+        ]
+        if FilterExpression:
+            attribute, placeholder = (part.strip() for part in FilterExpression.split('='))
+            items = [item for item in items if item.get(attribute) == ExpressionAttributeValues[placeholder]]
+        return {'Items': items}
+
+    def query(self, KeyConditionExpression, ExpressionAttributeValues, IndexName=None, **kwargs):
+        """Supports 'pk = :v' optionally followed by 'AND begins_with(sk, :prefix)'.
+
+        On an index, the partition condition is matched against the named
+        attribute and the prefix is ignored.
+        """
+        self._round_trip()
+        conditions = KeyConditionExpression.split(' AND ')
+        attribute, placeholder = (part.strip() for part in conditions[0].split('='))
+        partition_value = ExpressionAttributeValues[placeholder]
+        if IndexName:
+            matches = [(key, item) for key, item in self.items.items() if item.get(attribute) == partition_value]
+        else:
+            prefix = ''
+            if len(conditions) > 1:
+                prefix = ExpressionAttributeValues[conditions[1].split(',')[1].strip(' )')]
+            matches = [
+                (key, item) for key, item in self.items.items()
+                if key[0] == partition_value and (len(key) == 1 or str(key[1]).startswith(prefix))
+            ]
+        items = [dict(item) for key, item in sorted(matches, key=lambda match: match[0])]
+        return {'Items': items, 'Count': len(items)}
+
+    def _check_condition(self, item, expression, values, names, operation):
+        """Supports 'AND' of attribute_exists(a), attribute_not_exists(a) and NOT contains(a, :v)."""
+        from botocore.exceptions import ClientError
+
+        item = item or {}
+        for condition in expression.split(' AND '):
+            function, attribute, placeholder = re.fullmatch(
+                r'\s*(attribute_exists|attribute_not_exists|NOT contains)\((\S+?)(?:, (:\w+))?\)\s*',
+                condition).groups()
+            attribute = names.get(attribute, attribute)
+            if function == 'attribute_exists':
+                holds = attribute in item
+            elif function == 'attribute_not_exists':
+                holds = attribute not in item
+            else:
+                holds = values[placeholder] not in item.get(attribute, ())
+            if not holds:
+                raise ClientError({'Error': {'Code': 'ConditionalCheckFailedException',
+                                             'Message': 'The conditional request failed'}}, operation)
+
+    def put_item(self, Item, ConditionExpression=None, ExpressionAttributeValues=None,
+                 ExpressionAttributeNames=None, **kwargs):
+        self._round_trip()
+        if ConditionExpression:
+            self._check_condition(self.items.get(self._key(Item)), ConditionExpression,
+                                  ExpressionAttributeValues or {}, ExpressionAttributeNames or {}, 'PutItem')
+        self.items[self._key(Item)] = _to_dynamo(Item)
+        return {}
+
+    def update_item(self, Key, UpdateExpression, ExpressionAttributeValues,
+                    ExpressionAttributeNames=None, ReturnValues=None, ConditionExpression=None, **kwargs):
+        """Supports SET and ADD clauses (ADD of a number or a set) and simple conditions.
+
+        ReturnValues='ALL_OLD' returns the item as it was, else the updated item.
+        """
+        self._round_trip()
+        names = ExpressionAttributeNames or {}
+        old = self.items.get(self._key(Key))
+        if ConditionExpression:
+            self._check_condition(old, ConditionExpression, ExpressionAttributeValues, names, 'UpdateItem')
+        old = dict(old) if old is not None else None
+        item = self.items.setdefault(self._key(Key), _to_dynamo(dict(Key)))
+        clauses = re.split(r'\b(SET|ADD)\b', UpdateExpression)[1:]
+        for action, body in zip(clauses[::2], clauses[1::2]):
+            for assignment in body.split(','):
+                if action == 'SET':
+                    attribute, placeholder = (part.strip() for part in assignment.split('='))
+                    item[names.get(attribute, attribute)] = _to_dynamo(ExpressionAttributeValues[placeholder])
+                else:
+                    attribute, placeholder = assignment.split()
+                    attribute = names.get(attribute, attribute)
+                    value = _to_dynamo(ExpressionAttributeValues[placeholder])
+                    if isinstance(value, set):
+                        item[attribute] = item.get(attribute, set()) | value
+                    else:
+                        item[attribute] = item.get(attribute, 0) + value
+        if ReturnValues == 'ALL_OLD':
+            return {'Attributes': old} if old is not None else {}
+        return {'Attributes': dict(item)}
+
+    def delete_item(self, Key, ReturnValues=None, **kwargs):
+        self._round_trip()
+        old = self.items.pop(self._key(Key), None)
+        if ReturnValues == 'ALL_OLD' and old is not None:
+            return {'Attributes': dict(old)}
+        return {}
+
+
+def _to_dynamo(value):
+    """Store numbers as Decimal, as boto3 returns them."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return Decimal(str(value))
+    if isinstance(value, dict):
+        return {key: _to_dynamo(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_to_dynamo(item) for item in value]
+    return value
+
+
+class VirtualClock:
+    """Simulated time for benchmarks that would otherwise sleep for real."""
+
+    def __init__(self):
+        self.time = 0.0
+
+    def now(self):
+        return self.time
+
+    def sleep(self, seconds):
+        self.time += max(0.0, seconds)
+
+
+class InMemoryClient:
+    """Stand-in for resource.meta.client: the multi-item DynamoDB calls.
+
+    set_write_capacity() limits BatchWriteItem to a number of writes per
+    second (a token bucket on the given clock). Writes over the limit come
+    back as UnprocessedItems, as they would from a throttled table.
+    """
+
+    def __init__(self, resource):
+        self.resource = resource
+        self.calls = 0
+        self.throttled_writes = 0
+        self.write_capacity = None
+        self._lock = threading.Lock()
+
+    def set_write_capacity(self, writes_per_second, clock, burst_seconds=1.0):
+        self.write_capacity = writes_per_second
+        self._clock = clock
+        self._burst = writes_per_second * burst_seconds
+        self._tokens = self._burst
+        self._refilled_at = clock.now()
+
+    def _take_write_tokens(self, wanted):
+        if self.write_capacity is None:
+            return wanted
+        now = self._clock.now()
+        self._tokens = min(self._burst, self._tokens + (now - self._refilled_at) * self.write_capacity)
+        self._refilled_at = now
+        granted = min(wanted, int(self._tokens))
+        self._tokens -= granted
+        return granted
+
+    def _round_trip(self):
+        with self._lock:
+            self.calls += 1
+        if self.resource.latency_ms:
+            time.sleep(self.resource.latency_ms / 1000)
+
+    def _apply(self, table_name, request):
+        table = self.resource.Table(table_name)
+        if 'PutRequest' in request or 'Put' in request:
+            item = (request.get('PutRequest') or request['Put'])['Item']
+            table.items[table._key(item)] = _to_dynamo(item)
+        elif 'DeleteRequest' in request or 'Delete' in request:
+            key = (request.get('DeleteRequest') or request['Delete'])['Key']
+            table.items.pop(table._key(key), None)
+
+    def transact_write_items(self, TransactItems, **kwargs):
+        self._round_trip()
+        for request in TransactItems:
+            operation = next(iter(request.values()))
+            self._apply(operation['TableName'], request)
+        return {}
+
+    def batch_write_item(self, RequestItems, **kwargs):
+        self._round_trip()
+        granted = self._take_write_tokens(sum(len(requests) for requests in RequestItems.values()))
+        unprocessed = {}
+        for table_name, requests in RequestItems.items():
+            for request in requests:
+                if granted:
+                    self._apply(table_name, request)
+                    granted -= 1
+                else:
+                    unprocessed.setdefault(table_name, []).append(request)
+                    self.throttled_writes += 1
+        return {'UnprocessedItems': unprocessed}
+
+    def batch_get_item(self, RequestItems, **kwargs):
+        self._round_trip()
+        responses = {}
+        for table_name, request in RequestItems.items():
+            table = self.resource.Table(table_name)
+            found = (table.items.get(table._key(key)) for key in request['Keys'])
+            responses[table_name] = [dict(item) for item in found if item is not None]
+        return {'Responses': responses, 'UnprocessedKeys': {}}
+
+
+class InMemoryDynamoDB:
+    """Stand-in for boto3.resource('dynamodb') handing out shared tables."""
+
+    def __init__(self, latency_ms=0.0):
+        self.latency_ms = latency_ms
+        self.tables = {}
+        self.meta = types.SimpleNamespace(client=InMemoryClient(self))
+
+    def Table(self, table_name):
+        if table_name not in self.tables:
+            self.tables[table_name] = InMemoryTable(
+                table_name, key_names=TABLE_KEYS.get(table_name, ('id',)), latency_ms=self.latency_ms)
+        return self.tables[table_name]
+
+    @property
+    def calls(self):
+        return self.meta.client.calls + sum(table.calls for table in self.tables.values())
+
+    def reset_calls(self):
+        self.meta.client.calls = 0
+        for table in self.tables.values():
+            table.calls = 0
+
+
+class InMemoryQueue:
+    """Stand-in for an SQS queue, for boto3.client('sqs') and the consumer side.
+
+    receive() returns records shaped like an SQS Lambda event; complete()
+    deletes the successful ones and makes reported failures visible again.
+    send_message_batch() enforces the SQS limits of 10 entries and 256 KiB
+    per batch, raising the ClientError SQS would.
+    """
+
+    MAX_ENTRIES = 10
+    MAX_BATCH_BYTES = 262144
+
+    def __init__(self):
+        self.messages = []
+        self.dead_letters = []
+        self.calls = 0
+
+    def send_message_batch(self, QueueUrl, Entries):
+        from botocore.exceptions import ClientError
+
+        self.calls += 1
+        size = sum(len(entry['MessageBody'].encode('utf-8')) for entry in Entries)
+        if len(Entries) > self.MAX_ENTRIES:
+            code = 'AWS.SimpleQueueService.TooManyEntriesInBatchRequest'
+        elif size > self.MAX_BATCH_BYTES:
+            code = 'AWS.SimpleQueueService.BatchRequestTooLong'
+        else:
+            code = None
+        if code:
+            raise ClientError({'Error': {'Code': code, 'Message': f'{len(Entries)} entries, {size} bytes'}},
+                              'SendMessageBatch')
+        for entry in Entries:
+            self.messages.append({
+                'messageId': str(uuid.uuid4()),
+                'body': entry['MessageBody'],
+                'attributes': {'ApproximateReceiveCount': '0'}
+            })
+        return {'Successful': [{'Id': entry['Id']} for entry in Entries], 'Failed': []}
+
+    def receive(self, max_messages=10):
+        records, self.messages = self.messages[:max_messages], self.messages[max_messages:]
+        for record in records:
+            attributes = record['attributes']
+            attributes['ApproximateReceiveCount'] = str(int(attributes['ApproximateReceiveCount']) + 1)
+        return records
+
+    def complete(self, records, batch_item_failures, max_receive_count=5):
+        failed_ids = {failure['itemIdentifier'] for failure in batch_item_failures}
+        for record in records:
+            if record['messageId'] not in failed_ids:
+                continue
+            if int(record['attributes']['ApproximateReceiveCount']) >= max_receive_count:
+                self.dead_letters.append(record)
+            else:
+                self.messages.append(record)
+
+
+def install_fake_boto3(resource, queue=None):
+    """Make `import boto3` inside the handlers return the in-memory resource.
+
+    boto3.client('sqs') returns `queue` (an InMemoryQueue) when given.
+    """
+    fake = types.ModuleType('boto3')
+    fake.resource = lambda service_name, *args, **kwargs: resource
+    fake.client = lambda service_name, *args, **kwargs: queue if queue is not None else InMemoryQueue()
+    sys.modules['boto3'] = fake
+
+    try:
+        import botocore.exceptions  # noqa: F401
+    except ImportError:
+        class ClientError(Exception):
+            def __init__(self, error_response, operation_name):
+                super().__init__(error_response['Error']['Code'])
+                self.response = error_response
+                self.operation_name = operation_name
+
+        botocore = types.ModuleType('botocore')
+        botocore.exceptions = types.ModuleType('botocore.exceptions')
+        botocore.exceptions.ClientError = ClientError
+        sys.modules['botocore'] = botocore
+        sys.modules['botocore.exceptions'] = botocore.exceptions
+    return fake
+
+
+def import_lambda_module(module_name):
+    """Import a shared module (e.g. `cache`) the way the handlers do."""
+    if LAMBDA_DIR not in sys.path:
+        sys.path.insert(0, LAMBDA_DIR)
+    return importlib.import_module(module_name)
+
+
+def load_handler(module_name):
+    """Load a fresh copy of a handler module from the lambda directory."""
+    if LAMBDA_DIR not in sys.path:
+        sys.path.insert(0, LAMBDA_DIR)
+    spec = importlib.util.spec_from_file_location(
+        f'bench_{module_name}', os.path.join(LAMBDA_DIR, f'{module_name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def sample_pokemon(index):
+    return {
+        'id': str(uuid.UUID(int=index + 1)),
+        'name': f'Pokemon{index + 1}',
+        'type': POKEMON_TYPES[index % len(POKEMON_TYPES)],
+        'level': index % 100 + 1,
+        'hp': 40 + index % 60,
+        'image': f'https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/{index + 1}.png',
+        'pokedexNumber': index + 1
+    }
+
+
+def seed(table, count):
+    for index in range(count):
+        table.items[(str(uuid.UUID(int=index + 1)),)] = _to_dynamo(sample_pokemon(index))
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[rank]
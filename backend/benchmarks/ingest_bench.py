@@ -0,0 +1,102 @@
+"""
+Benchmark draining a burst of queued Pokemon creates.
+
+Enqueues a partner import of fully populated Pokemon through the
+enqueue_pokemon handler into the in-memory queue, which enforces the SQS
+batch size limits. The ingest_pokemon consumer then drains it into a table
+limited to a fixed write capacity, on a simulated clock so that no real
+time is spent sleeping. The drain is run with the adaptive rate limiter
+and with plain retry backoff. For each run the benchmark reports drain
+time, throughput, BatchWriteItem calls and throttled writes.
+
+Usage (from the backend directory):
+    python3 -m benchmarks.ingest_bench --pokemon 5000 --write-capacity 2000
+"""
+
+import argparse
+import json
+import types
+
+from benchmarks.harness import (
+    InMemoryDynamoDB, InMemoryQueue, VirtualClock, import_lambda_module, install_fake_boto3, load_handler
+)
+
+SPRITE_URL = 'https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/other/official-artwork'
+
+
+def enqueue(handler, count, request_size):
+    for start in range(0, count, request_size):
+        body = [
+            {'name': f'Import{index}', 'type': 'Water', 'secondary_type': 'Ice', 'level': 30,
+             'hp': 44, 'attack': 48, 'defense': 65, 'speed': 43, 'abilities': ['torrent', 'rain-dish'],
+             'trainer_id': f'partner-{index % 100:03d}', 'gender': 'Male', 'nature': 'Modest',
+             'experience': 12000, 'moves': ['Surf', 'Ice Beam', 'Protect', 'Scald'],
+             'image': f'{SPRITE_URL}/{index % 1025 + 1}.png', 'pokedexNumber': index % 1025 + 1}
+            for index in range(start, min(count, start + request_size))
+        ]
+        response = handler.lambda_handler({'body': json.dumps(body)}, None)
+        if response['statusCode'] != 202:
+            raise RuntimeError(f"enqueue failed: {response['body']}")
+
+
+def run(mode, args):
+    clock = VirtualClock()
+    resource = InMemoryDynamoDB()
+    queue = InMemoryQueue()
+    install_fake_boto3(resource, queue)
+
+    # Retry backoff and rate limiting sleep on the simulated clock
+    dynamo_batch = import_lambda_module('dynamo_batch')
+    dynamo_batch.time = types.SimpleNamespace(sleep=clock.sleep, monotonic=clock.now)
+
+    enqueue(load_handler('enqueue_pokemon'), args.pokemon, args.request_size)
+
+    consumer = load_handler('ingest_pokemon')
+    consumer.limiter = (
+        dynamo_batch.AdaptiveRateLimiter(initial_rate=args.write_capacity / 4, clock=clock.now, sleep=clock.sleep)
+        if mode == 'adaptive' else None
+    )
+    client = resource.meta.client
+    client.set_write_capacity(args.write_capacity, clock)
+    client.calls = 0
+
+    invocations = 0
+    while queue.messages:
+        records = queue.receive(args.batch_size)
+        response = consumer.lambda_handler({'Records': records}, None)
+        queue.complete(records, response['batchItemFailures'])
+        invocations += 1
+        clock.sleep(args.invoke_overhead_ms / 1000)
+
+    written = len(resource.Table('PokemonTable').items)
+    return {
+        'mode': mode,
+        'seconds': clock.now(),
+        'written': written,
+        'per_second': written / clock.now() if clock.now() else 0.0,
+        'calls': client.calls,
+        'throttled': client.throttled_writes,
+        'dead_letters': len(queue.dead_letters),
+        'invocations': invocations
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--pokemon', type=int, default=5000)
+    parser.add_argument('--request-size', type=int, default=500, help='Pokemon per enqueue request')
+    parser.add_argument('--write-capacity', type=float, default=2000.0, help='table writes per second')
+    parser.add_argument('--batch-size', type=int, default=10, help='SQS messages per consumer invocation')
+    parser.add_argument('--invoke-overhead-ms', type=float, default=20.0)
+    args = parser.parse_args(argv)
+
+    print(f'{args.pokemon} Pokemon (+6 stat rows each) into a table with {args.write_capacity:.0f} writes/s')
+    print(f"{'mode':<10}{'drain s':>10}{'pokemon/s':>12}{'batch calls':>13}{'throttled':>11}{'DLQ msgs':>10}")
+    for mode in ('adaptive', 'backoff'):
+        result = run(mode, args)
+        print(f"{result['mode']:<10}{result['seconds']:>10.2f}{result['per_second']:>12.1f}"
+              f"{result['calls']:>13}{result['throttled']:>11}{result['dead_letters']:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+"""
+Local power-tuning harness for the Lambda handlers.
+
+Replays each handler against the in-memory table, then projects the measured
+CPU time onto a range of Lambda memory sizes and architectures. Lambda hands
+out CPU in proportion to memory (one full vCPU at 1769 MB), and the handlers
+are single threaded, so anything above one vCPU only adds cost. DynamoDB
+round trips are modelled as a fixed latency that does not scale with memory.
+Cold starts are not modelled.
+
+Timings are only measured on the machine running the harness. Projecting
+them onto arm64 needs --arm-cpu-factor: arm64 CPU time relative to that
+machine, measured by running the same replay on Graviton. Without it only
+x86_64 is projected, since arm64 would otherwise win on price alone.
+
+For every route the harness prints p50/p99 and cost per million requests, and
+recommends the cheapest configuration that meets the p99 target. The final
+JSON block can be pasted into lambda_profiles.json.
+
+Usage (from the backend directory):
+    python3 -m benchmarks.power_tuning --items 1000 --p99-target-ms 60
+    python3 -m benchmarks.power_tuning --architectures arm64,x86_64 --arm-cpu-factor 1.2
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+
+from benchmarks.harness import (
+    InMemoryDynamoDB, install_fake_boto3, load_handler, percentile, sample_pokemon, seed
+)
+
+FULL_VCPU_MB = 1769
+
+# USD, us-east-1
+PRICE_PER_GB_SECOND = {'x86_64': 0.0000166667, 'arm64': 0.0000133334}
+PRICE_PER_REQUEST = 0.0000002
+
+
+def build_events(route, item_ids):
+    """Yield an endless sequence of API Gateway events for a route."""
+    body = json.dumps({'name': 'Benchmon', 'type': 'Fire', 'image': '', 'pokedexNumber': 1})
+    index = 0
+    while True:
+        pokemon_id = item_ids[index % len(item_ids)]
+        index += 1
+        if route == 'get_pokemons':
+            yield {'httpMethod': 'GET', 'pathParameters': None}
+        elif route == 'get_pokemon':
+            yield {'httpMethod': 'GET', 'pathParameters': {'id': pokemon_id}}
+        elif route == 'create_pokemon':
+            yield {'httpMethod': 'POST', 'body': body}
+        elif route == 'update_pokemon':
+            yield {'httpMethod': 'PUT', 'pathParameters': {'id': pokemon_id}, 'body': body}
+        elif route == 'delete_pokemon':
+            yield {'httpMethod': 'DELETE', 'pathParameters': {'id': pokemon_id}}
+
+
+def replay(route, resource, item_count, invocations):
+    """Run a handler and return per-invocation (cpu_ms, dynamodb_calls) samples."""
+    table = resource.Table('PokemonTable')
+    table.items.clear()
+    seed(table, item_count)
+    item_ids = [key[0] for key in table.items]
+
+    handler = load_handler(route)
+    events = build_events(route, item_ids)
+
+    # Warm up so import-time and first-call costs do not skew the samples
+    for _ in range(min(10, invocations)):
+        handler.lambda_handler(next(events), None)
+
+    samples = []
+    for index in range(invocations):
+        event = next(events)
+        resource.reset_calls()
+        start = time.perf_counter()
+        response = handler.lambda_handler(event, None)
+        cpu_ms = (time.perf_counter() - start) * 1000
+        if response['statusCode'] >= 500:
+            raise RuntimeError(f"{route} failed during replay: {response['body']}")
+        samples.append((cpu_ms, resource.calls))
+
+        # Keep the table size stable for the next delete/create
+        if route == 'delete_pokemon':
+            table.put_item(Item={**sample_pokemon(index), 'id': event['pathParameters']['id']})
+        elif route == 'create_pokemon' and len(table.items) > item_count:
+            table.items.pop(next(reversed(table.items)))
+    return samples
+
+
+def project(samples, memory_mb, architecture, io_ms, arm_cpu_factor):
+    """Project local samples onto one memory/architecture budget."""
+    cpu_scale = max(1.0, FULL_VCPU_MB / memory_mb)
+    if architecture == 'arm64':
+        cpu_scale *= arm_cpu_factor
+
+    durations = [cpu_ms * cpu_scale + calls * io_ms for cpu_ms, calls in samples]
+    gb = memory_mb / 1024
+    costs = [
+        math.ceil(duration) / 1000 * gb * PRICE_PER_GB_SECOND[architecture] + PRICE_PER_REQUEST
+        for duration in durations
+    ]
+    return {
+        'memory_size': memory_mb,
+        'architecture': architecture,
+        'p50_ms': percentile(durations, 50),
+        'p99_ms': percentile(durations, 99),
+        'cost_per_million': sum(costs) / len(costs) * 1_000_000
+    }
+
+
+def recommend(results, p99_target_ms):
+    """Cheapest result meeting the p99 target, else the lowest p99."""
+    within_target = [result for result in results if result['p99_ms'] <= p99_target_ms]
+    if within_target:
+        return min(within_target, key=lambda result: (result['cost_per_million'], result['p99_ms']))
+    return min(results, key=lambda result: (result['p99_ms'], result['cost_per_million']))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--routes', default='get_pokemons,get_pokemon,create_pokemon,update_pokemon,delete_pokemon')
+    parser.add_argument('--items', type=int, default=500, help='items seeded into the table')
+    parser.add_argument('--invocations', type=int, default=200)
+    parser.add_argument('--memory', default='128,256,512,1024,1769,3008', help='memory sizes in MB')
+    parser.add_argument('--architectures', default='x86_64')
+    parser.add_argument('--io-ms', type=float, default=4.0, help='simulated latency per DynamoDB call')
+    parser.add_argument('--arm-cpu-factor', type=float,
+                        help='measured arm64 CPU time relative to the machine running the benchmark')
+    parser.add_argument('--p99-target-ms', type=float, default=50.0)
+    args = parser.parse_args(argv)
+    if 'arm64' in args.architectures.split(',') and args.arm_cpu_factor is None:
+        parser.error('arm64 needs --arm-cpu-factor, measured by replaying the handlers on Graviton')
+
+    resource = InMemoryDynamoDB()
+    install_fake_boto3(resource)
+
+    memory_sizes = [int(size) for size in args.memory.split(',')]
+    architectures = args.architectures.split(',')
+    profiles = {}
+
+    print(f'Python {sys.version.split()[0]}, {args.items} items, {args.invocations} invocations per route')
+    for route in args.routes.split(','):
+        samples = replay(route, resource, args.items, args.invocations)
+        results = [
+            project(samples, memory_mb, architecture, args.io_ms, args.arm_cpu_factor)
+            for architecture in architectures
+            for memory_mb in memory_sizes
+        ]
+        best = recommend(results, args.p99_target_ms)
+
+        print(f'\n{route}')
+        print(f"  {'arch':<8}{'memory':>8}{'p50 ms':>10}{'p99 ms':>10}{'$/1M req':>12}")
+        for result in results:
+            marker = '  <- recommended' if result is best else ''
+            print(f"  {result['architecture']:<8}{result['memory_size']:>8}"
+                  f"{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+                  f"{result['cost_per_million']:>12.4f}{marker}")
+        profiles[route] = {'architecture': best['architecture'], 'memory_size': best['memory_size']}
+
+    print('\nSuggested "functions" entries for lambda_profiles.json:')
+    print(json.dumps(profiles, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+Benchmark trainer roster reads with and without the single-table layout.
+
+Seeds trainers with teams of Pokemon (plus six stat rows each) and unowned
+Pokemon into the per-entity tables. It backfills PokemonTrainerTable with
+migrate_single_table.py, then serves `GET /trainers/{id}/roster` both ways:
+
+* tables: a filtered scan of PokemonTable plus one stats query per Pokemon;
+* single table: one Query on the TRAINER#<id> partition.
+
+Each DynamoDB call costs --io-ms of simulated latency. The benchmark
+reports round trips and latency per roster, checks that both layouts
+return the same rosters, and counts the extra round trips that mirroring
+costs the write handlers.
+
+Usage (from the backend directory):
+    python3 -m benchmarks.roster_bench --trainers 200 --team-size 6 --unowned 1000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+from benchmarks.harness import (
+    InMemoryDynamoDB, _to_dynamo, install_fake_boto3, load_handler, percentile, sample_pokemon
+)
+
+TRAINER_TABLE = 'PokemonTrainerTable'
+STAT_NAMES = ('hp', 'attack', 'defense', 'sp_attack', 'sp_defense', 'speed')
+
+
+def trainer_id(index):
+    return f'trainer-{index:05d}'
+
+
+def seed_tables(resource, trainers, team_size, unowned):
+    pokemon_table = resource.Table('PokemonTable')
+    stats_table = resource.Table('PokemonStatsTable')
+    for index in range(trainers * team_size + unowned):
+        pokemon = sample_pokemon(index)
+        if index < trainers * team_size:
+            pokemon['trainer_id'] = trainer_id(index // team_size)
+        pokemon_table.items[(pokemon['id'],)] = _to_dynamo(pokemon)
+        for offset, stat_name in enumerate(STAT_NAMES):
+            row = {'pokemon_id': pokemon['id'], 'stat_name': stat_name,
+                   'base_value': 40 + (index + offset) % 60, 'iv': index % 32, 'ev': 0, 'modifier': 0}
+            stats_table.items[(pokemon['id'], stat_name)] = _to_dynamo(row)
+
+
+def load_layout(single_table, module_name):
+    """Load a handler with TRAINER_TABLE_NAME set or unset."""
+    if single_table:
+        os.environ['TRAINER_TABLE_NAME'] = TRAINER_TABLE
+    else:
+        os.environ.pop('TRAINER_TABLE_NAME', None)
+    # trainer_table reads TRAINER_TABLE_NAME at import
+    sys.modules.pop('trainer_table', None)
+    return load_handler(module_name)
+
+
+def read_rosters(resource, handler, trainers, requests, seed_value):
+    rng = random.Random(seed_value)
+    latencies = []
+    round_trips = []
+    rosters = {}
+    for _ in range(requests):
+        trainer = trainer_id(rng.randrange(trainers))
+        resource.reset_calls()
+        start = time.perf_counter()
+        response = handler.lambda_handler({'pathParameters': {'id': trainer}}, None)
+        latencies.append((time.perf_counter() - start) * 1000)
+        round_trips.append(resource.calls)
+        if response['statusCode'] != 200:
+            raise RuntimeError(f"Roster for {trainer} failed: {response['body']}")
+        rosters[trainer] = json.loads(response['body'])
+    return latencies, round_trips, rosters
+
+
+def normalize(roster):
+    return sorted((pokemon['id'], sorted(pokemon['stats'])) for pokemon in roster['pokemons'])
+
+
+def write_round_trips(resource, single_table, trainers):
+    """Round trips for one create, update (with a trainer change) and delete."""
+    handlers = {name: load_layout(single_table, name)
+                for name in ('create_pokemon', 'update_pokemon', 'delete_pokemon')}
+    body = {'name': 'Benchmon', 'type': 'Fire', 'trainer_id': trainer_id(0)}
+    calls = {}
+
+    resource.reset_calls()
+    response = handlers['create_pokemon'].lambda_handler({'body': json.dumps(body)}, None)
+    calls['create'] = resource.calls
+    pokemon_id = json.loads(response['body'])['id']
+
+    resource.reset_calls()
+    handlers['update_pokemon'].lambda_handler({
+        'pathParameters': {'id': pokemon_id},
+        'body': json.dumps({**body, 'trainer_id': trainer_id(trainers - 1)})
+    }, None)
+    calls['update'] = resource.calls
+
+    resource.reset_calls()
+    handlers['delete_pokemon'].lambda_handler({'pathParameters': {'id': pokemon_id}}, None)
+    calls['delete'] = resource.calls
+    return calls
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--trainers', type=int, default=200)
+    parser.add_argument('--team-size', type=int, default=6)
+    parser.add_argument('--unowned', type=int, default=1000, help='Pokemon without a trainer')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--io-ms', type=float, default=2.0, help='simulated latency per DynamoDB call')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args(argv)
+
+    resource = InMemoryDynamoDB()
+    install_fake_boto3(resource)
+    seed_tables(resource, args.trainers, args.team_size, args.unowned)
+
+    from migrate_single_table import migrate
+    summary = migrate(resource)
+    print(f"{summary['pokemon']} Pokemon across {summary['trainers']} trainers, "
+          f"migrated into {summary['written']} items with conditional puts")
+
+    resource.latency_ms = args.io_ms
+    for table in resource.tables.values():
+        table.latency_ms = args.io_ms
+
+    print(f"{'layout':<14}{'round trips':>12}{'p50 ms':>10}{'p99 ms':>10}")
+    results = {}
+    for layout in ('tables', 'single table'):
+        handler = load_layout(layout == 'single table', 'get_trainer_roster')
+        latencies, round_trips, rosters = read_rosters(resource, handler, args.trainers, args.requests, args.seed)
+        results[layout] = rosters
+        print(f"{layout:<14}{sum(round_trips) / len(round_trips):>12.1f}"
+              f"{percentile(latencies, 50):>10.2f}{percentile(latencies, 99):>10.2f}")
+
+    mismatched = [
+        trainer for trainer, roster in results['tables'].items()
+        if normalize(roster) != normalize(results['single table'][trainer])
+    ]
+    print(f'rosters identical: {not mismatched}' + (f' (differs for {mismatched[:3]})' if mismatched else ''))
+
+    print(f"\n{'writes':<14}{'create':>8}{'update':>8}{'delete':>8}  (round trips)")
+    for layout in ('tables', 'single table'):
+        calls = write_round_trips(resource, layout == 'single table', args.trainers)
+        print(f"{layout:<14}{calls['create']:>8}{calls['update']:>8}{calls['delete']:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+"""
+Simulate overload with and without admission control, as deployed.
+
+A discrete-event simulation of clients calling the API routes. Requests
+go through the API Gateway stage throttle (API_THROTTLE_RATE/BURST in
+app.py) and then to the route's Lambda function. Each function is a pool
+of containers that serve one request at a time. A request takes an idle
+warm container, or starts a new one (paying --cold-start-ms) up to
+--max-containers across the account. Handlers share a downstream
+(DynamoDB) with a fixed number of concurrent slots. Each route costs a
+multiple of --service-ms there. A request that finds no free slot is
+throttled. The SDK retries it for up to --retry-budget-ms, and if no slot
+frees up in that time the handler returns a 500. Load runs at 70% of
+downstream capacity, then jumps to an overload multiple, then drops back.
+One noisy client sends a large share of all traffic.
+
+With shedding, every container has its own TokenBucketLimiter and
+ConcurrencyLimiter from lambda/admission.py, with the deployed defaults
+(ADMISSION_RATE, ADMISSION_BURST, ADMISSION_MAX_CONCURRENCY). The
+concurrency limiter backs off on the 500s. Nothing is shared between
+containers. The noisy client's share of goodput therefore shows how little
+the per-container buckets limit one client. Per-client limits are enforced
+by API Gateway and the WAF rate-based rule, not here.
+
+Usage (from the backend directory):
+    python3 -m benchmarks.shedding_sim --overload 2.5
+"""
+
+import argparse
+import ast
+import heapq
+import itertools
+import os
+import random
+from collections import deque
+
+from benchmarks.harness import load_handler, percentile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# route -> (share of traffic, downstream cost in multiples of --service-ms)
+ROUTES = {
+    'get_pokemon': (0.6, 1),
+    'get_pokemons': (0.2, 4),
+    'create_pokemon': (0.1, 2),
+    'update_pokemon': (0.05, 2),
+    'delete_pokemon': (0.05, 3)
+}
+
+
+def deployed_admission():
+    """Load admission.py with its deployed defaults.
+
+    The harness raises the ADMISSION_* limits to keep admission control out
+    of the other benchmarks, so they are unset while the module loads.
+    """
+    overrides = {name: os.environ.pop(name) for name in list(os.environ) if name.startswith('ADMISSION_')}
+    try:
+        return load_handler('admission')
+    finally:
+        os.environ.update(overrides)
+
+
+def stage_throttle():
+    """Return the stage (rate, burst) that app.py deploys by default."""
+    with open(os.path.join(BACKEND_DIR, 'app.py')) as f:
+        tree = ast.parse(f.read())
+    constants = {
+        node.targets[0].id: ast.literal_eval(node.value)
+        for node in tree.body
+        if isinstance(node, ast.Assign) and isinstance(node.targets[0], ast.Name)
+        and node.targets[0].id in ('API_THROTTLE_RATE', 'API_THROTTLE_BURST')
+    }
+    return constants['API_THROTTLE_RATE'], constants['API_THROTTLE_BURST']
+
+
+class Container:
+    """One Lambda execution environment with its own admission state."""
+
+    def __init__(self, admission, clock, random_value):
+        self.rate_limiter = admission.TokenBucketLimiter(clock=clock)
+        self.concurrency_limiter = admission.ConcurrencyLimiter(random_value=random_value)
+
+
+def simulate(shedding, args):
+    admission = deployed_admission()
+    rng = random.Random(args.seed)
+    now = 0.0
+
+    def clock():
+        return now
+
+    stage_rate, stage_burst = stage_throttle()
+    stage_limiter = admission.TokenBucketLimiter(
+        rate=args.stage_rate or stage_rate, burst=args.stage_burst or stage_burst, clock=clock)
+    mean_units = sum(share * units for share, units in ROUTES.values())
+    capacity = args.slots / (args.service_ms * mean_units / 1000)
+    routes = list(ROUTES)
+    weights = [ROUTES[route][0] for route in routes]
+
+    sequence = itertools.count()
+    events = []
+
+    def schedule(at, kind, payload):
+        heapq.heappush(events, (at, next(sequence), kind, payload))
+
+    phases = [(args.phase_seconds, 0.7), (args.phase_seconds * 2, args.overload), (args.phase_seconds, 0.7)]
+    start = 0.0
+    for duration, load in phases:
+        t = start
+        while True:
+            t += rng.expovariate(capacity * load)
+            if t >= start + duration:
+                break
+            client = 0 if rng.random() < args.noisy_share else rng.randrange(1, args.clients)
+            schedule(t, 'arrive', (t, client, rng.choices(routes, weights)[0]))
+        start += duration
+
+    idle = {route: [] for route in routes}
+    containers = 0
+    downstream_queue = deque()
+    busy = 0
+    latencies = []
+    noisy_good = 0
+    counts = {'stage_429': 0, 'lambda_429': 0, 'admission_429': 0, 'throttled_500': 0, 'timed_out': 0,
+              'offered': 0}
+
+    def start_downstream(request):
+        nonlocal busy
+        busy += 1
+        request['waiting'] = False
+        units = ROUTES[request['route']][1]
+        schedule(now + rng.expovariate(1000 / (args.service_ms * units)), 'finish', request)
+
+    def call_downstream(request):
+        if busy < args.slots:
+            start_downstream(request)
+        else:
+            request['waiting'] = True
+            downstream_queue.append(request)
+            schedule(now + args.retry_budget_ms / 1000, 'throttle', request)
+
+    def done(request, overloaded):
+        if shedding:
+            request['container'].concurrency_limiter.release(overloaded)
+        idle[request['route']].append(request['container'])
+
+    while events:
+        now, _, kind, payload = heapq.heappop(events)
+        if kind == 'arrive':
+            arrived_at, client, route = payload
+            counts['offered'] += 1
+            if stage_limiter.try_acquire('stage'):
+                counts['stage_429'] += 1
+                continue
+            if idle[route]:
+                # Lambda reuses the most recently used warm container
+                schedule(now, 'begin', (arrived_at, client, route, idle[route].pop()))
+            elif containers < args.max_containers:
+                containers += 1
+                container = Container(admission, clock, rng.random)
+                schedule(now + args.cold_start_ms / 1000, 'begin', (arrived_at, client, route, container))
+            else:
+                counts['lambda_429'] += 1
+        elif kind == 'begin':
+            arrived_at, client, route, container = payload
+            if shedding and (container.rate_limiter.try_acquire(f'client-{client}')
+                             or not container.concurrency_limiter.try_acquire()):
+                counts['admission_429'] += 1
+                idle[route].append(container)
+                continue
+            call_downstream({'arrived_at': arrived_at, 'client': client, 'route': route, 'container': container})
+        elif kind == 'throttle':
+            request = payload
+            if request['waiting']:
+                # Out of SDK retries: the handler answers 500
+                request['waiting'] = False
+                downstream_queue.remove(request)
+                counts['throttled_500'] += 1
+                done(request, overloaded=True)
+        else:
+            busy -= 1
+            request = payload
+            latency_ms = (now - request['arrived_at']) * 1000
+            latencies.append(latency_ms)
+            if latency_ms > args.timeout_ms:
+                counts['timed_out'] += 1
+            elif request['client'] == 0:
+                noisy_good += 1
+            done(request, overloaded=False)
+            if downstream_queue:
+                start_downstream(downstream_queue.popleft())
+
+    total_seconds = sum(duration for duration, _ in phases)
+    good = len(latencies) - counts['timed_out']
+    return {
+        'capacity': capacity,
+        'goodput': good / total_seconds,
+        'p50': percentile(latencies, 50),
+        'p99': percentile(latencies, 99),
+        'noisy_share': noisy_good / good if good else 0.0,
+        'containers': containers,
+        **counts
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--slots', type=int, default=4, help='concurrent downstream requests')
+    parser.add_argument('--service-ms', type=float, default=10.0, help='mean downstream time of a single-item read')
+    parser.add_argument('--overload', type=float, default=2.5, help='offered load during overload, x capacity')
+    parser.add_argument('--phase-seconds', type=float, default=10.0)
+    parser.add_argument('--clients', type=int, default=20)
+    parser.add_argument('--noisy-share', type=float, default=0.4, help='share of traffic from one client')
+    parser.add_argument('--max-containers', type=int, default=1000, help='account concurrency limit')
+    parser.add_argument('--cold-start-ms', type=float, default=250.0)
+    parser.add_argument('--stage-rate', type=float, help='stage throttle, default from app.py')
+    parser.add_argument('--stage-burst', type=float, help='stage burst, default from app.py')
+    parser.add_argument('--retry-budget-ms', type=float, default=200.0,
+                        help='how long SDK retries wait for a throttled request')
+    parser.add_argument('--timeout-ms', type=float, default=1000.0, help='client timeout')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args(argv)
+
+    results = [(label, simulate(shedding, args)) for label, shedding in
+               (('no shedding', False), ('shedding', True))]
+    print(f"downstream capacity {results[0][1]['capacity']:.0f} req/s, overload {args.overload}x, "
+          f"client timeout {args.timeout_ms:.0f} ms, retry budget {args.retry_budget_ms:.0f} ms")
+    print(f"{'mode':<12}{'goodput/s':>11}{'p50 ms':>10}{'p99 ms':>10}{'429s':>8}{'stage 429s':>12}"
+          f"{'500s':>8}{'timed out':>11}{'containers':>12}{'noisy share':>13}")
+    for label, result in results:
+        print(f"{label:<12}{result['goodput']:>11.1f}{result['p50']:>10.1f}{result['p99']:>10.1f}"
+              f"{result['admission_429'] + result['lambda_429']:>8}{result['stage_429']:>12}"
+              f"{result['throttled_500']:>8}{result['timed_out']:>11}{result['containers']:>12}"
+              f"{result['noisy_share']:>13.0%}")
+    print(f'noisy client offered share: {args.noisy_share:.0%}')
+
+
+if __name__ == '__main__':
+    main()
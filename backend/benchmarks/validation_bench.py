@@ -0,0 +1,121 @@
+"""
+Benchmark the cost of request validation per request.
+
+Compares the compiled validators in lambda/validation.py with an
+interpretive validator that walks POKEMON_SCHEMA on every request, for a
+minimal payload, a full payload and an invalid payload. Both apply the same
+coercions and rules, and the benchmark checks they agree on every payload
+before timing them.
+
+Usage (from the backend directory):
+    python3 -m benchmarks.validation_bench --iterations 100000
+"""
+
+import argparse
+import timeit
+
+from benchmarks.harness import import_lambda_module
+
+PAYLOADS = {
+    'minimal': {'name': 'Pikachu', 'type': 'Electric'},
+    'full': {
+        'name': 'Charizard', 'type': 'Fire', 'secondary_type': 'Flying', 'level': '36', 'hp': 78,
+        'attack': 84, 'defense': 78, 'speed': 100, 'abilities': ['blaze'], 'trainer_id': 'ash',
+        'is_shiny': False, 'gender': 'Male', 'nature': 'Adamant', 'experience': 12000,
+        'moves': ['Flamethrower', 'Fly'], 'image': '', 'pokedexNumber': 6
+    },
+    'invalid': {'name': '', 'type': 'Fire', 'level': 'high', 'hp': -1, 'gender': 'X'}
+}
+
+
+def check_rules(value, rules):
+    if rules.get('integer') and not isinstance(value, int):
+        raise ValueError('must be an integer')
+    if 'min' in rules and value < rules['min']:
+        raise ValueError(f"must be at least {rules['min']}")
+    if 'max' in rules and value > rules['max']:
+        raise ValueError(f"must be at most {rules['max']}")
+    unit = 'characters' if isinstance(value, str) else 'items'
+    if 'min_length' in rules and len(value) < rules['min_length']:
+        raise ValueError(f"must have at least {rules['min_length']} {unit}")
+    if 'max_length' in rules and len(value) > rules['max_length']:
+        raise ValueError(f"must have at most {rules['max_length']} {unit}")
+    if 'enum' in rules and value not in rules['enum']:
+        raise ValueError(f"must be one of: {', '.join(rules['enum'])}")
+    return value
+
+
+def interpretive_validate(validation, schema, data, partial=False):
+    """Reference validator that re-reads the schema for every request.
+
+    It applies the same coercions and rules as the compiled validators, with
+    the same messages, so the two differ only in how the rules are dispatched.
+    """
+    if not isinstance(data, dict):
+        raise validation.ValidationError({'body': 'must be a JSON object'})
+    skipped = set(schema.get('server_managed', [])) | {schema['partition_key']}
+    constraints = schema.get('constraints', {})
+    cleaned = {}
+    errors = {}
+    for name, value in data.items():
+        attribute_type = schema['attributes'].get(name)
+        if attribute_type is None or name in skipped or value is None:
+            continue
+        rules = constraints.get(name, {})
+        try:
+            value = validation.COERCERS[attribute_type](value)
+            if 'items' in rules:
+                item_rules = rules['items'] if isinstance(rules['items'], dict) else {'type': rules['items']}
+                items = []
+                for index, item in enumerate(value):
+                    try:
+                        items.append(check_rules(validation.COERCERS[item_rules['type']](item), item_rules))
+                    except ValueError as e:
+                        raise ValueError(f'item {index} {e}') from None
+                value = items
+            cleaned[name] = check_rules(value, rules)
+        except ValueError as e:
+            errors[name] = str(e)
+    if not partial:
+        for name in schema.get('required', []):
+            if name not in cleaned and name not in errors:
+                errors[name] = 'is required'
+    if errors:
+        raise validation.ValidationError(errors)
+    return cleaned
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--iterations', type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    validation = import_lambda_module('validation')
+    schema = import_lambda_module('schema').POKEMON_SCHEMA
+
+    def run(validate, payload):
+        try:
+            return validate(payload)
+        except validation.ValidationError as e:
+            return e.errors
+
+    def compiled(payload):
+        return run(validation.validate_pokemon, payload)
+
+    def interpretive(payload):
+        return run(lambda data: interpretive_validate(validation, schema, data), payload)
+
+    for label, payload in PAYLOADS.items():
+        if compiled(payload) != interpretive(payload):
+            raise RuntimeError(f'Validators disagree on the {label} payload')
+
+    print(f"{'payload':<10}{'compiled us':>14}{'interpretive us':>18}")
+    for label, payload in PAYLOADS.items():
+        compiled_us = timeit.timeit(lambda: compiled(payload), number=args.iterations) / args.iterations * 1e6
+        interpretive_us = timeit.timeit(
+            lambda: interpretive(payload), number=args.iterations) / args.iterations * 1e6
+        print(f'{label:<10}{compiled_us:>14.2f}{interpretive_us:>18.2f}')
+
+
+if __name__ == '__main__':
+    main()
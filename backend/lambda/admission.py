@@ -0,0 +1,159 @@
+"""
+Admission control for the API handlers.
+
+Requests are rejected with a fast 429 and Retry-After, before any DynamoDB
+call, when either:
+
+* the caller's token bucket is empty. Callers are identified by the API
+  key API Gateway validated, else by source IP. Each bucket refills at
+  ADMISSION_RATE tokens per second, up to ADMISSION_BURST.
+* the concurrency limit is reached. The limit shrinks multiplicatively,
+  at most once per window of `limit` requests, when a handler fails with
+  a 5xx, which is how DynamoDB throttling that outlasted the SDK's retries
+  surfaces. Every other response grows it additively. A Lambda container
+  serves one request at a time, so a limit below one is applied as the
+  probability of admitting the next request. Admitted requests keep
+  probing the downstream, so the limit recovers once it stops failing.
+
+Handler latency is not used as a signal: a container only sees its own
+requests, and a route's normal latency says nothing about load.
+Throttles and 5xx come from the shared downstream, so every container
+backs off when it is overloaded.
+
+Buckets and limits are per container and nothing is shared between
+containers. Lambda spreads a client's requests over every warm container,
+so the buckets are only a backstop. Per-client limits are enforced in
+front of the handlers by BackendStack: the API Gateway stage throttle, the
+partner usage plan for API keys and a WAF rate-based rule per source IP.
+benchmarks/shedding_sim.py models this deployment.
+"""
+
+import functools
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+
+RATE_PER_SECOND = float(os.environ.get('ADMISSION_RATE', '50'))
+BURST = float(os.environ.get('ADMISSION_BURST', '100'))
+MAX_CONCURRENCY = float(os.environ.get('ADMISSION_MAX_CONCURRENCY', '1'))
+MAX_TRACKED_CLIENTS = 10000
+
+
+class TokenBucketLimiter:
+    """One token bucket per client key, evicting the least recently seen."""
+
+    def __init__(self, rate=RATE_PER_SECOND, burst=BURST, max_clients=MAX_TRACKED_CLIENTS, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._clock = clock
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, client_key):
+        """Return 0 if admitted, else the seconds until a token is available."""
+        now = self._clock()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(client_key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+            if tokens >= 1:
+                self._buckets[client_key] = (tokens - 1, now)
+                wait = 0.0
+            else:
+                self._buckets[client_key] = (tokens, now)
+                wait = (1 - tokens) / self.rate
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class ConcurrencyLimiter:
+    """Additive-increase/multiplicative-decrease limit on requests in flight.
+
+    release() is told whether the request failed because the downstream
+    is overloaded.
+    """
+
+    def __init__(self, initial_limit=MAX_CONCURRENCY, min_limit=0.05, max_limit=MAX_CONCURRENCY,
+                 backoff_ratio=0.9, random_value=random.random):
+        self.limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.inflight = 0
+        self._since_decrease = 0
+        self._random = random_value
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        with self._lock:
+            if self.inflight + 1 <= self.limit or (self.inflight == 0 and self._random() < self.limit):
+                self.inflight += 1
+                return True
+            return False
+
+    def release(self, overloaded=False):
+        with self._lock:
+            self.inflight -= 1
+            self._since_decrease += 1
+            if overloaded:
+                if self._since_decrease >= self.limit:
+                    self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+                    self._since_decrease = 0
+            else:
+                step = 1 / self.limit if self.limit >= 1 else 0.1
+                self.limit = min(self.max_limit, self.limit + step)
+
+
+def client_key(event):
+    """Identify the caller by API key, falling back to source IP.
+
+    Only the key API Gateway validated (requestContext.identity.apiKey) is
+    used. The raw x-api-key header is not, since a caller could send a new
+    value with every request to get a fresh bucket.
+    """
+    identity = (event.get('requestContext') or {}).get('identity') or {}
+    api_key = identity.get('apiKey')
+    if api_key:
+        return f'key:{api_key}'
+    return f"ip:{identity.get('sourceIp', 'unknown')}"
+
+
+def too_many_requests(retry_after_seconds):
+    return {
+        'statusCode': 429,
+        'headers': {
+            'Access-Control-Allow-Origin': '*',
+            'Retry-After': str(max(1, math.ceil(retry_after_seconds)))
+        },
+        'body': json.dumps({'error': 'Too many requests'})
+    }
+
+
+rate_limiter = TokenBucketLimiter()
+concurrency_limiter = ConcurrencyLimiter()
+
+
+def admission_controlled(handler):
+    """Decorate a lambda_handler with per-client rate limiting and load shedding."""
+
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        wait = rate_limiter.try_acquire(client_key(event))
+        if wait:
+            return too_many_requests(wait)
+        if not concurrency_limiter.try_acquire():
+            return too_many_requests(1)
+
+        response = None
+        try:
+            response = handler(event, context)
+            return response
+        finally:
+            concurrency_limiter.release(response is None or response.get('statusCode', 200) >= 500)
+
+    return wrapper
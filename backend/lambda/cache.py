@@ -0,0 +1,286 @@
+"""
+Optional shared cache tier for Pokemon reads.
+
+Lambda containers do not share memory, so each one would otherwise scan
+DynamoDB for the same popular list. When CACHE_ENDPOINT is set, item and
+list reads go through a shared Redis-compatible cache:
+
+    CACHE_ENDPOINT=redis://host:6379   ElastiCache / any Redis-compatible server
+    CACHE_ENDPOINT=memory://           in-process stand-in (local dev, benchmarks)
+
+Writes invalidate rather than store: they give the item a new version
+token, delete its entry and bump the list generation, which moves list
+reads to a fresh key. On a miss only the caller holding a short lease
+reloads from DynamoDB; the others wait briefly for the refreshed value.
+This stops a stampede on a hot key. A reloaded value is stored only if the
+key is still empty and its version token is the one read before loading
+(one atomic script on Redis). A reader that loaded before a write can
+therefore never cache what it read, and concurrent writers have no value
+to race over. Any cache error is treated as a miss, so the cache can never
+fail a request.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+
+CACHE_TTL_SECONDS = int(os.environ.get('CACHE_TTL_SECONDS', '300'))
+LIST_TTL_SECONDS = int(os.environ.get('CACHE_LIST_TTL_SECONDS', '60'))
+LEASE_TTL_SECONDS = 5
+LEASE_WAIT_SECONDS = 0.5
+LEASE_POLL_SECONDS = 0.01
+
+LIST_KEY = 'pokemons:list'
+LIST_GENERATION_KEY = 'pokemons:list:generation'
+
+
+def item_key(pokemon_id):
+    return f'pokemon:{pokemon_id}'
+
+
+def version_key(key):
+    return f'{key}:version'
+
+
+class InMemoryCache:
+    """Pure-Python stand-in implementing the same interface as RedisCache."""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                self._entries.pop(key, None)
+                return None
+        return json.loads(entry[0])
+
+    def set(self, key, value, ttl):
+        # Store serialized values, as Redis would, so callers cannot mutate them
+        entry = (json.dumps(value), time.monotonic() + ttl)
+        with self._lock:
+            self._entries[key] = entry
+
+    def add(self, key, value, ttl):
+        """Set key only if it is absent. Returns True when the key was set."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] >= time.monotonic():
+                return False
+            self._entries[key] = (json.dumps(value), time.monotonic() + ttl)
+            return True
+
+    def add_if_version(self, key, value, ttl, version):
+        """Like add, but only while version_key(key) still holds version (None: absent)."""
+        with self._lock:
+            current = self._entries.get(version_key(key))
+            if current is not None and current[1] < time.monotonic():
+                current = None
+            if (json.loads(current[0]) if current is not None else None) != version:
+                return False
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] >= time.monotonic():
+                return False
+            self._entries[key] = (json.dumps(value), time.monotonic() + ttl)
+            return True
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def delete_if_equal(self, key, value):
+        """Delete key only if it still holds value."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == json.dumps(value):
+                del self._entries[key]
+
+    def incr(self, key):
+        """Increment a counter that never expires; returns the new value."""
+        with self._lock:
+            entry = self._entries.get(key)
+            value = json.loads(entry[0]) + 1 if entry is not None else 1
+            self._entries[key] = (json.dumps(value), float('inf'))
+        return value
+
+    def record(self, hit):
+        """Count a read_through served from the cache (hit) or by its loader."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class RedisCache:
+    """Cache backed by a Redis-compatible server via redis-py."""
+
+    def __init__(self, url):
+        import redis
+        self._errors = (redis.RedisError,)
+        self._client = redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.5)
+        self._delete_if_equal = self._client.register_script(
+            "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+        )
+        # KEYS: entry, version; ARGV: value, ttl, expected version ('' when absent)
+        self._add_if_version = self._client.register_script(
+            "if (redis.call('get', KEYS[2]) or '') ~= ARGV[3] then return 0 end "
+            "if redis.call('set', KEYS[1], ARGV[1], 'EX', ARGV[2], 'NX') then return 1 end return 0"
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        try:
+            value = self._client.get(key)
+        except self._errors as e:
+            print(f'Cache get failed for {key}: {e}')
+            return None
+        return json.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl):
+        try:
+            self._client.set(key, json.dumps(value), ex=ttl)
+        except self._errors as e:
+            print(f'Cache set failed for {key}: {e}')
+
+    def add(self, key, value, ttl):
+        try:
+            return bool(self._client.set(key, json.dumps(value), ex=ttl, nx=True))
+        except self._errors as e:
+            print(f'Cache add failed for {key}: {e}')
+            return False
+
+    def add_if_version(self, key, value, ttl, version):
+        expected = json.dumps(version) if version is not None else ''
+        try:
+            return bool(self._add_if_version(keys=[key, version_key(key)], args=[json.dumps(value), ttl, expected]))
+        except self._errors as e:
+            print(f'Cache add failed for {key}: {e}')
+            return False
+
+    def delete(self, *keys):
+        try:
+            self._client.delete(*keys)
+        except self._errors as e:
+            print(f'Cache delete failed for {keys}: {e}')
+
+    def delete_if_equal(self, key, value):
+        try:
+            self._delete_if_equal(keys=[key], args=[json.dumps(value)])
+        except self._errors as e:
+            print(f'Cache delete failed for {key}: {e}')
+
+    def incr(self, key):
+        try:
+            return self._client.incr(key)
+        except self._errors as e:
+            print(f'Cache incr failed for {key}: {e}')
+            return None
+
+    def record(self, hit):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+
+_cache = None
+
+
+def get_cache():
+    """Return the cache configured by CACHE_ENDPOINT, or None when disabled."""
+    global _cache
+    endpoint = os.environ.get('CACHE_ENDPOINT')
+    if not endpoint:
+        return None
+    if _cache is None:
+        if endpoint.startswith('memory://'):
+            _cache = InMemoryCache()
+        else:
+            try:
+                _cache = RedisCache(endpoint)
+            except ImportError:
+                print('CACHE_ENDPOINT is set but redis is not installed; caching disabled')
+                return None
+    return _cache
+
+
+def read_through(cache, key, loader, ttl=CACHE_TTL_SECONDS):
+    """Return the cached value for key, loading and caching it on a miss.
+
+    loader() may return None (e.g. item not found), which is not cached.
+    The loaded value is only stored if no write invalidated key meanwhile.
+    """
+    if cache is None:
+        return loader()
+
+    lease_key = f'{key}:lease'
+    deadline = time.monotonic() + LEASE_WAIT_SECONDS
+    while True:
+        value = cache.get(key)
+        if value is not None:
+            cache.record(hit=True)
+            return value
+
+        lease = str(uuid.uuid4())
+        if cache.add(lease_key, lease, LEASE_TTL_SECONDS):
+            cache.record(hit=False)
+            # Read before loading, so a write during the load is detected
+            version = cache.get(version_key(key))
+            try:
+                value = loader()
+                if value is not None:
+                    cache.add_if_version(key, value, ttl, version)
+            finally:
+                # The lease may have expired and been taken by another caller
+                cache.delete_if_equal(lease_key, lease)
+            return value
+
+        # Another caller holds the lease and is reloading; wait for its result
+        if time.monotonic() >= deadline:
+            cache.record(hit=False)
+            return loader()
+        time.sleep(LEASE_POLL_SECONDS)
+
+
+def list_key(cache):
+    """Key of the current list entry; writers move it by bumping the generation."""
+    if cache is None:
+        return LIST_KEY
+    return f'{LIST_KEY}:{cache.get(LIST_GENERATION_KEY) or 0}'
+
+
+def bump_list_generation(cache):
+    """Retire the cached list, including any fill still in flight for it."""
+    if cache is None:
+        return
+    cache.incr(LIST_GENERATION_KEY)
+
+
+def invalidate(cache, pokemon_id):
+    """Drop a created, updated or deleted item and retire the list that contained it.
+
+    Call after the DynamoDB write. The new version token stops fills that
+    loaded before the write. It is set before the delete, so a fill stored
+    in between is removed too.
+    """
+    if cache is None:
+        return
+    key = item_key(pokemon_id)
+    # Outlives any fill in flight, which is bounded by the lease
+    cache.set(version_key(key), str(uuid.uuid4()), CACHE_TTL_SECONDS)
+    cache.delete(key)
+    bump_list_generation(cache)
@@ -1,23 +1,51 @@
 import json
 import boto3
 import uuid
+from cache import get_cache, invalidate
+from dynamo_batch import transact_write
+from pokemon_stats import STATS_TABLE_NAME, build_stat_rows
+from trainer_table import TRAINER_TABLE_NAME, pokemon_items
+from validation import ValidationError, error_response, parse_body, validate_pokemon
+from admission import admission_controlled
+from profiling import profiled
 
 dynamodb = boto3.resource('dynamodb')
 table = dynamodb.Table('PokemonTable')
+client = dynamodb.meta.client
+cache = get_cache()
 
+@profiled
+@admission_controlled
 def lambda_handler(event, context):
     try:
-        data = json.loads(event['body'])
+        body = parse_body(event)
+        data = validate_pokemon(body)
         
         pokemon = {
             'id': str(uuid.uuid4()),
-            'name': data['name'],
-            'type': data['type'],
-            'image': data.get('image', ''),
-            'pokedexNumber': data.get('pokedexNumber', 0)
+            'image': '',
+            'pokedexNumber': 0,
+            **data
         }
+        stat_rows = build_stat_rows(pokemon, body.get('stats'))
         
-        table.put_item(Item=pokemon)
+        # The Pokemon and its stat rows are written atomically in one round trip,
+        # together with their single-table copies when that layout is enabled
+        transact_items = [
+            {'Put': {
+                'TableName': table.name,
+                'Item': pokemon,
+                'ConditionExpression': 'attribute_not_exists(id)'
+            }},
+            *({'Put': {'TableName': STATS_TABLE_NAME, 'Item': row}} for row in stat_rows)
+        ]
+        if TRAINER_TABLE_NAME:
+            transact_items.extend(
+                {'Put': {'TableName': TRAINER_TABLE_NAME, 'Item': item}}
+                for item in pokemon_items(pokemon, stat_rows)
+            )
+        transact_write(client, transact_items)
+        invalidate(cache, pokemon['id'])
         
         return {
             'statusCode': 201,
@@ -28,6 +56,8 @@ def lambda_handler(event, context):
             },
             'body': json.dumps(pokemon)
         }
+    except ValidationError as e:
+        return error_response(e)
     except Exception as e:
         return {
             'statusCode': 500,
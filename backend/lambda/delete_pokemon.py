@@ -1,14 +1,37 @@
 import json
 import boto3
+from cache import get_cache, invalidate
+from dynamo_batch import batch_write
+from pokemon_stats import STATS_TABLE_NAME, query_stat_keys
+from trainer_table import TRAINER_TABLE_NAME, delete_requests
+from admission import admission_controlled
+from profiling import profiled
 
 dynamodb = boto3.resource('dynamodb')
 table = dynamodb.Table('PokemonTable')
+stats_table = dynamodb.Table(STATS_TABLE_NAME)
+trainer_table = dynamodb.Table(TRAINER_TABLE_NAME) if TRAINER_TABLE_NAME else None
+client = dynamodb.meta.client
+cache = get_cache()
 
+@profiled
+@admission_controlled
 def lambda_handler(event, context):
     try:
         pokemon_id = event['pathParameters']['id']
         
-        table.delete_item(Key={'id': pokemon_id})
+        # Remove the Pokemon and all of its stat rows in batched writes;
+        # anything left behind on failure is removed by stats_sweeper
+        stat_keys = query_stat_keys(stats_table, pokemon_id)
+        requests = {STATS_TABLE_NAME: [{'DeleteRequest': {'Key': key}} for key in stat_keys]}
+        if trainer_table is not None:
+            # The deleted item says which single-table partition to clean up
+            old_item = table.delete_item(Key={'id': pokemon_id}, ReturnValues='ALL_OLD').get('Attributes')
+            requests[TRAINER_TABLE_NAME] = delete_requests(trainer_table, pokemon_id, old_item)
+        else:
+            requests[table.name] = [{'DeleteRequest': {'Key': {'id': pokemon_id}}}]
+        batch_write(client, requests)
+        invalidate(cache, pokemon_id)
         
         return {
             'statusCode': 204,
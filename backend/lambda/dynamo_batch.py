@@ -0,0 +1,196 @@
+"""
+Batched and transactional DynamoDB writes with retries.
+
+Wraps TransactWriteItems, BatchWriteItem and BatchGetItem so that callers
+make a few round trips instead of one call per item. Unprocessed items and
+throttled or conflicting transactions are retried with exponential backoff
+and full jitter.
+
+All functions take the client attached to a boto3 DynamoDB resource
+(`dynamodb.meta.client`), which accepts and returns plain Python values.
+"""
+
+import random
+import time
+import uuid
+
+from botocore.exceptions import ClientError
+
+MAX_ATTEMPTS = 6
+BASE_DELAY_SECONDS = 0.05
+MAX_DELAY_SECONDS = 2.0
+
+BATCH_WRITE_LIMIT = 25
+BATCH_GET_LIMIT = 100
+
+RETRYABLE_ERRORS = {
+    'ProvisionedThroughputExceededException',
+    'ThrottlingException',
+    'RequestLimitExceeded',
+    'InternalServerError',
+    'TransactionInProgressException'
+}
+RETRYABLE_CANCELLATION_REASONS = {
+    'ThrottlingError',
+    'ProvisionedThroughputExceeded',
+    'TransactionConflict'
+}
+
+
+class BatchError(Exception):
+    """Raised when items are still unprocessed after every retry."""
+
+    def __init__(self, message, unprocessed):
+        super().__init__(message)
+        self.unprocessed = unprocessed
+
+
+class AdaptiveRateLimiter:
+    """Additive-increase/multiplicative-decrease limit on write requests per second.
+
+    acquire(n) blocks until n writes fit in the current rate. record() halves
+    the rate after a throttled call and adds `increase` after a clean one, so
+    sustained bursts settle just under the table's capacity.
+    """
+
+    def __init__(self, initial_rate=200.0, min_rate=10.0, max_rate=5000.0, increase=25.0,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self._clock = clock
+        self._sleep = sleep
+        self._next_send = clock()
+
+    def acquire(self, count):
+        now = self._clock()
+        if self._next_send > now:
+            self._sleep(self._next_send - now)
+            now = self._next_send
+        self._next_send = now + count / self.rate
+
+    def record(self, throttled):
+        if throttled:
+            self.rate = max(self.min_rate, self.rate / 2)
+        else:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+
+def backoff(attempt):
+    """Sleep before retry number `attempt` (1-based)."""
+    time.sleep(random.uniform(0, min(MAX_DELAY_SECONDS, BASE_DELAY_SECONDS * 2 ** attempt)))
+
+
+def is_retryable(error):
+    code = error.response['Error']['Code']
+    if code == 'TransactionCanceledException':
+        reasons = {reason.get('Code') for reason in error.response.get('CancellationReasons', [])}
+        reasons.discard('None')
+        return bool(reasons) and reasons <= RETRYABLE_CANCELLATION_REASONS
+    return code in RETRYABLE_ERRORS
+
+
+def transact_write(client, transact_items):
+    """Write up to 100 items atomically, retrying throttles and conflicts.
+
+    Every attempt carries the same ClientRequestToken, so if an attempt
+    committed but its response was lost, the retry succeeds instead of
+    failing its conditions against the items it wrote.
+    """
+    token = str(uuid.uuid4())
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            return client.transact_write_items(TransactItems=transact_items, ClientRequestToken=token)
+        except ClientError as e:
+            if attempt == MAX_ATTEMPTS or not is_retryable(e):
+                raise
+            backoff(attempt)
+
+
+def _chunks(requests, size):
+    for start in range(0, len(requests), size):
+        yield requests[start:start + size]
+
+
+def batch_write(client, request_items, limiter=None):
+    """Write {table_name: [WriteRequest, ...]} in groups of 25.
+
+    An AdaptiveRateLimiter, if given, paces every call and is told whether
+    it was throttled. Returns the number of BatchWriteItem calls made.
+    """
+    requests = [
+        (table_name, request)
+        for table_name, table_requests in request_items.items()
+        for request in table_requests
+    ]
+    calls = 0
+    for chunk in _chunks(requests, BATCH_WRITE_LIMIT):
+        pending = {}
+        for table_name, request in chunk:
+            pending.setdefault(table_name, []).append(request)
+
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            if limiter is not None:
+                limiter.acquire(sum(len(table_requests) for table_requests in pending.values()))
+            try:
+                response = client.batch_write_item(RequestItems=pending)
+                pending = response.get('UnprocessedItems') or {}
+                throttled = bool(pending)
+            except ClientError as e:
+                if attempt == MAX_ATTEMPTS or not is_retryable(e):
+                    raise
+                throttled = True
+            if limiter is not None:
+                limiter.record(throttled)
+            calls += 1
+            if not pending:
+                break
+            if attempt == MAX_ATTEMPTS:
+                raise BatchError('Items left unprocessed after retries', pending)
+            backoff(attempt)
+    return calls
+
+
+def batch_get(client, keys_by_table, projections=None, consistent_read=False):
+    """Read {table_name: [key, ...]} in groups of 100.
+
+    Returns {table_name: [item, ...]}; keys that do not exist are omitted.
+    projections optionally maps a table name to a ProjectionExpression.
+    consistent_read=True makes every read strongly consistent, at twice
+    the read capacity.
+    """
+    projections = projections or {}
+    keys = [
+        (table_name, key)
+        for table_name, table_keys in keys_by_table.items()
+        for key in table_keys
+    ]
+    results = {table_name: [] for table_name in keys_by_table}
+    for chunk in _chunks(keys, BATCH_GET_LIMIT):
+        pending = {}
+        for table_name, key in chunk:
+            request = pending.setdefault(table_name, {'Keys': []})
+            request['Keys'].append(key)
+            if consistent_read:
+                request['ConsistentRead'] = True
+            if table_name in projections:
+                request['ProjectionExpression'] = projections[table_name]
+
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                response = client.batch_get_item(RequestItems=pending)
+            except ClientError as e:
+                if attempt == MAX_ATTEMPTS or not is_retryable(e):
+                    raise
+                backoff(attempt)
+                continue
+            for table_name, items in response.get('Responses', {}).items():
+                results[table_name].extend(items)
+            pending = response.get('UnprocessedKeys') or {}
+            if not pending:
+                break
+            if attempt == MAX_ATTEMPTS:
+                raise BatchError('Keys left unprocessed after retries', pending)
+            backoff(attempt)
+    return results
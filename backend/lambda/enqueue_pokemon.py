@@ -0,0 +1,196 @@
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+import boto3
+from pokemon_stats import build_stat_rows
+from validation import ValidationError, error_response, parse_body, validate_pokemon
+from admission import admission_controlled
+from profiling import profiled
+
+dynamodb = boto3.resource('dynamodb')
+jobs_table = dynamodb.Table(os.environ.get('JOBS_TABLE_NAME', 'PokemonIngestJobsTable'))
+sqs = boto3.client('sqs')
+
+QUEUE_URL = os.environ.get('INGEST_QUEUE_URL')
+MAX_POKEMON_PER_REQUEST = 1000
+POKEMON_PER_MESSAGE = 25
+MESSAGES_PER_SEND = 10
+# SQS limit for one message and for a whole SendMessageBatch request
+MAX_SEND_BYTES = 262144
+SEND_ATTEMPTS = 3
+JOB_TTL_SECONDS = 7 * 24 * 3600
+
+def validate_entries(body):
+    """Validate a single Pokemon or a list of them; errors are keyed by index."""
+    entries = body if isinstance(body, list) else [body]
+    if not entries:
+        raise ValidationError({'body': 'must contain at least one Pokemon'})
+    if len(entries) > MAX_POKEMON_PER_REQUEST:
+        raise ValidationError({'body': f'must contain at most {MAX_POKEMON_PER_REQUEST} Pokemon'})
+
+    records = []
+    errors = {}
+    for index, entry in enumerate(entries):
+        try:
+            pokemon = {
+                'id': str(uuid.uuid4()),
+                'image': '',
+                'pokedexNumber': 0,
+                **validate_pokemon(entry)
+            }
+            records.append({'pokemon': pokemon, 'stats': build_stat_rows(pokemon, entry.get('stats'))})
+        except ValidationError as e:
+            errors.update({f'{index}.{field}': message for field, message in e.errors.items()})
+    if errors:
+        raise ValidationError(errors)
+    return records
+
+class QueueError(Exception):
+    """Raised when messages could not be queued; queued counts the records that were."""
+
+    def __init__(self, message, queued):
+        super().__init__(message)
+        self.queued = queued
+
+def _size(body):
+    return len(body.encode('utf-8'))
+
+def build_messages(job_id, records):
+    """Pack records into message bodies of at most POKEMON_PER_MESSAGE records and MAX_SEND_BYTES.
+
+    Returns [(body, record count), ...].
+    """
+    envelope = json.dumps({'job_id': job_id, 'records': []})
+    messages = []
+    encoded = []
+    size = _size(envelope)
+    for index, record in enumerate(records):
+        record_json = json.dumps(record)
+        # Each record after the first adds a ', ' separator
+        record_size = _size(record_json) + (2 if encoded else 0)
+        if encoded and (len(encoded) == POKEMON_PER_MESSAGE or size + record_size > MAX_SEND_BYTES):
+            messages.append((envelope[:-2] + ', '.join(encoded) + ']}', len(encoded)))
+            encoded = []
+            size = _size(envelope)
+            record_size = _size(record_json)
+        if size + record_size > MAX_SEND_BYTES:
+            raise ValidationError({str(index): 'is too large to queue'})
+        encoded.append(record_json)
+        size += record_size
+    if encoded:
+        messages.append((envelope[:-2] + ', '.join(encoded) + ']}', len(encoded)))
+    return messages
+
+def _send_groups(messages):
+    """Group messages into SendMessageBatch requests within the entry and byte limits."""
+    group = []
+    size = 0
+    for message in messages:
+        message_size = _size(message[0])
+        if group and (len(group) == MESSAGES_PER_SEND or size + message_size > MAX_SEND_BYTES):
+            yield group
+            group = []
+            size = 0
+        group.append(message)
+        size += message_size
+    if group:
+        yield group
+
+def send_messages(messages):
+    """Send (body, record count) messages with SendMessageBatch, retrying failed entries.
+
+    Raises QueueError with the number of records queued if any message
+    could not be queued.
+    """
+    queued = 0
+    for group in _send_groups(messages):
+        entries = [{'Id': str(index), 'MessageBody': body} for index, (body, _) in enumerate(group)]
+        for attempt in range(SEND_ATTEMPTS):
+            try:
+                response = sqs.send_message_batch(QueueUrl=QUEUE_URL, Entries=entries)
+            except Exception as e:
+                raise QueueError(f'Messages could not be queued: {e}', queued) from e
+            failed_ids = {failure['Id'] for failure in response.get('Failed', [])}
+            queued += sum(group[int(entry['Id'])][1] for entry in entries if entry['Id'] not in failed_ids)
+            entries = [entry for entry in entries if entry['Id'] in failed_ids]
+            if not entries:
+                break
+            time.sleep(0.05 * 2 ** attempt)
+        else:
+            raise QueueError(f'{len(entries)} messages could not be queued', queued)
+    return queued
+
+def fail_job(job_id, queued, error):
+    """Mark a job FAILED so it does not stay QUEUED; the records already queued are still ingested."""
+    jobs_table.update_item(
+        Key={'job_id': job_id},
+        UpdateExpression='SET #status = :status, #queued = :queued, #error = :error, updated_at = :now',
+        ExpressionAttributeNames={'#status': 'status', '#queued': 'queued', '#error': 'error'},
+        ExpressionAttributeValues={
+            ':status': 'FAILED',
+            ':queued': queued,
+            ':error': error,
+            ':now': datetime.now(timezone.utc).isoformat()
+        }
+    )
+
+@profiled
+@admission_controlled
+def lambda_handler(event, context):
+    try:
+        records = validate_entries(parse_body(event))
+        
+        job_id = str(uuid.uuid4())
+        messages = build_messages(job_id, records)
+        now = datetime.now(timezone.utc).isoformat()
+        jobs_table.put_item(Item={
+            'job_id': job_id,
+            'status': 'QUEUED',
+            'total': len(records),
+            'processed': 0,
+            'failed': 0,
+            'created_at': now,
+            'updated_at': now,
+            'expires_at': int(time.time()) + JOB_TTL_SECONDS
+        })
+        
+        # The job row goes first: the consumer updates it as messages drain
+        try:
+            send_messages(messages)
+        except QueueError as e:
+            fail_job(job_id, e.queued, str(e))
+            return {
+                'statusCode': 500,
+                'headers': {
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({'error': str(e), 'jobId': job_id, 'queued': e.queued})
+            }
+        
+        return {
+            'statusCode': 202,
+            'headers': {
+                'Access-Control-Allow-Origin': '*',
+                'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
+                'Access-Control-Allow-Headers': 'Content-Type',
+                'Location': f'/jobs/{job_id}'
+            },
+            'body': json.dumps({
+                'jobId': job_id,
+                'status': 'QUEUED',
+                'accepted': len(records),
+                'ids': [record['pokemon']['id'] for record in records]
+            })
+        }
+    except ValidationError as e:
+        return error_response(e)
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'headers': {
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({'error': str(e)})
+        }
@@ -0,0 +1,141 @@
+"""
+`?expand=` support for Pokemon reads.
+
+Pokemon reference their type by name and their abilities by id. With
+`?expand=type,abilities` those references are replaced by the records from
+PokemonTypesTable and PokemonAbilitiesTable:
+
+* the distinct keys referenced across the whole response are collected;
+* any not already cached are read with one BatchGetItem;
+* the results are kept in a per-container cache for REFERENCE_TTL_SECONDS.
+
+Reference data is small and rarely changes, so repeat expansions in a
+warm container make no DynamoDB calls. Unknown references are cached too
+and left as they are.
+"""
+
+import os
+import threading
+import time
+from decimal import Decimal
+
+from dynamo_batch import batch_get
+from schema import ABILITIES_SCHEMA, TYPES_SCHEMA
+from validation import ValidationError
+
+REFERENCE_TTL_SECONDS = int(os.environ.get('REFERENCE_TTL_SECONDS', '300'))
+
+# expand name -> (reference schema, Pokemon attributes holding its keys)
+EXPANSIONS = {
+    'abilities': (ABILITIES_SCHEMA, ('abilities',)),
+    'type': (TYPES_SCHEMA, ('type', 'secondary_type'))
+}
+
+_MISSING = object()
+
+
+class ReferenceCache:
+    """Per-container cache of reference records keyed by (table, key)."""
+
+    def __init__(self, ttl=REFERENCE_TTL_SECONDS, clock=time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, table_name, key):
+        """Return the record, None if it is known not to exist, or _MISSING."""
+        with self._lock:
+            entry = self._entries.get((table_name, key))
+        if entry is None or entry[1] < self._clock():
+            return _MISSING
+        return entry[0]
+
+    def set(self, table_name, key, record):
+        with self._lock:
+            self._entries[(table_name, key)] = (record, self._clock() + self.ttl)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+reference_cache = ReferenceCache()
+
+
+def parse_expand(event):
+    """Return the requested expansions, raising ValidationError for unknown ones."""
+    value = (event.get('queryStringParameters') or {}).get('expand') or ''
+    names = {name.strip() for name in value.split(',') if name.strip()}
+    if names - EXPANSIONS.keys():
+        raise ValidationError({'expand': f"must be a comma-separated list of: {', '.join(sorted(EXPANSIONS))}"})
+    return names
+
+
+def _references(item, attributes):
+    # Empty strings are skipped: DynamoDB rejects them as keys
+    for attribute in attributes:
+        value = item.get(attribute)
+        if isinstance(value, list):
+            yield from (key for key in value if isinstance(key, str) and key)
+        elif isinstance(value, str) and value:
+            yield value
+
+
+def _to_json_number(record):
+    # Convert Decimal to int/float for JSON serialization
+    return {
+        name: (int(value) if value % 1 == 0 else float(value)) if isinstance(value, Decimal) else value
+        for name, value in record.items()
+    }
+
+
+def resolve(client, names, items, cache=reference_cache):
+    """Load every reference used by items into the cache with at most one BatchGetItem."""
+    wanted = {}
+    for name in names:
+        schema, attributes = EXPANSIONS[name]
+        table_name = schema['table_name']
+        for item in items:
+            for key in _references(item, attributes):
+                if cache.get(table_name, key) is _MISSING:
+                    wanted.setdefault(table_name, set()).add(key)
+
+    if not wanted:
+        return
+    key_names = {EXPANSIONS[name][0]['table_name']: EXPANSIONS[name][0]['partition_key'] for name in names}
+    found = batch_get(client, {
+        table_name: [{key_names[table_name]: key} for key in sorted(keys)]
+        for table_name, keys in wanted.items()
+    })
+    for table_name, keys in wanted.items():
+        records = {record[key_names[table_name]]: record for record in found.get(table_name, [])}
+        for key in keys:
+            record = records.get(key)
+            cache.set(table_name, key, _to_json_number(record) if record is not None else None)
+
+
+def expand(client, names, items, cache=reference_cache):
+    """Return copies of items with the requested references replaced by their records."""
+    if not names:
+        return items
+    resolve(client, names, items, cache)
+
+    def lookup(table_name, key):
+        record = cache.get(table_name, key)
+        return key if record is None or record is _MISSING else record
+
+    expanded = []
+    for item in items:
+        item = dict(item)
+        for name in names:
+            schema, attributes = EXPANSIONS[name]
+            for attribute in attributes:
+                value = item.get(attribute)
+                if isinstance(value, list):
+                    item[attribute] = [lookup(schema['table_name'], key) if isinstance(key, str) and key else key
+                                       for key in value]
+                elif isinstance(value, str) and value:
+                    item[attribute] = lookup(schema['table_name'], value)
+        expanded.append(item)
+    return expanded
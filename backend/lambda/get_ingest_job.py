@@ -0,0 +1,53 @@
+import json
+import os
+import boto3
+from decimal import Decimal
+from admission import admission_controlled
+from profiling import profiled
+
+dynamodb = boto3.resource('dynamodb')
+jobs_table = dynamodb.Table(os.environ.get('JOBS_TABLE_NAME', 'PokemonIngestJobsTable'))
+
+@profiled
+@admission_controlled
+def lambda_handler(event, context):
+    try:
+        job_id = event['pathParameters']['id']
+        
+        response = jobs_table.get_item(Key={'job_id': job_id})
+        
+        if 'Item' not in response:
+            return {
+                'statusCode': 404,
+                'headers': {
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({'error': 'Job not found'})
+            }
+        
+        job = response['Item']
+        # Bookkeeping for the consumer, not part of the job's status
+        job.pop('counted_messages', None)
+        
+        # Convert Decimal to int/float for JSON serialization
+        for key, value in job.items():
+            if isinstance(value, Decimal):
+                job[key] = int(value) if value % 1 == 0 else float(value)
+        
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Access-Control-Allow-Origin': '*',
+                'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
+                'Access-Control-Allow-Headers': 'Content-Type'
+            },
+            'body': json.dumps(job)
+        }
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'headers': {
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({'error': str(e)})
+        }
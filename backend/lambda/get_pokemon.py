@@ -1,17 +1,42 @@
 import json
 import boto3
 from decimal import Decimal
+from cache import get_cache, item_key, read_through
+from expand import expand, parse_expand
+from validation import ValidationError, error_response
+from admission import admission_controlled
+from profiling import profiled
 
 dynamodb = boto3.resource('dynamodb')
 table = dynamodb.Table('PokemonTable')
+client = dynamodb.meta.client
+cache = get_cache()
 
+def load_pokemon(pokemon_id):
+    response = table.get_item(Key={'id': pokemon_id})
+    
+    if 'Item' not in response:
+        return None
+    
+    item = response['Item']
+    
+    # Convert Decimal to int/float for JSON serialization
+    for key, value in item.items():
+        if isinstance(value, Decimal):
+            item[key] = int(value) if value % 1 == 0 else float(value)
+    
+    return item
+
+@profiled
+@admission_controlled
 def lambda_handler(event, context):
     try:
         pokemon_id = event['pathParameters']['id']
+        expansions = parse_expand(event)
         
-        response = table.get_item(Key={'id': pokemon_id})
+        item = read_through(cache, item_key(pokemon_id), lambda: load_pokemon(pokemon_id))
         
-        if 'Item' not in response:
+        if item is None:
             return {
                 'statusCode': 404,
                 'headers': {
@@ -20,12 +45,7 @@ def lambda_handler(event, context):
                 'body': json.dumps({'error': 'Pokemon not found'})
             }
         
-        item = response['Item']
-        
-        # Convert Decimal to int/float for JSON serialization
-        for key, value in item.items():
-            if isinstance(value, Decimal):
-                item[key] = int(value) if value % 1 == 0 else float(value)
+        item = expand(client, expansions, [item])[0]
         
         return {
             'statusCode': 200,
@@ -36,6 +56,8 @@ def lambda_handler(event, context):
             },
             'body': json.dumps(item)
         }
+    except ValidationError as e:
+        return error_response(e)
     except Exception as e:
         return {
             'statusCode': 500,
@@ -1,20 +1,36 @@
 import json
 import boto3
 from decimal import Decimal
+from cache import LIST_TTL_SECONDS, get_cache, list_key, read_through
+from expand import expand, parse_expand
+from validation import ValidationError, error_response
+from admission import admission_controlled
+from profiling import profiled
 
 dynamodb = boto3.resource('dynamodb')
 table = dynamodb.Table('PokemonTable')
+client = dynamodb.meta.client
+cache = get_cache()
 
+def load_pokemons():
+    response = table.scan()
+    items = response['Items']
+    
+    # Convert Decimal to int/float for JSON serialization
+    for item in items:
+        for key, value in item.items():
+            if isinstance(value, Decimal):
+                item[key] = int(value) if value % 1 == 0 else float(value)
+    
+    return items
+
+@profiled
+@admission_controlled
 def lambda_handler(event, context):
     try:
-        response = table.scan()
-        items = response['Items']
-        
-        # Convert Decimal to int/float for JSON serialization
-        for item in items:
-            for key, value in item.items():
-                if isinstance(value, Decimal):
-                    item[key] = int(value) if value % 1 == 0 else float(value)
+        expansions = parse_expand(event)
+        items = read_through(cache, list_key(cache), load_pokemons, ttl=LIST_TTL_SECONDS)
+        items = expand(client, expansions, items)
         
         return {
             'statusCode': 200,
@@ -25,6 +41,8 @@ def lambda_handler(event, context):
             },
             'body': json.dumps(items)
         }
+    except ValidationError as e:
+        return error_response(e)
     except Exception as e:
         return {
             'statusCode': 500,
@@ -0,0 +1,83 @@
+import json
+import boto3
+from decimal import Decimal
+from pokemon_stats import STATS_TABLE_NAME
+from trainer_table import TRAINER_TABLE_NAME, query_roster
+from admission import admission_controlled
+from profiling import profiled
+
+dynamodb = boto3.resource('dynamodb')
+table = dynamodb.Table('PokemonTable')
+stats_table = dynamodb.Table(STATS_TABLE_NAME)
+trainer_table = dynamodb.Table(TRAINER_TABLE_NAME) if TRAINER_TABLE_NAME else None
+
+def load_roster_from_tables(trainer_id):
+    """Assemble a roster from the per-entity tables: a filtered scan plus one stats query per Pokemon."""
+    pokemons = []
+    scan = {
+        'FilterExpression': 'trainer_id = :trainer_id',
+        'ExpressionAttributeValues': {':trainer_id': trainer_id}
+    }
+    while True:
+        response = table.scan(**scan)
+        pokemons.extend(response['Items'])
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    if not pokemons:
+        return None
+
+    for pokemon in pokemons:
+        rows = stats_table.query(
+            KeyConditionExpression='pokemon_id = :pokemon_id',
+            ExpressionAttributeValues={':pokemon_id': pokemon['id']}
+        )['Items']
+        pokemon['stats'] = {row['stat_name']: row for row in rows}
+
+    return {'trainer': {'trainer_id': trainer_id}, 'pokemons': pokemons}
+
+def to_json_number(value):
+    # Convert Decimal to int/float for JSON serialization
+    if isinstance(value, Decimal):
+        return int(value) if value % 1 == 0 else float(value)
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+@profiled
+@admission_controlled
+def lambda_handler(event, context):
+    try:
+        trainer_id = event['pathParameters']['id']
+
+        # With the single-table layout the whole roster is one Query
+        if trainer_table is not None:
+            roster = query_roster(trainer_table, trainer_id)
+        else:
+            roster = load_roster_from_tables(trainer_id)
+
+        if roster is None:
+            return {
+                'statusCode': 404,
+                'headers': {
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({'error': 'Trainer not found'})
+            }
+
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Access-Control-Allow-Origin': '*',
+                'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
+                'Access-Control-Allow-Headers': 'Content-Type'
+            },
+            'body': json.dumps(roster, default=to_json_number)
+        }
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'headers': {
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({'error': str(e)})
+        }
@@ -0,0 +1,115 @@
+import json
+import os
+from datetime import datetime, timezone
+import boto3
+from botocore.exceptions import ClientError
+from cache import bump_list_generation, get_cache
+from dynamo_batch import AdaptiveRateLimiter, batch_write
+from pokemon_stats import STATS_TABLE_NAME
+from trainer_table import TRAINER_TABLE_NAME, put_requests
+from profiling import profiled
+
+dynamodb = boto3.resource('dynamodb')
+table = dynamodb.Table('PokemonTable')
+jobs_table = dynamodb.Table(os.environ.get('JOBS_TABLE_NAME', 'PokemonIngestJobsTable'))
+client = dynamodb.meta.client
+cache = get_cache()
+
+# Must match maxReceiveCount of the queue's dead-letter policy
+MAX_RECEIVE_COUNT = int(os.environ.get('MAX_RECEIVE_COUNT', '5'))
+# Stop taking new records when less than this much time is left
+MIN_REMAINING_MS = 5000
+
+# Kept across invocations so a warm container remembers the sustainable rate
+limiter = AdaptiveRateLimiter(
+    initial_rate=float(os.environ.get('INGEST_INITIAL_WRITE_RATE', '200')),
+    max_rate=float(os.environ.get('INGEST_MAX_WRITE_RATE', '5000'))
+)
+
+def write_records(records):
+    """Write Pokemon and their stat rows with rate-controlled BatchWriteItem calls."""
+    requests = {
+        table.name: [{'PutRequest': {'Item': record['pokemon']}} for record in records],
+        STATS_TABLE_NAME: [{'PutRequest': {'Item': row}} for record in records for row in record['stats']]
+    }
+    if TRAINER_TABLE_NAME:
+        requests[TRAINER_TABLE_NAME] = put_requests((record['pokemon'], record['stats']) for record in records)
+    batch_write(client, requests, limiter=limiter)
+
+def count_message(job_id, message_id, processed=0, failed=0):
+    """Add one message's records to its job's counters, at most once.
+
+    The message id is added to the job in the same conditional update, so a
+    redelivered message that was already counted leaves the counters alone.
+    """
+    try:
+        job = jobs_table.update_item(
+            Key={'job_id': job_id},
+            UpdateExpression='SET updated_at = :now ADD processed :processed, failed :failed, counted_messages :message',
+            ConditionExpression='NOT contains(counted_messages, :message_id)',
+            ExpressionAttributeValues={
+                ':now': datetime.now(timezone.utc).isoformat(),
+                ':processed': processed,
+                ':failed': failed,
+                ':message': {message_id},
+                ':message_id': message_id
+            },
+            ReturnValues='ALL_NEW'
+        )['Attributes']
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            return
+        raise
+    if job['status'] == 'QUEUED' and job['processed'] + job['failed'] >= job['total']:
+        jobs_table.update_item(
+            Key={'job_id': job_id},
+            UpdateExpression='SET #status = :status',
+            ExpressionAttributeNames={'#status': 'status'},
+            ExpressionAttributeValues={
+                ':status': 'COMPLETED_WITH_ERRORS' if job['failed'] else 'COMPLETED'
+            }
+        )
+
+@profiled
+def lambda_handler(event, context):
+    """Drain ingestion messages from SQS.
+
+    Failed and skipped messages are reported individually so that only they
+    are redelivered. They count against the job once they exhaust their
+    receives and move to the dead-letter queue. Job counters are updated
+    once per message id, so redelivered messages are not counted twice.
+    """
+    failures = []
+    counts = []
+    
+    for record in event['Records']:
+        message = json.loads(record['body'])
+        job_id = message['job_id']
+        last_receive = int(record.get('attributes', {}).get('ApproximateReceiveCount', 1)) >= MAX_RECEIVE_COUNT
+        if context is not None and context.get_remaining_time_in_millis() < MIN_REMAINING_MS:
+            failures.append({'itemIdentifier': record['messageId']})
+            if last_receive:
+                counts.append((job_id, record['messageId'], 0, len(message['records'])))
+            continue
+        
+        try:
+            write_records(message['records'])
+            counts.append((job_id, record['messageId'], len(message['records']), 0))
+        except Exception as e:
+            print(f"Failed to ingest message {record['messageId']} for job {job_id}: {e}")
+            failures.append({'itemIdentifier': record['messageId']})
+            if last_receive:
+                counts.append((job_id, record['messageId'], 0, len(message['records'])))
+    
+    if any(processed for _, _, processed, _ in counts):
+        bump_list_generation(cache)
+    for job_id, message_id, processed, failed in counts:
+        try:
+            count_message(job_id, message_id, processed, failed)
+        except Exception as e:
+            # Redelivery retries the count; the writes themselves are idempotent puts
+            print(f"Failed to count message {message_id} for job {job_id}: {e}")
+            if processed:
+                failures.append({'itemIdentifier': message_id})
+    
+    return {'batchItemFailures': failures}
@@ -2,10 +2,13 @@ import json
 import boto3
 import uuid
 from decimal import Decimal
+from validation import ValidationError, error_response, parse_body, validate_pokemon
+from profiling import profiled
 
 dynamodb = boto3.resource('dynamodb')
 table = dynamodb.Table('PokemonTable')
 
+@profiled
 def lambda_handler(event, context):
     http_method = event['httpMethod']
     
@@ -18,6 +21,8 @@ def lambda_handler(event, context):
             return update_pokemon(event)
         elif http_method == 'DELETE':
             return delete_pokemon(event)
+    except ValidationError as e:
+        return error_response(e)
     except Exception as e:
         return {
             'statusCode': 500,
@@ -51,15 +56,14 @@ def get_pokemons(event):
         }
 
 def create_pokemon(event):
-    data = json.loads(event['body'])
+    data = validate_pokemon(parse_body(event))
     pokemon = {
         'id': str(uuid.uuid4()),
-        'name': data['name'],
-        'type': data['type'],
-        'level': data.get('level', 1),
-        'hp': data.get('hp', 100),
-        'image': data.get('image', ''),
-        'pokedexNumber': data.get('pokedexNumber', 0)
+        'level': 1,
+        'hp': 100,
+        'image': '',
+        'pokedexNumber': 0,
+        **data
     }
     
     table.put_item(Item=pokemon)
@@ -71,24 +75,19 @@ def create_pokemon(event):
 
 def update_pokemon(event):
     pokemon_id = event['pathParameters']['id']
-    data = json.loads(event['body'])
+    data = {
+        'level': 1,
+        'hp': 100,
+        'image': '',
+        'pokedexNumber': 0,
+        **validate_pokemon(parse_body(event))
+    }
     
     response = table.update_item(
         Key={'id': pokemon_id},
-        UpdateExpression='SET #name = :name, #type = :type, #level = :level, hp = :hp, image = :image, pokedexNumber = :pokedexNumber',
-        ExpressionAttributeNames={
-            '#name': 'name',
-            '#type': 'type',
-            '#level': 'level'
-        },
-        ExpressionAttributeValues={
-            ':name': data['name'],
-            ':type': data['type'],
-            ':level': data.get('level', 1),
-            ':hp': data.get('hp', 100),
-            ':image': data.get('image', ''),
-            ':pokedexNumber': data.get('pokedexNumber', 0)
-        },
+        UpdateExpression='SET ' + ', '.join(f'#{name} = :{name}' for name in data),
+        ExpressionAttributeNames={f'#{name}': name for name in data},
+        ExpressionAttributeValues={f':{name}': value for name, value in data.items()},
         ReturnValues='ALL_NEW'
     )
     
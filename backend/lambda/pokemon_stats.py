@@ -0,0 +1,69 @@
+"""
+Helpers for the PokemonStatsTable rows that belong to each Pokemon.
+
+Every Pokemon owns one row per stat (STATS_SCHEMA, partition key
+pokemon_id, sort key stat_name). Rows are written together with the
+Pokemon in one transaction and deleted together with it.
+"""
+
+from schema import STATS_SCHEMA
+from validation import ValidationError, validate_stat
+
+STATS_TABLE_NAME = STATS_SCHEMA['table_name']
+STAT_NAMES = STATS_SCHEMA['constraints']['stat_name']['enum']
+BASE_VALUE_RANGE = (STATS_SCHEMA['constraints']['base_value']['min'], STATS_SCHEMA['constraints']['base_value']['max'])
+
+
+def build_stat_rows(pokemon, stats_input=None):
+    """Build the six stat rows for a new Pokemon.
+
+    Base values default to the Pokemon's own hp/attack/defense/speed,
+    clamped to the stat range (those allow 0-999, base values 1-255).
+    stats_input optionally maps stat_name to {base_value, iv, ev, modifier}
+    and is validated against STATS_SCHEMA.
+    """
+    stats_input = stats_input or {}
+    if not isinstance(stats_input, dict):
+        raise ValidationError({'stats': 'must be an object keyed by stat name'})
+
+    errors = {f'stats.{name}': 'is not a known stat' for name in stats_input if name not in STAT_NAMES}
+    rows = []
+    for stat_name in STAT_NAMES:
+        values = stats_input.get(stat_name) or {}
+        try:
+            stat = validate_stat({**values, 'stat_name': stat_name}) if isinstance(values, dict) else None
+        except ValidationError as e:
+            errors.update({f'stats.{stat_name}.{field}': message for field, message in e.errors.items()})
+            continue
+        if stat is None:
+            errors[f'stats.{stat_name}'] = 'must be an object'
+            continue
+
+        row = {'iv': 0, 'ev': 0, 'modifier': 0, **stat, 'pokemon_id': pokemon['id']}
+        if 'base_value' not in row and stat_name in pokemon:
+            low, high = BASE_VALUE_RANGE
+            row['base_value'] = min(high, max(low, pokemon[stat_name]))
+        if 'current_value' not in row and 'base_value' in row:
+            row['current_value'] = row['base_value']
+        rows.append(row)
+
+    if errors:
+        raise ValidationError(errors)
+    return rows
+
+
+def query_stat_keys(stats_table, pokemon_id):
+    """Return the keys of every stat row for a Pokemon, following pagination."""
+    keys = []
+    query = {
+        'KeyConditionExpression': 'pokemon_id = :pokemon_id',
+        'ExpressionAttributeValues': {':pokemon_id': pokemon_id},
+        'ProjectionExpression': 'pokemon_id, stat_name'
+    }
+    while True:
+        response = stats_table.query(**query)
+        keys.extend({'pokemon_id': item['pokemon_id'], 'stat_name': item['stat_name']}
+                    for item in response['Items'])
+        if 'LastEvaluatedKey' not in response:
+            return keys
+        query['ExclusiveStartKey'] = response['LastEvaluatedKey']
@@ -0,0 +1,180 @@
+"""
+Sampled in-invocation profiling for Lambda handlers.
+
+Set PROFILE_SAMPLE_RATE (0-1) to profile that fraction of invocations with
+cProfile and tracemalloc. Each profiled invocation produces one gzip-compressed
+JSON dump with:
+
+* the top PROFILE_TOP_N functions by cumulative time;
+* the top PROFILE_TOP_N allocation sites still held when the handler returns,
+  with their tracebacks;
+* the call tree as folded stacks, in microseconds.
+
+Dumps are written as a single `PROFILE <base64>` log line, which ends up in
+CloudWatch Logs, or as files under PROFILE_DIR when it is set (local_server
+uses `backend/profiles/`). `python3 profile_report.py` merges them into
+flame-graph input.
+
+With PROFILE_SAMPLE_RATE unset or 0, `profiled` returns the handler
+unchanged, so profiling costs nothing when it is off.
+"""
+
+import base64
+import cProfile
+import functools
+import gzip
+import json
+import os
+import pstats
+import random
+import time
+import tracemalloc
+import uuid
+
+SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+TOP_N = int(os.environ.get('PROFILE_TOP_N', '25'))
+TRACEBACK_FRAMES = int(os.environ.get('PROFILE_TRACEBACK_FRAMES', '8'))
+PROFILE_DIR = os.environ.get('PROFILE_DIR')
+
+LOG_PREFIX = 'PROFILE '
+MAX_STACK_DEPTH = 64
+# Stacks below this share of the invocation's total time are dropped
+MIN_STACK_SHARE = 0.001
+
+
+def frame_name(func):
+    """Name a pstats function key as `name (file:line)`, safe for folded stacks."""
+    filename, line, name = func
+    if filename == '~':
+        label = name
+    else:
+        label = f'{name} ({os.path.basename(filename)}:{line})'
+    return label.replace(';', ',')
+
+
+def top_functions(stats, limit=TOP_N):
+    rows = sorted(stats.items(), key=lambda entry: entry[1][3], reverse=True)[:limit]
+    return [
+        {
+            'function': frame_name(func),
+            'ncalls': ncalls,
+            'tottime_ms': round(tottime * 1000, 3),
+            'cumtime_ms': round(cumtime * 1000, 3)
+        }
+        for func, (_, ncalls, tottime, cumtime, _) in rows
+    ]
+
+
+def folded_stacks(stats):
+    """Rebuild call paths from cProfile's caller edges as {stack: microseconds}.
+
+    cProfile records caller -> callee totals rather than full stacks, so a
+    callee's time is split across its callers in proportion to each edge's
+    cumulative time.
+    """
+    callees = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+
+    roots = [func for func, entry in stats.items() if not entry[4]]
+    total = sum(stats[func][3] for func in roots) or 1.0
+    stacks = {}
+
+    def walk(func, path, share):
+        _, _, tottime, cumtime, _ = stats[func]
+        if cumtime * share < total * MIN_STACK_SHARE or len(path) >= MAX_STACK_DEPTH:
+            return
+        path = path + [frame_name(func)]
+        self_us = int(tottime * share * 1_000_000)
+        if self_us:
+            key = ';'.join(path)
+            stacks[key] = stacks.get(key, 0) + self_us
+        for callee, edge_cumtime in callees.get(func, []):
+            callee_cumtime = stats[callee][3]
+            if callee_cumtime and frame_name(callee) not in path:
+                walk(callee, path, share * min(1.0, edge_cumtime / callee_cumtime))
+
+    for root in roots:
+        walk(root, [], 1.0)
+    return stacks
+
+
+def top_allocations(snapshot, limit=TOP_N):
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__)
+    ])
+    return [
+        {
+            'size': stat.size,
+            'count': stat.count,
+            # Outermost frame first, as in folded stacks
+            'traceback': [f'{os.path.basename(frame.filename)}:{frame.lineno}' for frame in stat.traceback]
+        }
+        for stat in snapshot.statistics('traceback')[:limit]
+    ]
+
+
+def encode_dump(dump):
+    return base64.b64encode(gzip.compress(json.dumps(dump).encode())).decode()
+
+
+def decode_dump(data):
+    return json.loads(gzip.decompress(base64.b64decode(data)))
+
+
+def emit(dump):
+    """Write a dump to PROFILE_DIR, or to the log as a single line."""
+    if PROFILE_DIR:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        filename = f"{dump['handler']}-{int(dump['timestamp'])}-{uuid.uuid4().hex[:8]}.json.gz"
+        with open(os.path.join(PROFILE_DIR, filename), 'wb') as f:
+            f.write(gzip.compress(json.dumps(dump).encode()))
+    else:
+        print(LOG_PREFIX + encode_dump(dump))
+
+
+def profiled(handler):
+    """Decorate a lambda_handler to profile a sampled fraction of invocations."""
+    if SAMPLE_RATE <= 0:
+        return handler
+
+    handler_name = handler.__module__
+
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        if random.random() >= SAMPLE_RATE or tracemalloc.is_tracing():
+            return handler(event, context)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler (e.g. a concurrent invocation's) is active
+            return handler(event, context)
+        tracemalloc.start(TRACEBACK_FRAMES)
+        start = time.perf_counter()
+        try:
+            return handler(event, context)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            profiler.disable()
+            snapshot = tracemalloc.take_snapshot()
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            try:
+                stats = pstats.Stats(profiler).stats
+                emit({
+                    'handler': handler_name,
+                    'timestamp': time.time(),
+                    'duration_ms': round(duration_ms, 3),
+                    'peak_bytes': peak_bytes,
+                    'functions': top_functions(stats),
+                    'allocations': top_allocations(snapshot),
+                    'stacks': folded_stacks(stats)
+                })
+            except Exception as e:
+                print(f'Failed to write profile for {handler_name}: {e}')
+
+    return wrapper
@@ -0,0 +1 @@
+../../database/schema.py
\ No newline at end of file
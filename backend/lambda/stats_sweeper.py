@@ -0,0 +1,67 @@
+import json
+import logging
+import os
+import boto3
+from concurrent.futures import ThreadPoolExecutor
+from dynamo_batch import batch_get, batch_write
+from pokemon_stats import STATS_TABLE_NAME
+from profiling import profiled
+
+dynamodb = boto3.resource('dynamodb')
+table = dynamodb.Table('PokemonTable')
+stats_table = dynamodb.Table(STATS_TABLE_NAME)
+client = dynamodb.meta.client
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+TOTAL_SEGMENTS = int(os.environ.get('SWEEPER_SEGMENTS', '4'))
+
+def scan_segment(segment):
+    """Return the keys of every stat row in one parallel-scan segment."""
+    keys = []
+    scan = {
+        'Segment': segment,
+        'TotalSegments': TOTAL_SEGMENTS,
+        'ProjectionExpression': 'pokemon_id, stat_name'
+    }
+    while True:
+        response = stats_table.scan(**scan)
+        keys.extend({'pokemon_id': item['pokemon_id'], 'stat_name': item['stat_name']}
+                    for item in response['Items'])
+        if 'LastEvaluatedKey' not in response:
+            return keys
+        scan['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+@profiled
+def lambda_handler(event, context):
+    """Delete stat rows whose Pokemon no longer exists.
+
+    Runs on a schedule. Stats are scanned in parallel segments, owners are
+    checked with strongly consistent BatchGetItem reads, so a Pokemon
+    created moments ago is never taken for missing, and orphaned rows are
+    removed with BatchWriteItem.
+    """
+    with ThreadPoolExecutor(max_workers=TOTAL_SEGMENTS) as executor:
+        stat_keys = [key for keys in executor.map(scan_segment, range(TOTAL_SEGMENTS)) for key in keys]
+
+    pokemon_ids = sorted({key['pokemon_id'] for key in stat_keys})
+    existing = batch_get(
+        client,
+        {table.name: [{'id': pokemon_id} for pokemon_id in pokemon_ids]},
+        projections={table.name: 'id'},
+        consistent_read=True
+    )
+    existing_ids = {item['id'] for item in existing[table.name]}
+
+    orphaned = [key for key in stat_keys if key['pokemon_id'] not in existing_ids]
+    if orphaned:
+        batch_write(client, {STATS_TABLE_NAME: [{'DeleteRequest': {'Key': key}} for key in orphaned]})
+
+    summary = {
+        'scannedRows': len(stat_keys),
+        'pokemonChecked': len(pokemon_ids),
+        'orphanedRowsDeleted': len(orphaned)
+    }
+    logger.info(json.dumps(summary))
+    return summary
@@ -0,0 +1,187 @@
+"""
+Helpers for the optional single-table layout (TRAINER_TABLE_SCHEMA).
+
+A trainer's profile, Pokemon and stat rows live under one TRAINER#<id>
+partition, so `GET /trainers/{id}/roster` is a single Query. The layout is
+enabled by setting TRAINER_TABLE_NAME. The per-entity tables stay the
+source of truth, and the write handlers mirror every change into this
+table. `backend/migrate_single_table.py` backfills it from the existing
+tables.
+"""
+
+import os
+
+from schema import TRAINER_TABLE_SCHEMA
+
+TRAINER_TABLE_NAME = os.environ.get('TRAINER_TABLE_NAME')
+POKEMON_INDEX = next(iter(TRAINER_TABLE_SCHEMA['indexes']))
+PROFILE_SK = 'PROFILE'
+
+# Layout attributes that are not part of the Pokemon or stat itself
+KEY_ATTRIBUTES = ('pk', 'sk', 'gsi1pk', 'entity')
+
+
+def trainer_pk(trainer_id):
+    return f'TRAINER#{trainer_id}'
+
+
+def pokemon_sk(pokemon_id):
+    return f'POKEMON#{pokemon_id}'
+
+
+def pokemon_partition(pokemon):
+    """Pokemon live under their trainer; unowned ones get their own partition."""
+    if pokemon.get('trainer_id'):
+        return trainer_pk(pokemon['trainer_id'])
+    return pokemon_sk(pokemon['id'])
+
+
+def profile_item(trainer_id):
+    return {'pk': trainer_pk(trainer_id), 'sk': PROFILE_SK, 'entity': 'PROFILE', 'trainer_id': trainer_id}
+
+
+def pokemon_items(pokemon, stat_rows):
+    """Build the items for a Pokemon and its stat rows, plus its trainer's profile."""
+    pk = pokemon_partition(pokemon)
+    sk = pokemon_sk(pokemon['id'])
+    items = [{**pokemon, 'pk': pk, 'sk': sk, 'gsi1pk': sk, 'entity': 'POKEMON'}]
+    items.extend(
+        {**row, 'pk': pk, 'sk': f"{sk}#STAT#{row['stat_name']}", 'gsi1pk': sk, 'entity': 'STAT'}
+        for row in stat_rows
+    )
+    if pokemon.get('trainer_id'):
+        items.append(profile_item(pokemon['trainer_id']))
+    return items
+
+
+def type_item(pokemon_type):
+    return {**pokemon_type, 'pk': f"TYPE#{pokemon_type['type_name']}", 'sk': 'TYPE', 'entity': 'TYPE'}
+
+
+def ability_item(ability):
+    return {**ability, 'pk': f"ABILITY#{ability['ability_id']}", 'sk': 'ABILITY', 'entity': 'ABILITY'}
+
+
+def put_requests(records):
+    """BatchWriteItem PutRequests for (pokemon, stat_rows) pairs.
+
+    Profiles are emitted once per trainer, since a batch may not write the
+    same key twice.
+    """
+    requests = []
+    profiles = set()
+    for pokemon, stat_rows in records:
+        for item in pokemon_items(pokemon, stat_rows):
+            if item['entity'] == 'PROFILE':
+                if item['pk'] in profiles:
+                    continue
+                profiles.add(item['pk'])
+            requests.append({'PutRequest': {'Item': item}})
+    return requests
+
+
+def strip_keys(item):
+    return {name: value for name, value in item.items() if name not in KEY_ATTRIBUTES}
+
+
+def _query_all(table, **query):
+    items = []
+    while True:
+        response = table.query(**query)
+        items.extend(response['Items'])
+        if 'LastEvaluatedKey' not in response:
+            return items
+        query['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def query_pokemon_items(table, pokemon_id):
+    """Return a Pokemon's item and stat items, wherever they are partitioned.
+
+    This reads the eventually consistent ByPokemon index, so it can miss
+    recent moves. Writers use query_partition_items with the partition the
+    source table says the Pokemon was in.
+    """
+    return _query_all(
+        table,
+        IndexName=POKEMON_INDEX,
+        KeyConditionExpression='gsi1pk = :gsi1pk',
+        ExpressionAttributeValues={':gsi1pk': pokemon_sk(pokemon_id)}
+    )
+
+
+def query_partition_items(table, pokemon):
+    """Return a Pokemon's item and stat items from its partition, read strongly consistently."""
+    sk = pokemon_sk(pokemon['id'])
+    items = _query_all(
+        table,
+        KeyConditionExpression='pk = :pk AND begins_with(sk, :sk)',
+        ExpressionAttributeValues={':pk': pokemon_partition(pokemon), ':sk': sk},
+        ConsistentRead=True
+    )
+    # begins_with alone would also match ids that extend this one
+    return [item for item in items if item['sk'] == sk or item['sk'].startswith(f'{sk}#')]
+
+
+def sync_requests(table, old_pokemon, pokemon):
+    """Write requests that bring the single table in line with an updated Pokemon.
+
+    old_pokemon is the source-table item before the update (None if it did
+    not exist); it says which partition holds the current items. The stat
+    rows are carried over. If the trainer changed, the items move to the
+    new partition and the old ones are deleted.
+    """
+    existing = query_partition_items(table, old_pokemon) if old_pokemon else []
+    stat_rows = [strip_keys(item) for item in existing if item['entity'] == 'STAT']
+    items = pokemon_items(pokemon, stat_rows)
+    new_keys = {(item['pk'], item['sk']) for item in items}
+    requests = [{'PutRequest': {'Item': item}} for item in items]
+    requests.extend(
+        {'DeleteRequest': {'Key': {'pk': item['pk'], 'sk': item['sk']}}}
+        for item in existing if (item['pk'], item['sk']) not in new_keys
+    )
+    return requests
+
+
+def delete_requests(table, pokemon_id, old_pokemon):
+    """Write requests that remove a Pokemon and its stats.
+
+    The profile is kept, since other Pokemon may be joining the partition
+    concurrently. query_roster ignores a profile without Pokemon, and
+    migrate_single_table.py deletes it.
+
+    old_pokemon is the deleted source-table item. If it was already gone,
+    leftovers from an earlier failed delete are found through the index.
+    """
+    items = query_partition_items(table, old_pokemon) if old_pokemon else query_pokemon_items(table, pokemon_id)
+    return [{'DeleteRequest': {'Key': {'pk': item['pk'], 'sk': item['sk']}}} for item in items]
+
+
+def query_roster(table, trainer_id):
+    """Read a trainer's profile, Pokemon and stats with one Query.
+
+    Returns None if the trainer has no Pokemon, as the per-entity tables
+    would, else
+    {'trainer': profile, 'pokemons': [pokemon with 'stats': {stat_name: row}]}.
+    """
+    items = _query_all(
+        table,
+        KeyConditionExpression='pk = :pk',
+        ExpressionAttributeValues={':pk': trainer_pk(trainer_id)}
+    )
+    profile = {'trainer_id': trainer_id}
+    pokemons = {}
+    stats = {}
+    for item in items:
+        if item['entity'] == 'PROFILE':
+            profile = strip_keys(item)
+        elif item['entity'] == 'POKEMON':
+            pokemons[item['id']] = {**strip_keys(item), 'stats': {}}
+        elif item['entity'] == 'STAT':
+            stats.setdefault(item['pokemon_id'], {})[item['stat_name']] = strip_keys(item)
+    if not pokemons:
+        return None
+    for pokemon_id, pokemon_stats in stats.items():
+        if pokemon_id in pokemons:
+            pokemons[pokemon_id]['stats'] = pokemon_stats
+    return {'trainer': profile, 'pokemons': list(pokemons.values())}
+
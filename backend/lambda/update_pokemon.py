@@ -1,38 +1,56 @@
 import json
 import boto3
 from decimal import Decimal
+from cache import get_cache, invalidate
+from dynamo_batch import batch_write
+from trainer_table import TRAINER_TABLE_NAME, sync_requests
+from validation import ValidationError, error_response, parse_body, validate_pokemon
+from admission import admission_controlled
+from profiling import profiled
 
 dynamodb = boto3.resource('dynamodb')
 table = dynamodb.Table('PokemonTable')
+trainer_table = dynamodb.Table(TRAINER_TABLE_NAME) if TRAINER_TABLE_NAME else None
+client = dynamodb.meta.client
+cache = get_cache()
 
+@profiled
+@admission_controlled
 def lambda_handler(event, context):
     try:
         pokemon_id = event['pathParameters']['id']
-        data = json.loads(event['body'])
+        data = {
+            'image': '',
+            'pokedexNumber': 0,
+            **validate_pokemon(parse_body(event))
+        }
         
+        # Only validated schema fields reach the expression, so every
+        # attribute can be aliased to avoid DynamoDB reserved words.
+        # ALL_OLD gives the previous trainer atomically; the new item is
+        # the old one with every SET field applied.
         response = table.update_item(
             Key={'id': pokemon_id},
-            UpdateExpression='SET #name = :name, #type = :type, image = :image, pokedexNumber = :pokedexNumber',
-            ExpressionAttributeNames={
-                '#name': 'name',
-                '#type': 'type'
-            },
-            ExpressionAttributeValues={
-                ':name': data['name'],
-                ':type': data['type'],
-                ':image': data.get('image', ''),
-                ':pokedexNumber': data.get('pokedexNumber', 0)
-            },
-            ReturnValues='ALL_NEW'
+            UpdateExpression='SET ' + ', '.join(f'#{name} = :{name}' for name in data),
+            ExpressionAttributeNames={f'#{name}': name for name in data},
+            ExpressionAttributeValues={f':{name}': value for name, value in data.items()},
+            ReturnValues='ALL_OLD'
         )
         
-        item = response['Attributes']
+        old_item = response.get('Attributes')
+        item = {**(old_item or {'id': pokemon_id}), **data}
+        
+        # Mirror the change, moving the Pokemon if its trainer changed
+        if trainer_table is not None:
+            batch_write(client, {TRAINER_TABLE_NAME: sync_requests(trainer_table, old_item, item)})
         
         # Convert Decimal to int/float for JSON serialization
         for key, value in item.items():
             if isinstance(value, Decimal):
                 item[key] = int(value) if value % 1 == 0 else float(value)
         
+        invalidate(cache, pokemon_id)
+        
         return {
             'statusCode': 200,
             'headers': {
@@ -42,6 +60,8 @@ def lambda_handler(event, context):
             },
             'body': json.dumps(item)
         }
+    except ValidationError as e:
+        return error_response(e)
     except Exception as e:
         return {
             'statusCode': 500,
@@ -0,0 +1,233 @@
+"""
+Request validation compiled from the database schema.
+
+POKEMON_SCHEMA and STATS_SCHEMA (database/schema.py, linked into this
+directory) are compiled once at import into one small function per field.
+Each function coerces and range-checks a value. Bad requests are rejected
+with a 400 before any DynamoDB round trip.
+
+Numbers are returned as int or Decimal, as boto3 requires, and numeric
+strings such as "5" are accepted. Numbers DynamoDB cannot store (more than
+38 significant digits, or outside 1e-130..1e126 in magnitude) are rejected
+here rather than failing the write.
+"""
+
+import json
+import math
+from decimal import Decimal, InvalidOperation
+
+from schema import POKEMON_SCHEMA, STATS_SCHEMA
+
+
+class ValidationError(Exception):
+    """Raised with a {field: message} dict describing every invalid field."""
+
+    def __init__(self, errors):
+        super().__init__('Validation failed')
+        self.errors = errors
+
+
+def _coerce_string(value):
+    if not isinstance(value, str):
+        raise ValueError('must be a string')
+    return value
+
+
+# DynamoDB number limits
+MAX_DIGITS = 38
+MAX_INTEGER = 10 ** MAX_DIGITS
+MIN_EXPONENT = -130
+
+
+def _dynamodb_number(number):
+    """Return a finite Decimal as int or Decimal, if DynamoDB can store it exactly."""
+    if number == number.to_integral_value():
+        if abs(number) >= MAX_INTEGER:
+            raise ValueError(f'must have at most {MAX_DIGITS} digits')
+        return int(number)
+    if len(number.as_tuple().digits) > MAX_DIGITS:
+        raise ValueError(f'must have at most {MAX_DIGITS} significant digits')
+    if number.adjusted() < MIN_EXPONENT:
+        raise ValueError('is too small to store')
+    return number
+
+
+def _coerce_number(value):
+    if isinstance(value, bool):
+        raise ValueError('must be a number')
+    if isinstance(value, int):
+        if abs(value) >= MAX_INTEGER:
+            raise ValueError(f'must have at most {MAX_DIGITS} digits')
+        return value
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            raise ValueError('must be a finite number')
+        return _dynamodb_number(Decimal(str(value)))
+    if isinstance(value, str):
+        try:
+            number = Decimal(value.strip())
+        except InvalidOperation:
+            raise ValueError('must be a number') from None
+        if not number.is_finite():
+            raise ValueError('must be a finite number')
+        return _dynamodb_number(number)
+    raise ValueError('must be a number')
+
+
+def _coerce_boolean(value):
+    if isinstance(value, bool):
+        return value
+    if value in ('true', 'false'):
+        return value == 'true'
+    raise ValueError('must be a boolean')
+
+
+def _coerce_list(value):
+    if not isinstance(value, list):
+        raise ValueError('must be a list')
+    return value
+
+
+COERCERS = {
+    'string': _coerce_string,
+    'number': _coerce_number,
+    'boolean': _coerce_boolean,
+    'list': _coerce_list
+}
+
+
+def _compile_field(attribute_type, rules):
+    """Build a single validator for one attribute from its type and rules."""
+    coerce = COERCERS[attribute_type]
+    if 'items' in rules:
+        # items is the item type, or {'type': ..., **rules} to check each item too
+        item_rules = rules['items'] if isinstance(rules['items'], dict) else {'type': rules['items']}
+        coerce_list = coerce
+        validate_item = _compile_field(item_rules['type'],
+                                       {name: rule for name, rule in item_rules.items() if name != 'type'})
+        def coerce(value):
+            items = []
+            for index, item in enumerate(coerce_list(value)):
+                try:
+                    items.append(validate_item(item))
+                except ValueError as e:
+                    raise ValueError(f'item {index} {e}') from None
+            return items
+
+    checks = []
+
+    if rules.get('integer'):
+        def check_integer(value):
+            if not isinstance(value, int):
+                raise ValueError('must be an integer')
+        checks.append(check_integer)
+    if 'min' in rules:
+        minimum = rules['min']
+        def check_min(value):
+            if value < minimum:
+                raise ValueError(f'must be at least {minimum}')
+        checks.append(check_min)
+    if 'max' in rules:
+        maximum = rules['max']
+        def check_max(value):
+            if value > maximum:
+                raise ValueError(f'must be at most {maximum}')
+        checks.append(check_max)
+    if 'min_length' in rules:
+        min_length = rules['min_length']
+        def check_min_length(value):
+            if len(value) < min_length:
+                raise ValueError(f'must have at least {min_length} characters' if isinstance(value, str)
+                                 else f'must have at least {min_length} items')
+        checks.append(check_min_length)
+    if 'max_length' in rules:
+        max_length = rules['max_length']
+        def check_max_length(value):
+            if len(value) > max_length:
+                raise ValueError(f'must have at most {max_length} characters' if isinstance(value, str)
+                                 else f'must have at most {max_length} items')
+        checks.append(check_max_length)
+    if 'enum' in rules:
+        allowed = frozenset(rules['enum'])
+        message = f"must be one of: {', '.join(rules['enum'])}"
+        def check_enum(value):
+            if value not in allowed:
+                raise ValueError(message)
+        checks.append(check_enum)
+    if not checks:
+        return coerce
+
+    def validate(value):
+        value = coerce(value)
+        for check in checks:
+            check(value)
+        return value
+    return validate
+
+
+def compile_schema(schema):
+    """Compile a table schema into a validate(data, partial=False) function.
+
+    partial=True skips the required-field check, for partial updates.
+    Server-managed fields (and the partition key) are rejected; unknown
+    fields are dropped.
+    """
+    constraints = schema.get('constraints', {})
+    skipped = set(schema.get('server_managed', [])) | {schema['partition_key']}
+    validators = {
+        name: _compile_field(attribute_type, constraints.get(name, {}))
+        for name, attribute_type in schema['attributes'].items()
+        if name not in skipped
+    }
+    required = tuple(schema.get('required', []))
+
+    def validate(data, partial=False):
+        if not isinstance(data, dict):
+            raise ValidationError({'body': 'must be a JSON object'})
+
+        cleaned = {}
+        errors = {}
+        for name, value in data.items():
+            validator = validators.get(name)
+            if name in skipped and value is not None:
+                errors[name] = 'is set by the server'
+                continue
+            if validator is None or value is None:
+                continue
+            try:
+                cleaned[name] = validator(value)
+            except ValueError as e:
+                errors[name] = str(e)
+
+        if not partial:
+            for name in required:
+                if name not in cleaned and name not in errors:
+                    errors[name] = 'is required'
+
+        if errors:
+            raise ValidationError(errors)
+        return cleaned
+
+    return validate
+
+
+validate_pokemon = compile_schema(POKEMON_SCHEMA)
+validate_stat = compile_schema(STATS_SCHEMA)
+
+
+def parse_body(event):
+    """Decode the JSON request body, raising ValidationError if it is malformed."""
+    try:
+        return json.loads(event.get('body') or '{}')
+    except (TypeError, ValueError):
+        raise ValidationError({'body': 'must be valid JSON'}) from None
+
+
+def error_response(error):
+    return {
+        'statusCode': 400,
+        'headers': {
+            'Access-Control-Allow-Origin': '*'
+        },
+        'body': json.dumps({'error': 'Validation failed', 'fields': error.errors})
+    }
@@ -14,6 +14,9 @@ import os
 # Add lambda directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'lambda'))
 
+# Profiles sampled with PROFILE_SAMPLE_RATE are written here instead of the log
+os.environ.setdefault('PROFILE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles'))
+
 # Mock DynamoDB for local development
 MOCK_POKEMON_DATA = {}
 
@@ -37,12 +40,10 @@ class MockDynamoDBTable:
         pokemon_id = Key['id']
         if pokemon_id in MOCK_POKEMON_DATA:
             pokemon = MOCK_POKEMON_DATA[pokemon_id]
-            pokemon.update({
-                'name': ExpressionAttributeValues[':name'],
-                'type': ExpressionAttributeValues[':type'],
-                'level': ExpressionAttributeValues[':level'],
-                'hp': ExpressionAttributeValues[':hp']
-            })
+            # Handlers send "SET #field = :field, ..." for the fields they change
+            for assignment in UpdateExpression[len('SET '):].split(','):
+                name, placeholder = (part.strip() for part in assignment.split('='))
+                pokemon[ExpressionAttributeNames.get(name, name)] = ExpressionAttributeValues[placeholder]
             return {'Attributes': pokemon}
         return {}
     
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Backfill the single-table layout from the per-entity tables.
+
+Copies PokemonTable, PokemonStatsTable, PokemonTypesTable and
+PokemonAbilitiesTable into PokemonTrainerTable (TRAINER_TABLE_SCHEMA in
+database/schema.py). Trainers get a profile plus their Pokemon and stats
+in one partition. Types and abilities become TYPE# and ABILITY# items.
+Stat rows whose Pokemon no longer exists are skipped.
+
+Run it after deploying the backend with `-c single_table=true`, so the
+write handlers already mirror every change while it runs. The copy is made
+from a scan snapshot, so it must not undo those live writes:
+
+* Pokemon, stat and profile items are written with a conditional Put
+  (attribute_not_exists(pk)). An item a handler already wrote is never
+  overwritten with the older snapshot.
+* Afterwards every Pokemon the single table held before the run or that
+  the run wrote is checked against PokemonTable with a strongly
+  consistent read. Items whose Pokemon has since been deleted, or that sit
+  in a partition other than its current trainer's, are deleted. This
+  removes what the snapshot resurrected and what earlier failed deletes
+  and moves left behind. A moved Pokemon's stat items are first put into
+  its new partition if they are missing there, since a handler that moved
+  it before the copy had no stat items to carry over.
+* Profiles whose partition no longer holds any Pokemon are deleted.
+
+A write that lands between a check and its delete can still be undone.
+Running the tool again repairs it, since each run converges on the source
+tables. Run from backend/ with AWS credentials:
+
+    python3 migrate_single_table.py --segments 8 --write-rate 500
+    python3 migrate_single_table.py --dry-run
+"""
+
+import argparse
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from botocore.exceptions import ClientError
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'lambda'))
+
+from dynamo_batch import AdaptiveRateLimiter, batch_get, batch_write
+from schema import ABILITIES_SCHEMA, POKEMON_SCHEMA, STATS_SCHEMA, TRAINER_TABLE_SCHEMA, TYPES_SCHEMA
+from trainer_table import PROFILE_SK, ability_item, pokemon_partition, put_requests, trainer_pk, type_item
+
+
+def scan_table(table, segments):
+    """Read a whole table with a parallel scan."""
+    def scan_segment(segment):
+        items = []
+        scan = {'Segment': segment, 'TotalSegments': segments}
+        while True:
+            response = table.scan(**scan)
+            items.extend(response['Items'])
+            if 'LastEvaluatedKey' not in response:
+                return items
+            scan['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    with ThreadPoolExecutor(max_workers=segments) as executor:
+        return [item for items in executor.map(scan_segment, range(segments)) for item in items]
+
+
+def build_items(pokemons, stat_rows):
+    """Return the trainer, Pokemon and stat items for the single table and the number of orphaned stat rows."""
+    stats_by_pokemon = {}
+    for row in stat_rows:
+        stats_by_pokemon.setdefault(row['pokemon_id'], []).append(row)
+    known = {pokemon['id'] for pokemon in pokemons}
+    orphans = sum(len(rows) for pokemon_id, rows in stats_by_pokemon.items() if pokemon_id not in known)
+
+    requests = put_requests((pokemon, stats_by_pokemon.get(pokemon['id'], [])) for pokemon in pokemons)
+    return [request['PutRequest']['Item'] for request in requests], orphans
+
+
+def put_missing(table, items, workers, write_rate=None):
+    """Put every item whose key is not in the table yet; return how many were written."""
+    limiter = AdaptiveRateLimiter(initial_rate=write_rate, max_rate=write_rate) if write_rate else None
+    lock = threading.Lock()
+
+    def put(item):
+        if limiter is not None:
+            with lock:
+                limiter.acquire(1)
+        try:
+            table.put_item(Item=item, ConditionExpression='attribute_not_exists(pk)')
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+            return False
+        return True
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return sum(executor.map(put, items))
+
+
+def item_pokemon_id(item):
+    """The Pokemon a POKEMON or STAT item belongs to, from its POKEMON#<id>[#STAT#<name>] sort key."""
+    return item['sk'].split('#')[1]
+
+
+def stale_keys(items, current):
+    """Keys of Pokemon and stat items that no longer match PokemonTable.
+
+    current maps each Pokemon id to its PokemonTable item, read after the
+    copy; ids that are missing were deleted.
+    """
+    keys = set()
+    for item in items:
+        if item['entity'] not in ('POKEMON', 'STAT'):
+            continue
+        pokemon = current.get(item_pokemon_id(item))
+        if pokemon is None or pokemon_partition(pokemon) != item['pk']:
+            keys.add((item['pk'], item['sk']))
+    return [{'pk': pk, 'sk': sk} for pk, sk in sorted(keys)]
+
+
+def relocated_stats(items, current):
+    """Stat items re-keyed into the partition of a Pokemon that has moved since the snapshot."""
+    relocated = []
+    for item in items:
+        pokemon = current.get(item_pokemon_id(item)) if item['entity'] == 'STAT' else None
+        if pokemon is not None and pokemon_partition(pokemon) != item['pk']:
+            relocated.append({**item, 'pk': pokemon_partition(pokemon)})
+    return relocated
+
+
+def empty_profiles(table, trainer_ids):
+    """Keys of the profiles whose partition holds nothing but the profile, read strongly consistently."""
+    keys = []
+    for trainer_id in sorted(trainer_ids):
+        response = table.query(
+            KeyConditionExpression='pk = :pk',
+            ExpressionAttributeValues={':pk': trainer_pk(trainer_id)},
+            ProjectionExpression='pk, sk',
+            ConsistentRead=True,
+            Limit=2
+        )
+        if [item['sk'] for item in response['Items']] == [PROFILE_SK]:
+            keys.append({'pk': trainer_pk(trainer_id), 'sk': PROFILE_SK})
+    return keys
+
+
+def migrate(dynamodb, segments=4, write_rate=None, dry_run=False):
+    def read(schema):
+        return scan_table(dynamodb.Table(schema['table_name']), segments)
+
+    client = dynamodb.meta.client
+    trainer_table = dynamodb.Table(TRAINER_TABLE_SCHEMA['table_name'])
+    # Read the single table before the sources: anything in it then that the
+    # sources no longer back was deleted or moved in the meantime
+    existing = read(TRAINER_TABLE_SCHEMA)
+    pokemons = read(POKEMON_SCHEMA)
+    items, orphans = build_items(pokemons, read(STATS_SCHEMA))
+    reference_requests = [{'PutRequest': {'Item': type_item(item)}} for item in read(TYPES_SCHEMA)]
+    reference_requests.extend({'PutRequest': {'Item': ability_item(item)}} for item in read(ABILITIES_SCHEMA))
+    summary = {
+        'pokemon': len(pokemons),
+        'trainers': len({pokemon['trainer_id'] for pokemon in pokemons if pokemon.get('trainer_id')}),
+        'items': len(items) + len(reference_requests),
+        'orphaned_stats': orphans,
+        'written': 0,
+        'stale_deleted': 0,
+        'batch_calls': 0
+    }
+    if dry_run:
+        return summary
+
+    summary['written'] = put_missing(trainer_table, items, segments, write_rate)
+    # Types and abilities are only written here, so the snapshot is current
+    limiter = AdaptiveRateLimiter(initial_rate=write_rate, max_rate=write_rate) if write_rate else None
+    summary['batch_calls'] = batch_write(client, {trainer_table.name: reference_requests}, limiter=limiter)
+
+    candidates = existing + items
+    pokemon_ids = sorted({item_pokemon_id(item) for item in candidates if item['entity'] in ('POKEMON', 'STAT')})
+    current = batch_get(client, {POKEMON_SCHEMA['table_name']: [{'id': pokemon_id} for pokemon_id in pokemon_ids]},
+                        projections={POKEMON_SCHEMA['table_name']: 'id, trainer_id'}, consistent_read=True)
+    current = {pokemon['id']: pokemon for pokemon in current[POKEMON_SCHEMA['table_name']]}
+    summary['written'] += put_missing(trainer_table, relocated_stats(items, current), segments, write_rate)
+    stale = stale_keys(candidates, current)
+    summary['batch_calls'] += batch_write(
+        client, {trainer_table.name: [{'DeleteRequest': {'Key': key}} for key in stale]}, limiter=limiter)
+
+    trainer_ids = {item['trainer_id'] for item in candidates if item['entity'] == 'PROFILE'}
+    profiles = empty_profiles(trainer_table, trainer_ids)
+    summary['batch_calls'] += batch_write(
+        client, {trainer_table.name: [{'DeleteRequest': {'Key': key}} for key in profiles]}, limiter=limiter)
+    summary['stale_deleted'] = len(stale) + len(profiles)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--segments', type=int, default=4, help='parallel scan segments per source table')
+    parser.add_argument('--write-rate', type=float, help='maximum item writes per second')
+    parser.add_argument('--dry-run', action='store_true', help='read and count, but do not write')
+    args = parser.parse_args()
+
+    summary = migrate(boto3.resource('dynamodb'), args.segments, args.write_rate, args.dry_run)
+    print(f"{summary['pokemon']} Pokemon across {summary['trainers']} trainers -> "
+          f"{summary['items']} items in {TRAINER_TABLE_SCHEMA['table_name']}"
+          f"{' (dry run)' if args.dry_run else ''}")
+    print(f"{summary['written']} items written, {summary['stale_deleted']} stale items deleted, "
+          f"{summary['batch_calls']} BatchWriteItem calls, {summary['orphaned_stats']} orphaned stat rows skipped")
+
+
+if __name__ == '__main__':
+    main()
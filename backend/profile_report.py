@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Aggregate handler profiles into flame-graph input.
+
+Reads dumps written by lambda/profiling.py: `.json.gz` files (local_server
+writes them to backend/profiles/) and log exports containing `PROFILE <base64>`
+lines, e.g.
+
+    aws logs filter-log-events --log-group-name /aws/lambda/<function> \\
+        --filter-pattern PROFILE --query 'events[].message' --output text > profiles.log
+
+then prints folded stacks (`frame;frame;frame value`), summed across every
+invocation, for flamegraph.pl, speedscope or inferno:
+
+    python3 profile_report.py profiles.log > get_pokemons.folded
+    python3 profile_report.py profiles/ --metric alloc --summary > alloc.folded
+
+Time is in microseconds and allocations in bytes. Each stack starts with the
+handler name so several handlers can share one graph.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'lambda'))
+
+from profiling import LOG_PREFIX, decode_dump
+
+
+def read_dumps(paths):
+    """Yield every dump found in the given files, directories or stdin ('-')."""
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                yield from read_dumps([os.path.join(path, name)])
+        elif path.endswith('.json.gz'):
+            with gzip.open(path, 'rt') as f:
+                yield json.load(f)
+        else:
+            f = sys.stdin if path == '-' else open(path)
+            try:
+                for line in f:
+                    for chunk in line.split(LOG_PREFIX)[1:]:
+                        yield decode_dump(chunk.split()[0])
+            finally:
+                if f is not sys.stdin:
+                    f.close()
+
+
+def fold(dumps, metric):
+    folded = {}
+    for dump in dumps:
+        if metric == 'time':
+            stacks = dump['stacks'].items()
+        else:
+            stacks = ((';'.join(allocation['traceback']), allocation['size']) for allocation in dump['allocations'])
+        for stack, value in stacks:
+            key = f"{dump['handler']};{stack}"
+            folded[key] = folded.get(key, 0) + value
+    return folded
+
+
+def summarize(dumps, top, out):
+    """Print per-handler invocation latency and the hottest functions."""
+    by_handler = {}
+    for dump in dumps:
+        by_handler.setdefault(dump['handler'], []).append(dump)
+
+    for handler, handler_dumps in sorted(by_handler.items()):
+        durations = sorted(dump['duration_ms'] for dump in handler_dumps)
+        peak = max(dump['peak_bytes'] for dump in handler_dumps)
+        print(f'{handler}: {len(durations)} invocations, '
+              f'p50 {durations[len(durations) // 2]:.2f} ms, max {durations[-1]:.2f} ms, '
+              f'peak {peak / 1024:.1f} KiB', file=out)
+
+        functions = {}
+        for dump in handler_dumps:
+            for row in dump['functions']:
+                total = functions.setdefault(row['function'], [0, 0.0, 0.0])
+                total[0] += row['ncalls']
+                total[1] += row['tottime_ms']
+                total[2] += row['cumtime_ms']
+        print(f"  {'ncalls':>8}  {'tottime ms':>10}  {'cumtime ms':>10}  function", file=out)
+        rows = sorted(functions.items(), key=lambda item: item[1][2], reverse=True)[:top]
+        for function, (ncalls, tottime, cumtime) in rows:
+            print(f'  {ncalls:>8}  {tottime:>10.2f}  {cumtime:>10.2f}  {function}', file=out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='+', help="dump files, directories or log exports ('-' for stdin)")
+    parser.add_argument('--metric', choices=['time', 'alloc'], default='time')
+    parser.add_argument('--handler', help='only include dumps from this handler module')
+    parser.add_argument('--summary', action='store_true', help='print a per-handler summary to stderr')
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('-o', '--output', help='write folded stacks here instead of stdout')
+    args = parser.parse_args()
+
+    dumps = [dump for dump in read_dumps(args.paths) if args.handler in (None, dump['handler'])]
+    if not dumps:
+        sys.exit('No profiles found')
+
+    if args.summary:
+        summarize(dumps, args.top, sys.stderr)
+
+    out = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        for stack, value in sorted(fold(dumps, args.metric).items()):
+            if value:
+                out.write(f'{stack} {value}\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == '__main__':
+    main()
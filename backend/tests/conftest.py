@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Import the handlers' shared modules the way Lambda does, from lambda/
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'lambda'))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.harness import InMemoryDynamoDB, install_fake_boto3  # noqa: E402
+
+
+@pytest.fixture
+def dynamodb():
+    """An in-memory DynamoDB that `import boto3` in the handlers resolves to."""
+    resource = InMemoryDynamoDB()
+    install_fake_boto3(resource)
+    return resource
@@ -0,0 +1,128 @@
+import pytest
+
+import admission
+from admission import ConcurrencyLimiter, TokenBucketLimiter, client_key
+from benchmarks.harness import VirtualClock
+
+
+def test_client_key_uses_validated_api_key():
+    event = {'requestContext': {'identity': {'apiKey': 'partner-key', 'sourceIp': '203.0.113.7'}}}
+    assert client_key(event) == 'key:partner-key'
+
+
+def test_client_key_ignores_unvalidated_api_key_header():
+    event = {
+        'headers': {'x-api-key': 'made-up'},
+        'requestContext': {'identity': {'sourceIp': '203.0.113.7'}}
+    }
+    assert client_key(event) == 'ip:203.0.113.7'
+
+
+def test_token_bucket_allows_burst_then_refills():
+    clock = VirtualClock()
+    limiter = TokenBucketLimiter(rate=2, burst=3, clock=clock.now)
+    assert [limiter.try_acquire('a') for _ in range(3)] == [0, 0, 0]
+    assert limiter.try_acquire('a') == pytest.approx(0.5)
+    assert limiter.try_acquire('b') == 0
+    clock.sleep(0.5)
+    assert limiter.try_acquire('a') == 0
+
+
+def test_token_bucket_forgets_least_recently_seen_clients():
+    limiter = TokenBucketLimiter(rate=1, burst=1, max_clients=2, clock=VirtualClock().now)
+    for key in ('a', 'b', 'c'):
+        limiter.try_acquire(key)
+    # 'a' was evicted and starts again with a full bucket
+    assert limiter.try_acquire('a') == 0
+    assert limiter.try_acquire('c') > 0
+
+
+def test_concurrency_limit_ignores_slow_successful_requests():
+    limiter = ConcurrencyLimiter(initial_limit=1, max_limit=1)
+    for _ in range(100):
+        assert limiter.try_acquire()
+        limiter.release(overloaded=False)
+    assert limiter.limit == 1
+
+
+def test_concurrency_limit_backs_off_on_overload_and_recovers():
+    limiter = ConcurrencyLimiter(initial_limit=1, max_limit=1, min_limit=0.05, random_value=lambda: 0.0)
+    for _ in range(100):
+        assert limiter.try_acquire()
+        limiter.release(overloaded=True)
+    assert limiter.limit == 0.05
+
+    for _ in range(10):
+        assert limiter.try_acquire()
+        limiter.release(overloaded=False)
+    assert limiter.limit == pytest.approx(1)
+
+
+def test_concurrency_limit_below_one_admits_with_that_probability():
+    draws = iter([0.2, 0.6])
+    limiter = ConcurrencyLimiter(initial_limit=0.5, max_limit=1, random_value=lambda: next(draws))
+    assert limiter.try_acquire()
+    limiter.release()
+    assert not limiter.try_acquire()
+
+
+def test_concurrency_limit_caps_requests_in_flight():
+    limiter = ConcurrencyLimiter(initial_limit=2, max_limit=2)
+    assert limiter.try_acquire() and limiter.try_acquire()
+    assert not limiter.try_acquire()
+
+
+@pytest.fixture
+def limiters(monkeypatch):
+    clock = VirtualClock()
+    rate_limiter = TokenBucketLimiter(rate=1, burst=1, clock=clock.now)
+    concurrency_limiter = ConcurrencyLimiter(initial_limit=1, max_limit=1, random_value=lambda: 0.99)
+    monkeypatch.setattr(admission, 'rate_limiter', rate_limiter)
+    monkeypatch.setattr(admission, 'concurrency_limiter', concurrency_limiter)
+    return rate_limiter, concurrency_limiter
+
+
+def respond(status):
+    return admission.admission_controlled(lambda event, context: {'statusCode': status})
+
+
+def event(ip='203.0.113.7'):
+    return {'requestContext': {'identity': {'sourceIp': ip}}}
+
+
+def test_rate_limited_client_gets_429_with_retry_after(limiters):
+    handler = respond(200)
+    assert handler(event(), None)['statusCode'] == 200
+    response = handler(event(), None)
+    assert response['statusCode'] == 429
+    assert response['headers']['Retry-After'] == '1'
+    assert handler(event('198.51.100.1'), None)['statusCode'] == 200
+
+
+def test_shed_request_gets_429_without_calling_the_handler(limiters):
+    _, concurrency_limiter = limiters
+    concurrency_limiter.limit = 0.5
+    calls = []
+    handler = admission.admission_controlled(lambda event, context: calls.append(event))
+    response = handler(event(), None)
+    assert response['statusCode'] == 429
+    assert calls == []
+
+
+def test_server_errors_shrink_the_limit(limiters):
+    _, concurrency_limiter = limiters
+    respond(500)(event(), None)
+    assert concurrency_limiter.limit < 1
+    assert concurrency_limiter.inflight == 0
+
+
+def test_exceptions_shrink_the_limit(limiters):
+    _, concurrency_limiter = limiters
+
+    def fail(event, context):
+        raise RuntimeError('DynamoDB unavailable')
+
+    with pytest.raises(RuntimeError):
+        admission.admission_controlled(fail)(event(), None)
+    assert concurrency_limiter.limit < 1
+    assert concurrency_limiter.inflight == 0
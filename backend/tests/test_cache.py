@@ -0,0 +1,81 @@
+import cache
+from cache import InMemoryCache, invalidate, item_key, list_key, read_through
+
+
+def test_slow_reader_does_not_cache_item_loaded_before_update():
+    shared = InMemoryCache()
+
+    def stale_loader():
+        # The update lands while this reader is still loading the old item
+        invalidate(shared, '1')
+        return {'id': '1', 'name': 'Old'}
+
+    read_through(shared, item_key('1'), stale_loader)
+    assert shared.get(item_key('1')) is None
+    assert read_through(shared, item_key('1'), lambda: {'id': '1', 'name': 'New'}) == {'id': '1', 'name': 'New'}
+
+
+def test_slow_reader_does_not_resurrect_deleted_item():
+    shared = InMemoryCache()
+
+    def stale_loader():
+        invalidate(shared, '1')
+        return {'id': '1', 'name': 'Deleted'}
+
+    read_through(shared, item_key('1'), stale_loader)
+    assert read_through(shared, item_key('1'), lambda: None) is None
+
+
+def test_fill_stored_between_write_and_invalidate_is_removed():
+    shared = InMemoryCache()
+    # A reader loads and stores the old item after the DynamoDB write but
+    # before the writer invalidates
+    read_through(shared, item_key('1'), lambda: {'id': '1', 'name': 'Old'})
+    invalidate(shared, '1')
+    assert read_through(shared, item_key('1'), lambda: {'id': '1', 'name': 'New'}) == {'id': '1', 'name': 'New'}
+
+
+def test_concurrent_writers_leave_no_stale_item():
+    shared = InMemoryCache()
+    database = {'name': 'A'}
+    # Writers A and B both write DynamoDB (B lands last), then invalidate in
+    # the opposite order; neither stores a value that could be stale
+    database['name'] = 'B'
+    invalidate(shared, '1')
+    invalidate(shared, '1')
+    assert read_through(shared, item_key('1'), lambda: {'id': '1', **database})['name'] == 'B'
+
+
+def test_write_retires_list_filled_by_slow_reader():
+    shared = InMemoryCache()
+    key = list_key(shared)
+
+    def stale_loader():
+        invalidate(shared, '2')
+        return [{'id': '1'}]
+
+    read_through(shared, key, stale_loader)
+    assert list_key(shared) != key
+    assert read_through(shared, list_key(shared), lambda: [{'id': '1'}, {'id': '2'}]) == [{'id': '1'}, {'id': '2'}]
+
+
+def test_expired_lease_is_not_released_by_previous_holder():
+    shared = InMemoryCache()
+    lease_key = f'{item_key("1")}:lease'
+
+    def loader():
+        # Our lease expired and another caller took it
+        shared.set(lease_key, 'other-caller', cache.LEASE_TTL_SECONDS)
+        return {'id': '1'}
+
+    read_through(shared, item_key('1'), loader)
+    assert shared.get(lease_key) == 'other-caller'
+
+
+def test_hit_rate_counts_only_reads():
+    shared = InMemoryCache()
+    invalidate(shared, '1')
+    for _ in range(3):
+        read_through(shared, list_key(shared), lambda: [{'id': '1'}])
+    # Generation, version and lease lookups are not cache hits
+    assert (shared.hits, shared.misses) == (2, 1)
@@ -0,0 +1,104 @@
+import pytest
+
+
+class RecordingClient:
+    def __init__(self):
+        self.requests = []
+
+    def batch_get_item(self, RequestItems):
+        self.requests.append(RequestItems)
+        return {'Responses': {table_name: [] for table_name in RequestItems}, 'UnprocessedKeys': {}}
+
+
+@pytest.fixture
+def batch_get(dynamodb):
+    from dynamo_batch import batch_get
+    return batch_get
+
+
+def test_batch_get_is_eventually_consistent_by_default(batch_get):
+    client = RecordingClient()
+    batch_get(client, {'PokemonTable': [{'id': '1'}]})
+    assert 'ConsistentRead' not in client.requests[0]['PokemonTable']
+
+
+def test_batch_get_consistent_read_applies_to_every_table(batch_get):
+    client = RecordingClient()
+    batch_get(client, {'PokemonTable': [{'id': '1'}], 'PokemonTypesTable': [{'type_name': 'Fire'}]},
+              consistent_read=True)
+    assert all(request['ConsistentRead'] is True for request in client.requests[0].values())
+
+
+class ThrottledClient:
+    """Fails the first `failures` calls with a throttle, then succeeds."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.requests = []
+
+    def _call(self, operation, request):
+        from botocore.exceptions import ClientError
+
+        self.requests.append(request)
+        if len(self.requests) <= self.failures:
+            raise ClientError({'Error': {'Code': 'ThrottlingException', 'Message': 'Rate exceeded'}}, operation)
+        return {'UnprocessedItems': {}}
+
+    def transact_write_items(self, **request):
+        return self._call('TransactWriteItems', request)
+
+    def batch_write_item(self, **request):
+        return self._call('BatchWriteItem', request)
+
+
+@pytest.fixture
+def dynamo_batch(dynamodb, monkeypatch):
+    import dynamo_batch
+    monkeypatch.setattr(dynamo_batch, 'backoff', lambda attempt: None)
+    return dynamo_batch
+
+
+def test_transact_write_retries_with_the_same_token(dynamo_batch):
+    client = ThrottledClient(failures=2)
+    dynamo_batch.transact_write(client, [{'Put': {'TableName': 'PokemonTable', 'Item': {'id': '1'}}}])
+    tokens = {request['ClientRequestToken'] for request in client.requests}
+    assert len(client.requests) == 3 and len(tokens) == 1
+
+
+def test_transact_write_uses_a_new_token_per_call(dynamo_batch):
+    client = ThrottledClient(failures=0)
+    for _ in range(2):
+        dynamo_batch.transact_write(client, [{'Put': {'TableName': 'PokemonTable', 'Item': {'id': '1'}}}])
+    assert client.requests[0]['ClientRequestToken'] != client.requests[1]['ClientRequestToken']
+
+
+def test_transact_write_gives_up_after_max_attempts(dynamo_batch):
+    from botocore.exceptions import ClientError
+
+    client = ThrottledClient(failures=dynamo_batch.MAX_ATTEMPTS)
+    with pytest.raises(ClientError):
+        dynamo_batch.transact_write(client, [])
+    assert len(client.requests) == dynamo_batch.MAX_ATTEMPTS
+
+
+def test_batch_write_retries_throttled_requests(dynamo_batch):
+    client = ThrottledClient(failures=1)
+    requests = {'PokemonTable': [{'DeleteRequest': {'Key': {'id': '1'}}}]}
+    assert dynamo_batch.batch_write(client, requests) == 2
+    assert client.requests[1]['RequestItems'] == requests
+
+
+def test_batch_write_retries_unprocessed_items(dynamo_batch, dynamodb, monkeypatch):
+    from benchmarks.harness import VirtualClock
+
+    clock = VirtualClock()
+    client = dynamodb.meta.client
+    client.set_write_capacity(10, clock)
+    monkeypatch.setattr(dynamo_batch, 'backoff', lambda attempt: clock.sleep(1))
+    requests = [{'PutRequest': {'Item': {'id': str(index)}}} for index in range(25)]
+
+    calls = dynamo_batch.batch_write(client, {'PokemonTable': requests})
+
+    assert client.throttled_writes > 0
+    assert calls == 3
+    assert len(dynamodb.Table('PokemonTable').items) == 25
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from benchmarks.harness import InMemoryQueue, install_fake_boto3, load_handler
+
+
+def full_pokemon(index):
+    return {
+        'name': f'Import{index}', 'type': 'Water', 'secondary_type': 'Ice', 'level': 30, 'hp': 44,
+        'abilities': ['torrent', 'rain-dish'], 'trainer_id': 'partner-001', 'nature': 'Modest',
+        'moves': ['Surf', 'Ice Beam', 'Protect', 'Scald'], 'image': 'https://example.com/' + 'x' * 300
+    }
+
+
+@pytest.fixture
+def queue(dynamodb):
+    queue = InMemoryQueue()
+    install_fake_boto3(dynamodb, queue)
+    return queue
+
+
+@pytest.fixture
+def handler(queue):
+    return load_handler('enqueue_pokemon')
+
+
+def enqueue(handler, count):
+    return handler.lambda_handler({'body': json.dumps([full_pokemon(index) for index in range(count)])}, None)
+
+
+def test_messages_match_json_encoding(handler):
+    records = handler.validate_entries([full_pokemon(index) for index in range(60)])
+    messages = handler.build_messages('job-1', records)
+    assert [count for _, count in messages] == [25, 25, 10]
+    start = 0
+    for body, count in messages:
+        assert body == json.dumps({'job_id': 'job-1', 'records': records[start:start + count]})
+        start += count
+
+
+def test_large_import_stays_within_sqs_batch_limits(handler, queue, dynamodb):
+    response = enqueue(handler, 1000)
+    assert response['statusCode'] == 202
+    job_id = json.loads(response['body'])['jobId']
+    assert sum(len(json.loads(message['body'])['records']) for message in queue.messages) == 1000
+    assert dynamodb.Table('PokemonIngestJobsTable').items[(job_id,)]['status'] == 'QUEUED'
+
+
+def test_send_failure_fails_the_job(handler, queue, dynamodb):
+    send = queue.send_message_batch
+
+    def fail_after_first(**kwargs):
+        if queue.calls:
+            raise RuntimeError('SQS unavailable')
+        return send(**kwargs)
+
+    queue.send_message_batch = fail_after_first
+    response = enqueue(handler, 1000)
+    body = json.loads(response['body'])
+    assert response['statusCode'] == 500
+    queued = sum(len(json.loads(message['body'])['records']) for message in queue.messages)
+    job = dynamodb.Table('PokemonIngestJobsTable').items[(body['jobId'],)]
+    assert job['status'] == 'FAILED'
+    assert job['queued'] == body['queued'] == queued > 0
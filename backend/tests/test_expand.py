@@ -0,0 +1,100 @@
+import pytest
+
+from benchmarks.harness import VirtualClock
+from validation import ValidationError
+
+ABILITIES = 'PokemonAbilitiesTable'
+TYPES = 'PokemonTypesTable'
+
+
+@pytest.fixture
+def expand(dynamodb):
+    import expand
+    return expand
+
+
+@pytest.fixture
+def client(dynamodb):
+    """The in-memory client, recording the keys of every BatchGetItem."""
+    client = dynamodb.meta.client
+    batch_get_item = client.batch_get_item
+    client.requests = []
+
+    def recording_batch_get_item(RequestItems, **kwargs):
+        client.requests.append({table_name: request['Keys'] for table_name, request in RequestItems.items()})
+        return batch_get_item(RequestItems, **kwargs)
+
+    client.batch_get_item = recording_batch_get_item
+    dynamodb.Table(ABILITIES).put_item(Item={'ability_id': 'overgrow', 'name': 'Overgrow', 'generation': 3})
+    dynamodb.Table(TYPES).put_item(Item={'type_name': 'Grass', 'color': '#78C850'})
+    return client
+
+
+@pytest.fixture
+def clock():
+    return VirtualClock()
+
+
+@pytest.fixture
+def cache(expand, clock):
+    return expand.ReferenceCache(ttl=60, clock=clock.now)
+
+
+def bulbasaur(**fields):
+    return {'id': '1', 'name': 'Bulbasaur', 'type': 'Grass', 'abilities': ['overgrow'], **fields}
+
+
+@pytest.mark.parametrize('value, names', [
+    (None, set()), ('', set()), ('type', {'type'}), (' type , abilities,', {'type', 'abilities'})
+])
+def test_parse_expand(expand, value, names):
+    event = {'queryStringParameters': {'expand': value} if value is not None else None}
+    assert expand.parse_expand(event) == names
+
+
+def test_parse_expand_rejects_unknown_names(expand):
+    with pytest.raises(ValidationError) as error:
+        expand.parse_expand({'queryStringParameters': {'expand': 'type,moves'}})
+    assert 'expand' in error.value.errors
+
+
+def test_expand_replaces_references_with_one_batch_get(expand, client, cache):
+    [pokemon] = expand.expand(client, {'type', 'abilities'}, [bulbasaur()], cache)
+    assert pokemon['type'] == {'type_name': 'Grass', 'color': '#78C850'}
+    assert pokemon['abilities'] == [{'ability_id': 'overgrow', 'name': 'Overgrow', 'generation': 3}]
+    assert len(client.requests) == 1
+
+
+def test_cached_references_make_no_calls_until_they_expire(expand, client, cache, clock):
+    expand.resolve(client, {'abilities'}, [bulbasaur()], cache)
+    expand.resolve(client, {'abilities'}, [bulbasaur()], cache)
+    assert len(client.requests) == 1
+
+    clock.sleep(61)
+    expand.resolve(client, {'abilities'}, [bulbasaur()], cache)
+    assert len(client.requests) == 2
+
+
+def test_unknown_references_are_cached_and_left_as_they_are(expand, client, cache):
+    items = [bulbasaur(abilities=['overgrow', 'no-such-ability'])]
+    [pokemon] = expand.expand(client, {'abilities'}, items, cache)
+    assert pokemon['abilities'][1] == 'no-such-ability'
+    assert cache.get(ABILITIES, 'no-such-ability') is None
+
+    expand.expand(client, {'abilities'}, items, cache)
+    assert len(client.requests) == 1
+
+
+def test_empty_references_are_not_requested(expand, client, cache):
+    [pokemon] = expand.expand(client, {'abilities', 'type'}, [bulbasaur(abilities=['', 'overgrow'],
+                                                                       secondary_type='')], cache)
+    assert client.requests == [{ABILITIES: [{'ability_id': 'overgrow'}], TYPES: [{'type_name': 'Grass'}]}]
+    assert pokemon['abilities'][0] == ''
+    assert pokemon['secondary_type'] == ''
+
+
+def test_more_than_100_keys_are_read_in_chunks(expand, client, cache):
+    items = [bulbasaur(id=str(index), abilities=[f'ability-{index}']) for index in range(150)]
+    expand.resolve(client, {'abilities'}, items, cache)
+    assert [len(request[ABILITIES]) for request in client.requests] == [100, 50]
+    assert all(cache.get(ABILITIES, f'ability-{index}') is None for index in range(150))
@@ -0,0 +1,114 @@
+import json
+import types
+
+import pytest
+
+from benchmarks.harness import InMemoryQueue, install_fake_boto3, load_handler
+
+
+@pytest.fixture
+def queue(dynamodb):
+    queue = InMemoryQueue()
+    install_fake_boto3(dynamodb, queue)
+    return queue
+
+
+@pytest.fixture
+def consumer(queue):
+    consumer = load_handler('ingest_pokemon')
+    # The table is not throttled; pacing writes would only slow the tests down
+    consumer.limiter = None
+    return consumer
+
+
+def enqueue(count):
+    body = [{'name': f'Import{index}', 'type': 'Water'} for index in range(count)]
+    response = load_handler('enqueue_pokemon').lambda_handler({'body': json.dumps(body)}, None)
+    return json.loads(response['body'])['jobId']
+
+
+def job(dynamodb, job_id):
+    return dynamodb.Table('PokemonIngestJobsTable').items[(job_id,)]
+
+
+def out_of_time():
+    return types.SimpleNamespace(get_remaining_time_in_millis=lambda: 0)
+
+
+def at_last_receive(consumer, records):
+    for record in records:
+        record['attributes']['ApproximateReceiveCount'] = str(consumer.MAX_RECEIVE_COUNT)
+    return records
+
+
+def test_drained_job_completes(consumer, queue, dynamodb):
+    job_id = enqueue(60)
+    while queue.messages:
+        records = queue.receive()
+        queue.complete(records, consumer.lambda_handler({'Records': records}, None)['batchItemFailures'])
+    assert job(dynamodb, job_id)['status'] == 'COMPLETED'
+    assert job(dynamodb, job_id)['processed'] == 60
+    assert len(dynamodb.Table('PokemonTable').items) == 60
+    response = load_handler('get_ingest_job').lambda_handler({'pathParameters': {'id': job_id}}, None)
+    assert response['statusCode'] == 200
+    assert 'counted_messages' not in json.loads(response['body'])
+
+
+def test_redelivered_messages_are_counted_once(consumer, queue, dynamodb):
+    job_id = enqueue(60)
+    records = queue.receive()
+    consumer.lambda_handler({'Records': records}, None)
+    consumer.lambda_handler({'Records': records}, None)
+    assert job(dynamodb, job_id)['processed'] == 60
+
+
+def test_skipped_messages_are_redelivered_uncounted(consumer, queue, dynamodb):
+    job_id = enqueue(60)
+    records = queue.receive()
+    response = consumer.lambda_handler({'Records': records}, out_of_time())
+    assert len(response['batchItemFailures']) == len(records)
+    assert job(dynamodb, job_id).get('failed', 0) == 0
+    assert job(dynamodb, job_id)['status'] == 'QUEUED'
+
+
+def test_skipped_messages_count_as_failed_on_last_receive(consumer, queue, dynamodb):
+    job_id = enqueue(60)
+    records = at_last_receive(consumer, queue.receive())
+    consumer.lambda_handler({'Records': records}, out_of_time())
+    assert job(dynamodb, job_id)['failed'] == 60
+    assert job(dynamodb, job_id)['status'] == 'COMPLETED_WITH_ERRORS'
+
+
+def test_write_failures_count_as_failed_on_last_receive(consumer, queue, dynamodb, monkeypatch):
+    def fail(records):
+        raise RuntimeError('table unavailable')
+
+    monkeypatch.setattr(consumer, 'write_records', fail)
+    job_id = enqueue(60)
+    records = at_last_receive(consumer, queue.receive())
+    response = consumer.lambda_handler({'Records': records}, None)
+    assert len(response['batchItemFailures']) == len(records)
+    assert job(dynamodb, job_id)['failed'] == 60
+
+
+def test_counter_failure_redelivers_without_double_counting(consumer, queue, dynamodb, monkeypatch):
+    job_id = enqueue(60)
+    records = queue.receive()
+    count_message = consumer.count_message
+    calls = []
+
+    def fail_second(*args):
+        calls.append(args)
+        if len(calls) == 2:
+            raise RuntimeError('jobs table unavailable')
+        return count_message(*args)
+
+    monkeypatch.setattr(consumer, 'count_message', fail_second)
+    response = consumer.lambda_handler({'Records': records}, None)
+    assert [failure['itemIdentifier'] for failure in response['batchItemFailures']] == [records[1]['messageId']]
+    assert job(dynamodb, job_id)['processed'] == 35
+
+    monkeypatch.setattr(consumer, 'count_message', count_message)
+    consumer.lambda_handler({'Records': records}, None)
+    assert job(dynamodb, job_id)['processed'] == 60
+    assert job(dynamodb, job_id)['status'] == 'COMPLETED'
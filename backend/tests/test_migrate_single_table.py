@@ -0,0 +1,107 @@
+import json
+import sys
+
+import pytest
+
+from benchmarks.harness import load_handler
+from pokemon_stats import build_stat_rows
+
+TRAINER_TABLE = 'PokemonTrainerTable'
+
+
+@pytest.fixture
+def handlers(dynamodb, monkeypatch):
+    monkeypatch.setenv('TRAINER_TABLE_NAME', TRAINER_TABLE)
+    # trainer_table reads TRAINER_TABLE_NAME at import
+    monkeypatch.delitem(sys.modules, 'trainer_table', raising=False)
+    return {name: load_handler(name) for name in ('update_pokemon', 'delete_pokemon', 'get_trainer_roster')}
+
+
+@pytest.fixture
+def migration(dynamodb):
+    import migrate_single_table
+    return migrate_single_table
+
+
+def seed_source(dynamodb, pokemon_id, trainer_id):
+    """A Pokemon written before the single table existed, so it is not mirrored."""
+    pokemon = {'id': pokemon_id, 'name': pokemon_id.title(), 'type': 'Grass', 'trainer_id': trainer_id}
+    dynamodb.Table('PokemonTable').put_item(Item=pokemon)
+    for row in build_stat_rows(pokemon):
+        dynamodb.Table('PokemonStatsTable').put_item(Item=row)
+
+
+def partitions(dynamodb, pokemon_id):
+    return {pk for pk, sk in dynamodb.Table(TRAINER_TABLE).items if sk.startswith(f'POKEMON#{pokemon_id}')}
+
+
+def update(handlers, pokemon_id, **fields):
+    handlers['update_pokemon'].lambda_handler({
+        'pathParameters': {'id': pokemon_id},
+        'body': json.dumps({'name': 'Ivysaur', 'type': 'Grass', **fields})
+    }, None)
+
+
+def test_backfill_copies_every_pokemon(migration, dynamodb):
+    seed_source(dynamodb, 'bulbasaur', 'ash')
+    seed_source(dynamodb, 'oddish', None)
+
+    summary = migration.migrate(dynamodb)
+
+    assert partitions(dynamodb, 'bulbasaur') == {'TRAINER#ash'}
+    assert partitions(dynamodb, 'oddish') == {'POKEMON#oddish'}
+    # Two Pokemon with six stats each, plus ash's profile
+    assert summary['written'] == 15
+    assert migration.migrate(dynamodb)['written'] == 0
+
+
+def test_live_writes_during_the_copy_are_kept(handlers, migration, dynamodb, monkeypatch):
+    for pokemon_id in ('bulbasaur', 'oddish', 'caterpie'):
+        seed_source(dynamodb, pokemon_id, 'ash')
+    put_missing = migration.put_missing
+    copies = []
+
+    def writes_after_the_scan(*args, **kwargs):
+        if not copies:
+            update(handlers, 'bulbasaur', trainer_id='ash')
+            update(handlers, 'oddish', trainer_id='misty')
+            handlers['delete_pokemon'].lambda_handler({'pathParameters': {'id': 'caterpie'}}, None)
+        copies.append(args)
+        return put_missing(*args, **kwargs)
+
+    monkeypatch.setattr(migration, 'put_missing', writes_after_the_scan)
+    migration.migrate(dynamodb)
+
+    items = dynamodb.Table(TRAINER_TABLE).items
+    assert items[('TRAINER#ash', 'POKEMON#bulbasaur')]['name'] == 'Ivysaur'
+    assert partitions(dynamodb, 'oddish') == {'TRAINER#misty'}
+    assert len([key for key in items if key[1].startswith('POKEMON#oddish')]) == 7
+    assert partitions(dynamodb, 'caterpie') == set()
+
+
+def test_stale_items_and_empty_profiles_are_removed(handlers, migration, dynamodb):
+    seed_source(dynamodb, 'bulbasaur', 'ash')
+    trainer_table = dynamodb.Table(TRAINER_TABLE)
+    # Left behind by a failed delete and by a trainer whose last Pokemon left
+    trainer_table.put_item(Item={'pk': 'TRAINER#ash', 'sk': 'POKEMON#gone', 'gsi1pk': 'POKEMON#gone',
+                                 'entity': 'POKEMON', 'id': 'gone'})
+    trainer_table.put_item(Item={'pk': 'TRAINER#gary', 'sk': 'PROFILE', 'entity': 'PROFILE', 'trainer_id': 'gary'})
+
+    summary = migration.migrate(dynamodb)
+
+    assert summary['stale_deleted'] == 2
+    assert ('TRAINER#ash', 'POKEMON#gone') not in trainer_table.items
+    assert ('TRAINER#gary', 'PROFILE') not in trainer_table.items
+    assert ('TRAINER#ash', 'PROFILE') in trainer_table.items
+
+
+def test_roster_without_pokemon_is_404_in_both_layouts(handlers, migration, dynamodb, monkeypatch):
+    seed_source(dynamodb, 'bulbasaur', 'ash')
+    migration.migrate(dynamodb)
+    handlers['delete_pokemon'].lambda_handler({'pathParameters': {'id': 'bulbasaur'}}, None)
+
+    event = {'pathParameters': {'id': 'ash'}}
+    assert handlers['get_trainer_roster'].lambda_handler(event, None)['statusCode'] == 404
+    monkeypatch.delenv('TRAINER_TABLE_NAME')
+    monkeypatch.delitem(sys.modules, 'trainer_table')
+    assert load_handler('get_trainer_roster').lambda_handler(event, None)['statusCode'] == 404
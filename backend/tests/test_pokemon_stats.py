@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+from benchmarks.harness import load_handler
+from pokemon_stats import STAT_NAMES, build_stat_rows
+
+
+def stat_rows(dynamodb, pokemon_id):
+    return [row for (owner, _), row in dynamodb.Table('PokemonStatsTable').items.items() if owner == pokemon_id]
+
+
+@pytest.mark.parametrize('hp, base_value', [(0, 1), (45, 45), (999, 255)])
+def test_base_values_are_clamped_to_the_stat_range(hp, base_value):
+    rows = {row['stat_name']: row for row in build_stat_rows({'id': '1', 'hp': hp})}
+    assert rows['hp']['base_value'] == base_value
+    assert rows['hp']['current_value'] == base_value
+
+
+def test_create_writes_six_stat_rows(dynamodb):
+    create_pokemon = load_handler('create_pokemon')
+    event = {'body': json.dumps({'name': 'Pikachu', 'type': 'Electric', 'hp': 999, 'attack': 55})}
+
+    response = create_pokemon.lambda_handler(event, None)
+
+    assert response['statusCode'] == 201
+    rows = {row['stat_name']: row for row in stat_rows(dynamodb, json.loads(response['body'])['id'])}
+    assert sorted(rows) == sorted(STAT_NAMES)
+    assert rows['hp']['base_value'] == 255
+    assert rows['attack']['base_value'] == 55
+
+
+def test_delete_removes_stat_rows(dynamodb):
+    response = load_handler('create_pokemon').lambda_handler(
+        {'body': json.dumps({'name': 'Pikachu', 'type': 'Electric'})}, None)
+    pokemon_id = json.loads(response['body'])['id']
+    load_handler('create_pokemon').lambda_handler({'body': json.dumps({'name': 'Eevee', 'type': 'Normal'})}, None)
+
+    response = load_handler('delete_pokemon').lambda_handler({'pathParameters': {'id': pokemon_id}}, None)
+
+    assert response['statusCode'] == 204
+    assert stat_rows(dynamodb, pokemon_id) == []
+    assert pokemon_id not in {key[0] for key in dynamodb.Table('PokemonTable').items}
+    assert len(dynamodb.Table('PokemonStatsTable').items) == len(STAT_NAMES)
+
+
+def test_sweeper_deletes_only_orphaned_rows(dynamodb):
+    stats = dynamodb.Table('PokemonStatsTable')
+    dynamodb.Table('PokemonTable').put_item(Item={'id': 'alive', 'name': 'Pikachu', 'type': 'Electric'})
+    for row in build_stat_rows({'id': 'alive'}) + build_stat_rows({'id': 'orphan'}):
+        stats.put_item(Item=row)
+
+    summary = load_handler('stats_sweeper').lambda_handler({}, None)
+
+    assert summary == {'scannedRows': 12, 'pokemonChecked': 2, 'orphanedRowsDeleted': 6}
+    assert stat_rows(dynamodb, 'orphan') == []
+    assert len(stat_rows(dynamodb, 'alive')) == len(STAT_NAMES)
@@ -0,0 +1,84 @@
+import gzip
+import json
+import sys
+
+import pytest
+
+import profile_report
+import profiling
+
+retained = []
+
+
+def handler(event, context):
+    retained.extend(str(index) * 10 for index in range(5000))
+    return {'statusCode': 200}
+
+
+@pytest.fixture
+def profile_every_invocation(monkeypatch):
+    monkeypatch.setattr(profiling, 'SAMPLE_RATE', 1.0)
+    retained.clear()
+
+
+def test_handler_is_unchanged_when_sampling_is_off(monkeypatch):
+    monkeypatch.setattr(profiling, 'SAMPLE_RATE', 0.0)
+    assert profiling.profiled(handler) is handler
+
+
+def test_dump_is_written_to_profile_dir(profile_every_invocation, monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, 'PROFILE_DIR', str(tmp_path))
+    assert profiling.profiled(handler)({}, None) == {'statusCode': 200}
+
+    [path] = tmp_path.iterdir()
+    assert path.name.startswith('test_profiling-') and path.name.endswith('.json.gz')
+    with gzip.open(path, 'rt') as f:
+        dump = json.load(f)
+    assert dump['handler'] == 'test_profiling'
+    assert dump['duration_ms'] > 0 and dump['peak_bytes'] > 0
+    assert any('handler (test_profiling.py' in row['function'] for row in dump['functions'])
+    assert any('test_profiling.py' in frame for allocation in dump['allocations'] for frame in allocation['traceback'])
+
+
+def test_dump_is_logged_without_profile_dir(profile_every_invocation, monkeypatch, capsys):
+    monkeypatch.setattr(profiling, 'PROFILE_DIR', None)
+    profiling.profiled(handler)({}, None)
+
+    [line] = capsys.readouterr().out.splitlines()
+    assert line.startswith(profiling.LOG_PREFIX)
+    assert profiling.decode_dump(line[len(profiling.LOG_PREFIX):])['handler'] == 'test_profiling'
+
+
+@pytest.fixture
+def dumps(profile_every_invocation, monkeypatch, capsys, tmp_path):
+    """One dump in a profile directory and one in a log export."""
+    monkeypatch.setattr(profiling, 'PROFILE_DIR', str(tmp_path / 'profiles'))
+    profiling.profiled(handler)({}, None)
+    monkeypatch.setattr(profiling, 'PROFILE_DIR', None)
+    profiling.profiled(handler)({}, None)
+    (tmp_path / 'profiles.log').write_text('2026-10-19T12:00:00 ' + capsys.readouterr().out)
+    return [str(tmp_path / 'profiles'), str(tmp_path / 'profiles.log')]
+
+
+def run_report(monkeypatch, capsys, *args):
+    monkeypatch.setattr(sys, 'argv', ['profile_report.py', *args])
+    profile_report.main()
+    out, err = capsys.readouterr()
+    folded = {}
+    for line in out.splitlines():
+        stack, value = line.rsplit(' ', 1)
+        folded[stack] = int(value)
+    return folded, err
+
+
+def test_report_summarizes_time_stacks(dumps, monkeypatch, capsys):
+    folded, summary = run_report(monkeypatch, capsys, *dumps, '--summary')
+    assert folded and all(stack.startswith('test_profiling;') for stack in folded)
+    assert any('handler (test_profiling.py' in stack for stack in folded)
+    assert summary.startswith('test_profiling: 2 invocations')
+
+
+def test_report_folds_allocations(dumps, monkeypatch, capsys):
+    folded, _ = run_report(monkeypatch, capsys, *dumps, '--metric', 'alloc')
+    held = [value for stack, value in folded.items() if 'test_profiling.py' in stack]
+    assert held and sum(held) >= 5000 * 10
@@ -0,0 +1,63 @@
+import json
+import sys
+
+import pytest
+
+from benchmarks.harness import load_handler
+
+TRAINER_TABLE = 'PokemonTrainerTable'
+
+
+@pytest.fixture
+def handlers(dynamodb, monkeypatch):
+    monkeypatch.setenv('TRAINER_TABLE_NAME', TRAINER_TABLE)
+    # trainer_table reads TRAINER_TABLE_NAME at import
+    monkeypatch.delitem(sys.modules, 'trainer_table', raising=False)
+    return {name: load_handler(name) for name in ('create_pokemon', 'update_pokemon', 'delete_pokemon')}
+
+
+@pytest.fixture
+def stale_index(dynamodb, monkeypatch):
+    """Make the ByPokemon index return nothing, as if it had not caught up yet."""
+    table = dynamodb.Table(TRAINER_TABLE)
+    query = table.query
+
+    def stale_query(**kwargs):
+        if kwargs.get('IndexName'):
+            return {'Items': [], 'Count': 0}
+        return query(**kwargs)
+
+    monkeypatch.setattr(table, 'query', stale_query)
+
+
+def create(handlers, trainer_id):
+    body = {'name': 'Bulbasaur', 'type': 'Grass', 'trainer_id': trainer_id}
+    response = handlers['create_pokemon'].lambda_handler({'body': json.dumps(body)}, None)
+    return json.loads(response['body'])['id']
+
+
+def items_for(dynamodb, pokemon_id):
+    return sorted(key for key in dynamodb.Table(TRAINER_TABLE).items if f'POKEMON#{pokemon_id}' in key[1])
+
+
+def test_trainer_change_moves_items_despite_stale_index(handlers, dynamodb, stale_index):
+    pokemon_id = create(handlers, 'ash')
+    assert {pk for pk, _ in items_for(dynamodb, pokemon_id)} == {'TRAINER#ash'}
+
+    handlers['update_pokemon'].lambda_handler({
+        'pathParameters': {'id': pokemon_id},
+        'body': json.dumps({'name': 'Ivysaur', 'type': 'Grass', 'trainer_id': 'misty'})
+    }, None)
+
+    moved = items_for(dynamodb, pokemon_id)
+    assert {pk for pk, _ in moved} == {'TRAINER#misty'}
+    assert len(moved) == 7  # the Pokemon and its six stat rows
+    assert dynamodb.Table(TRAINER_TABLE).items[('TRAINER#misty', f'POKEMON#{pokemon_id}')]['name'] == 'Ivysaur'
+
+
+def test_delete_removes_items_despite_stale_index(handlers, dynamodb, stale_index):
+    pokemon_id = create(handlers, 'ash')
+    response = handlers['delete_pokemon'].lambda_handler({'pathParameters': {'id': pokemon_id}}, None)
+    assert response['statusCode'] == 204
+    assert items_for(dynamodb, pokemon_id) == []
+    assert ('TRAINER#ash', 'PROFILE') in dynamodb.Table(TRAINER_TABLE).items
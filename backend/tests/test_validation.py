@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+from benchmarks.harness import load_handler
+from validation import ValidationError, validate_pokemon, validate_stat
+
+
+@pytest.mark.parametrize('experience', ['1e50', 1e300, 10 ** 40, '1.5e-200', '1.' + '1' * 40])
+def test_rejects_numbers_dynamodb_cannot_store(experience):
+    with pytest.raises(ValidationError) as error:
+        validate_pokemon({'name': 'Pikachu', 'type': 'Electric', 'experience': experience})
+    assert 'experience' in error.value.errors
+
+
+@pytest.mark.parametrize('experience, expected', [('12000', 12000), (12000.0, 12000), (10 ** 37, 10 ** 37)])
+def test_accepts_storable_numbers(experience, expected):
+    assert validate_pokemon({'name': 'Pikachu', 'type': 'Electric', 'experience': experience})['experience'] == expected
+
+
+def pokemon(**fields):
+    return {'name': 'Pikachu', 'type': 'Electric', **fields}
+
+
+@pytest.mark.parametrize('field, value', [
+    ('level', 0), ('level', 101), ('level', 50.5), ('hp', -1), ('hp', 1000), ('pokedexNumber', 1026),
+    ('name', ''), ('name', 'x' * 51), ('type', 'x' * 21), ('image', 'x' * 2049),
+    ('gender', 'X'), ('moves', ['a', 'b', 'c', 'd', 'e']), ('abilities', [1]), ('abilities', ['overgrow', '']),
+    ('is_shiny', 'maybe')
+])
+def test_rejects_out_of_range_fields(field, value):
+    with pytest.raises(ValidationError) as error:
+        validate_pokemon(pokemon(**{field: value}))
+    assert list(error.value.errors) == [field]
+
+
+@pytest.mark.parametrize('field, value', [
+    ('level', 1), ('level', 100), ('level', '42'), ('hp', 0), ('hp', 999), ('name', 'x' * 50),
+    ('type', 'x' * 20), ('image', 'x' * 2048), ('moves', ['a', 'b', 'c', 'd']), ('is_shiny', 'true')
+])
+def test_accepts_boundary_values(field, value):
+    assert field in validate_pokemon(pokemon(**{field: value}))
+
+
+@pytest.mark.parametrize('field', ['id', 'created_at', 'updated_at'])
+def test_rejects_server_managed_fields(field):
+    with pytest.raises(ValidationError) as error:
+        validate_pokemon(pokemon(**{field: 'client-value'}))
+    assert error.value.errors == {field: 'is set by the server'}
+
+
+def test_unknown_fields_are_dropped():
+    assert 'nickname' not in validate_pokemon(pokemon(nickname='Sparky'))
+
+
+@pytest.mark.parametrize('field, value, valid', [
+    ('iv', 0, True), ('iv', 31, True), ('iv', -1, False), ('iv', 32, False),
+    ('base_value', 1, True), ('base_value', 255, True), ('base_value', 0, False), ('base_value', 256, False),
+    ('ev', 255, True), ('ev', 256, False), ('modifier', -6, True), ('modifier', 7, False)
+])
+def test_stat_ranges(field, value, valid):
+    stat = {'stat_name': 'hp', field: value}
+    if valid:
+        assert validate_stat(stat)[field] == value
+    else:
+        with pytest.raises(ValidationError) as error:
+            validate_stat(stat)
+        assert list(error.value.errors) == [field]
+
+
+@pytest.fixture
+def handlers(dynamodb):
+    return {name: load_handler(name) for name in ('create_pokemon', 'update_pokemon')}
+
+
+@pytest.mark.parametrize('handler_name', ['create_pokemon', 'update_pokemon'])
+@pytest.mark.parametrize('body, fields', [
+    ({'name': '', 'type': 'Fire', 'level': 101}, {'name', 'level'}),
+    ({'type': 'Fire'}, {'name'}),
+    ({'name': 'Charmander', 'type': 'Fire', 'id': 'chosen-by-client'}, {'id'}),
+    ({'name': 'Charmander', 'type': 'Fire', 'created_at': '2024-01-01T00:00:00Z'}, {'created_at'}),
+])
+def test_handlers_return_400_with_fields(handlers, dynamodb, handler_name, body, fields):
+    event = {'pathParameters': {'id': 'existing'}, 'body': json.dumps(body)}
+    response = handlers[handler_name].lambda_handler(event, None)
+    assert response['statusCode'] == 400
+    assert set(json.loads(response['body'])['fields']) == fields
+    assert not dynamodb.Table('PokemonTable').items
+
+
+def test_create_rejects_invalid_stats(handlers, dynamodb):
+    body = {'name': 'Charmander', 'type': 'Fire', 'stats': {'hp': {'iv': 40}, 'luck': {}}}
+    response = handlers['create_pokemon'].lambda_handler({'body': json.dumps(body)}, None)
+    assert response['statusCode'] == 400
+    assert set(json.loads(response['body'])['fields']) == {'stats.hp.iv', 'stats.luck'}
+    assert not dynamodb.Table('PokemonStatsTable').items
+
+
+@pytest.mark.parametrize('handler_name', ['create_pokemon', 'update_pokemon'])
+def test_handlers_reject_malformed_json(handlers, handler_name):
+    response = handlers[handler_name].lambda_handler({'pathParameters': {'id': '1'}, 'body': '{'}, None)
+    assert response['statusCode'] == 400
+    assert json.loads(response['body'])['fields'] == {'body': 'must be valid JSON'}
@@ -64,11 +64,57 @@ class DatabaseStack(Stack):
             billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST
         )
 
+        # Ingestion job status (for POST /pokemons:enqueue)
+        jobs_table = dynamodb.Table(
+            self, "PokemonIngestJobsTable",
+            table_name="PokemonIngestJobsTable",
+            partition_key=dynamodb.Attribute(
+                name="job_id",
+                type=dynamodb.AttributeType.STRING
+            ),
+            time_to_live_attribute="expires_at",
+            removal_policy=RemovalPolicy.DESTROY,
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST
+        )
+
+        # Optional single-table layout (cdk deploy -c single_table=true):
+        # trainer profile, Pokemon and stats under one TRAINER#<id> partition
+        trainer_table = None
+        if self.node.try_get_context("single_table") in (True, "true"):
+            trainer_table = dynamodb.Table(
+                self, "PokemonTrainerTable",
+                table_name="PokemonTrainerTable",
+                partition_key=dynamodb.Attribute(
+                    name="pk",
+                    type=dynamodb.AttributeType.STRING
+                ),
+                sort_key=dynamodb.Attribute(
+                    name="sk",
+                    type=dynamodb.AttributeType.STRING
+                ),
+                removal_policy=RemovalPolicy.DESTROY,
+                billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST
+            )
+            trainer_table.add_global_secondary_index(
+                index_name="ByPokemon",
+                partition_key=dynamodb.Attribute(
+                    name="gsi1pk",
+                    type=dynamodb.AttributeType.STRING
+                ),
+                sort_key=dynamodb.Attribute(
+                    name="sk",
+                    type=dynamodb.AttributeType.STRING
+                )
+            )
+
         # Output table names
         CfnOutput(self, "PokemonTableName", value=pokemon_table.table_name)
         CfnOutput(self, "TypesTableName", value=types_table.table_name)
         CfnOutput(self, "AbilitiesTableName", value=abilities_table.table_name)
         CfnOutput(self, "StatsTableName", value=stats_table.table_name)
+        CfnOutput(self, "IngestJobsTableName", value=jobs_table.table_name)
+        if trainer_table:
+            CfnOutput(self, "TrainerTableName", value=trainer_table.table_name)
 
 app = cdk.App()
 DatabaseStack(app, "PokemonDatabaseStack")
@@ -9,6 +9,8 @@ Tables:
 2. PokemonTypesTable - Pokemon type reference data
 3. PokemonAbilitiesTable - Pokemon abilities reference data
 4. PokemonStatsTable - Detailed pokemon statistics
+5. PokemonIngestJobsTable - Status of asynchronous bulk imports
+6. PokemonTrainerTable - Optional single-table layout of tables 1-4
 """
 
 # Pokemon Table Schema
@@ -33,7 +35,28 @@ POKEMON_SCHEMA = {
         "gender": "string",      # Male/Female/Unknown
         "nature": "string",      # Pokemon nature
         "experience": "number",  # Experience points
-        "moves": "list"          # List of move names
+        "moves": "list",         # List of move names
+        "image": "string",       # Sprite URL
+        "pokedexNumber": "number"  # National Dex number
+    },
+    # Request validation rules (compiled by backend/lambda/validation.py)
+    "required": ["name", "type"],
+    "server_managed": ["id", "created_at", "updated_at"],
+    "constraints": {
+        "name": {"min_length": 1, "max_length": 50},
+        "type": {"min_length": 1, "max_length": 20},
+        "secondary_type": {"max_length": 20},
+        "level": {"integer": True, "min": 1, "max": 100},
+        "hp": {"integer": True, "min": 0, "max": 999},
+        "attack": {"integer": True, "min": 0, "max": 999},
+        "defense": {"integer": True, "min": 0, "max": 999},
+        "speed": {"integer": True, "min": 0, "max": 999},
+        "abilities": {"items": {"type": "string", "min_length": 1}, "max_length": 4},
+        "gender": {"enum": ["Male", "Female", "Unknown"]},
+        "experience": {"integer": True, "min": 0},
+        "moves": {"items": "string", "max_length": 4},
+        "image": {"max_length": 2048},
+        "pokedexNumber": {"integer": True, "min": 0, "max": 1025}
     }
 }
 
@@ -78,6 +101,63 @@ STATS_SCHEMA = {
         "iv": "number",            # Individual Value (0-31)
         "ev": "number",            # Effort Value (0-255)
         "modifier": "number"        # Temporary modifier
+    },
+    "required": ["stat_name"],
+    "server_managed": ["pokemon_id"],
+    "constraints": {
+        "stat_name": {"enum": ["hp", "attack", "defense", "sp_attack", "sp_defense", "speed"]},
+        "base_value": {"integer": True, "min": 1, "max": 255},
+        "current_value": {"integer": True, "min": 0},
+        "iv": {"integer": True, "min": 0, "max": 31},
+        "ev": {"integer": True, "min": 0, "max": 255},
+        "modifier": {"integer": True, "min": -6, "max": 6}
+    }
+}
+
+# Ingest Jobs Table Schema
+INGEST_JOBS_SCHEMA = {
+    "table_name": "PokemonIngestJobsTable",
+    "partition_key": "job_id",
+    "ttl_attribute": "expires_at",
+    "attributes": {
+        "job_id": "string",         # Primary key - UUID
+        "status": "string",         # QUEUED, COMPLETED, COMPLETED_WITH_ERRORS
+        "total": "number",          # Pokemon accepted by the enqueue call
+        "processed": "number",      # Pokemon written so far
+        "failed": "number",         # Pokemon that could not be written
+        "created_at": "string",     # ISO timestamp
+        "updated_at": "string",     # ISO timestamp
+        "expires_at": "number"      # Epoch seconds; expired jobs are removed by TTL
+    }
+}
+
+# Single-table layout (optional, `cdk deploy -c single_table=true`)
+#
+# A trainer's profile, Pokemon and stats share the TRAINER#<trainer_id>
+# partition, so a whole roster is read with one Query. Pokemon without a
+# trainer get a partition of their own. Every Pokemon and stat item also
+# carries gsi1pk = POKEMON#<id>, so a Pokemon can be found by id alone.
+#
+#   pk                      sk                           entity
+#   TRAINER#<trainer_id>    PROFILE                      PROFILE
+#   TRAINER#<trainer_id>    POKEMON#<id>                 POKEMON
+#   TRAINER#<trainer_id>    POKEMON#<id>#STAT#<stat>     STAT
+#   POKEMON#<id>            POKEMON#<id>[#STAT#<stat>]   POKEMON / STAT (no trainer)
+#   TYPE#<type_name>        TYPE                         TYPE
+#   ABILITY#<ability_id>    ABILITY                      ABILITY
+TRAINER_TABLE_SCHEMA = {
+    "table_name": "PokemonTrainerTable",
+    "partition_key": "pk",
+    "sort_key": "sk",
+    "indexes": {
+        "ByPokemon": {"partition_key": "gsi1pk", "sort_key": "sk"}
+    },
+    "attributes": {
+        "pk": "string",             # TRAINER#, POKEMON#, TYPE# or ABILITY# prefixed
+        "sk": "string",             # PROFILE, POKEMON#<id>[#STAT#<stat>], TYPE or ABILITY
+        "gsi1pk": "string",         # POKEMON#<id> on Pokemon and stat items
+        "entity": "string",         # PROFILE, POKEMON, STAT, TYPE or ABILITY
+        "trainer_id": "string"      # On PROFILE items
     }
 }
 
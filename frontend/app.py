@@ -12,7 +12,7 @@ from aws_cdk import (
 from constructs import Construct
 
 class FrontendStack(Stack):
-    def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
+    def __init__(self, scope: Construct, construct_id: str, build_dir: str = "./build", **kwargs) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
         # S3 Bucket for hosting
@@ -31,7 +31,11 @@ class FrontendStack(Stack):
             self, "PokemonDistribution",
             default_behavior=cloudfront.BehaviorOptions(
                 origin=origins.S3Origin(website_bucket),
-                viewer_protocol_policy=cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS
+                viewer_protocol_policy=cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS,
+                # Serve gzip/brotli variants from the edge; the optimized
+                # policy includes Accept-Encoding in the cache key
+                compress=True,
+                cache_policy=cloudfront.CachePolicy.CACHING_OPTIMIZED
             ),
             default_root_object="index.html",
             error_responses=[
@@ -43,19 +47,43 @@ class FrontendStack(Stack):
             ]
         )
 
-        # Deploy website content
-        s3deploy.BucketDeployment(
-            self, "DeployWebsite",
-            sources=[s3deploy.Source.asset("./build")],
+        # Deploy the hashed build assets under static/ first. File names change
+        # whenever the content does, so browsers and the edge may keep them for
+        # a year. Old assets are kept (prune=False) so clients still holding a
+        # previous index.html can finish loading.
+        assets_deployment = s3deploy.BucketDeployment(
+            self, "DeployAssets",
+            sources=[s3deploy.Source.asset(build_dir)],
             destination_bucket=website_bucket,
+            exclude=["*"],
+            include=["static/*"],
+            prune=False,
+            cache_control=[
+                s3deploy.CacheControl.from_string("public, max-age=31536000, immutable")
+            ]
+        )
+
+        # Deploy everything else last (index.html, asset-manifest.json and
+        # unhashed files from public/) and always revalidate it, so a new
+        # release is picked up on the next page load. Only the index paths
+        # are invalidated.
+        index_deployment = s3deploy.BucketDeployment(
+            self, "DeployIndex",
+            sources=[s3deploy.Source.asset(build_dir)],
+            destination_bucket=website_bucket,
+            exclude=["static/*"],
+            prune=False,
+            cache_control=[s3deploy.CacheControl.no_cache()],
             distribution=distribution,
-            distribution_paths=["/*"]
+            distribution_paths=["/", "/index.html"]
         )
+        index_deployment.node.add_dependency(assets_deployment)
 
         # Output URLs
         CfnOutput(self, "WebsiteURL", value=f"https://{distribution.distribution_domain_name}")
         CfnOutput(self, "BucketURL", value=website_bucket.bucket_website_url)
 
-app = cdk.App()
-FrontendStack(app, "PokemonFrontendStack")
-app.synth()
\ No newline at end of file
+if __name__ == "__main__":
+    app = cdk.App()
+    FrontendStack(app, "PokemonFrontendStack")
+    app.synth()
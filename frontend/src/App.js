@@ -83,8 +83,10 @@ function App() {
 
   const saveNewName = async () => {
     try {
-      await axios.put(`${API_URL}/pokemons/${nameEdit.id}`, {
-        ...nameEdit,
+      // id and timestamps are set by the server and rejected in the body
+      const { id, created_at, updated_at, ...fields } = nameEdit;
+      await axios.put(`${API_URL}/pokemons/${id}`, {
+        ...fields,
         name: newName
       });
       setNameEdit(null);
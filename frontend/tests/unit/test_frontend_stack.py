@@ -0,0 +1,70 @@
+import os
+import sys
+
+import aws_cdk as cdk
+import pytest
+from aws_cdk.assertions import Match, Template
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from app import FrontendStack  # noqa: E402
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+@pytest.fixture(scope="module")
+def template(tmp_path_factory):
+    # A minimal CRA-shaped build: hashed files under static/, the rest unhashed
+    build = tmp_path_factory.mktemp("frontend") / "build"
+    (build / "static" / "js").mkdir(parents=True)
+    (build / "index.html").write_text("<html></html>")
+    (build / "asset-manifest.json").write_text("{}")
+    (build / "static" / "js" / "main.abc123.js").write_text("")
+
+    app = cdk.App()
+    return Template.from_stack(FrontendStack(app, "TestFrontendStack", build_dir=str(build)))
+
+
+def deployments(template):
+    return template.find_resources("Custom::CDKBucketDeployment")
+
+
+def deployment_with_cache_control(template, cache_control):
+    matches = [
+        resource["Properties"] for resource in deployments(template).values()
+        if resource["Properties"].get("SystemMetadata", {}).get("cache-control") == cache_control
+    ]
+    assert len(matches) == 1
+    return matches[0]
+
+
+def test_two_deployments(template):
+    template.resource_count_is("Custom::CDKBucketDeployment", 2)
+
+
+def test_only_static_assets_are_immutable(template):
+    assets = deployment_with_cache_control(template, IMMUTABLE)
+    assert assets["Exclude"] == ["*"]
+    assert assets["Include"] == ["static/*"]
+    assert assets["Prune"] is False
+    assert "DistributionPaths" not in assets
+
+
+def test_everything_else_is_no_cache(template):
+    root = deployment_with_cache_control(template, "no-cache")
+    assert root["Exclude"] == ["static/*"]
+    assert "Include" not in root
+    assert root["Prune"] is False
+
+
+def test_only_index_is_invalidated(template):
+    root = deployment_with_cache_control(template, "no-cache")
+    assert sorted(root["DistributionPaths"]) == ["/", "/index.html"]
+
+
+def test_distribution_compresses(template):
+    template.has_resource_properties("AWS::CloudFront::Distribution", {
+        "DistributionConfig": Match.object_like({
+            "DefaultCacheBehavior": Match.object_like({"Compress": True})
+        })
+    })